@@ -1,8 +1,10 @@
 import asyncio
-from collections.abc import Callable, Mapping
+from collections.abc import AsyncIterator, Callable, Mapping
 import contextlib
-from functools import lru_cache
+from functools import lru_cache, partial
 import inspect
+import json
+import random
 import sys
 from types import UnionType
 from typing import Any, cast
@@ -10,19 +12,59 @@ from typing_extensions import override
 
 from nonebot.adapters import Adapter as BaseAdapter, Bot as BaseBot
 
-from nonebot.compat import type_validate_json, type_validate_python
-from nonebot.drivers import URL, Driver, ForwardDriver, Request, WebSocket
+from nonebot.compat import PYDANTIC_V2, type_validate_json, type_validate_python
+from nonebot.drivers import (
+    URL,
+    Driver,
+    ForwardDriver,
+    Request,
+    Response,
+    WebSocket,
+)
 from nonebot.exception import WebSocketClosed
 from nonebot.plugin import get_plugin_config
 from nonebot.utils import escape_tag
 
+if PYDANTIC_V2:
+    from pydantic import TypeAdapter
+
+from . import etf
+from .api import UNSET, SnowflakeType
 from .api.handle import HandleMixin
-from .api.model import GatewayBot, User
+from .api.model import (
+    GatewayBot,
+    GuildMembersChunk,
+    UpdatePresence as UpdatePresenceData,
+    User,
+)
 from .bot import Bot
+from .cluster import ClusterCoordinator, RemoteIdentifyLimiter, identify_key
 from .commands import sync_application_command
-from .config import BotInfo, Config
-from .event import Event, EventType, MessageEvent, ReadyEvent, event_classes
-from .exception import ApiNotAvailable
+from .compress import (
+    Decompressor,
+    create_decompressor,
+    resolve_compress_mode,
+    zstd_available,
+)
+from .config import BotInfo, Config, Intents
+from .dispatch import EventDispatcher
+from .event import (
+    Event,
+    EventType,
+    GuildMembersChunkEvent,
+    MessageEvent,
+    ReadyEvent,
+    VoiceServerUpdateEvent,
+    VoiceStateUpdateEvent,
+    event_classes,
+)
+from .exception import ApiNotAvailable, NetworkError
+from .gateway import GatewaySendLimiter, GatewayWebSocket
+from .identify import IdentifyLimiter
+from .intents import resolve_intents
+from .interest import EventInterest
+from .lazy import lazy_field_names, validate_lazy
+from .members import CHUNK_TIMEOUT, GuildMembersRequests, guild_shard_id
 from .payload import (
     Dispatch,
     Heartbeat,
@@ -31,14 +73,28 @@ from .payload import (
     Identify,
     InvalidSession,
     Payload,
-    PayloadType,
     Reconnect,
+    RequestGuildMembers,
     Resume,
+    UpdatePresence,
+    UpdateVoiceState,
+    parse_payload,
 )
-from .serialization import encode_model_json_text
-from .utils import decompress_data, log
+from .presence import PresenceCoalescer
+from .ratelimit import RateLimiter
+from .reconnect import ReconnectPolicy
+from .recording import GatewayRecorder
+from .retry import RetryPolicy
+from .serialization import encode_model_etf, encode_model_json_text
+from .session import FileSessionStore, SessionState, SessionStore, session_key
+from .singleflight import SingleFlight
+from .startup import StartupContext
+from .utils import log
+from .voice import VOICE_TIMEOUT, VoiceConnection, VoiceHandshakes
 
-RECONNECT_INTERVAL = 3.0
+# 任意非 1000/1001 的状态码, 关闭后 session 仍可 Resume
+RESUMABLE_CLOSE_CODE = 4000
+SHUTDOWN_TIMEOUT = 5.0
 
 
 @lru_cache(maxsize=256)
@@ -47,16 +103,75 @@ def _get_handler_params(handler: Callable[..., Any]) -> Mapping[str, inspect.Par
     return inspect.signature(handler).parameters
 
 
+@lru_cache(maxsize=256)
+def _get_event_validator(
+    event_class: type[Event] | UnionType,
+) -> Callable[[Any], Event]:
+    """Cache event validators to avoid rebuilding the schema for every dispatch."""
+    # unions of event classes validate into one of their members
+    event_type = cast("type[Event]", event_class)
+    if PYDANTIC_V2:
+        return TypeAdapter(event_type).validate_python
+    return partial(type_validate_python, event_type)
+
+
 class Adapter(BaseAdapter, HandleMixin):
     @override
     def __init__(self, driver: Driver, **kwargs: Any) -> None:
         super().__init__(driver, **kwargs)
         self.discord_config: Config = get_plugin_config(Config)
+        self._init_state()
+        self.setup()
+
+    def _init_state(self) -> None:
+        """按 `discord_config` 初始化适配器的运行状态"""
         self.tasks: set[asyncio.Task] = set()
+        self.identify_limiters: dict[str, IdentifyLimiter | RemoteIdentifyLimiter] = {}
+        self.cluster: ClusterCoordinator | None = None
+        self.startup_contexts: dict[str, StartupContext] = {}
+        self.member_requests = GuildMembersRequests()
+        self.voice_handshakes = VoiceHandshakes()
+        # REST API 的速率限制, 所有 API 调用共用
+        self.rate_limiter = RateLimiter(self.discord_config.discord_global_rate_limit)
+        # API 请求遇到 429 与 5xx 时的重试策略
+        self.retry_policy = RetryPolicy(
+            max_retries=self.discord_config.discord_api_max_retries,
+            deadline=self.discord_config.discord_api_retry_deadline,
+        )
+        # 合并相同的并发 GET 请求
+        self.single_flight: SingleFlight[Response] = SingleFlight()
+        # 各 Bot 最新设置的在线状态, identify 时使用
+        self.presences: dict[str, UpdatePresenceData] = {}
+        # 各 Bot 实际使用的 intents, 以 token 为键
+        self.intents: dict[str, Intents] = {}
+        # 各分片的 Bot, 以 session_key 为键
+        self.shard_bots: dict[str, Bot] = {}
+        self.session_store: SessionStore | None = None
+        # 录制收到的网关消息, 用于离线回放
+        self.recorder: GatewayRecorder | None = None
+        if self.discord_config.discord_session_file is not None:
+            self.session_store = FileSessionStore(
+                self.discord_config.discord_session_file
+            )
+        # 每个分片的重连策略工厂, 可替换为自定义策略
+        self.reconnect_policy_factory: Callable[[], ReconnectPolicy] = partial(
+            ReconnectPolicy,
+            base_delay=self.discord_config.discord_reconnect_base_delay,
+            max_delay=self.discord_config.discord_reconnect_max_delay,
+        )
+        self.event_interest = EventInterest(
+            auto=self.discord_config.discord_skip_unhandled_events,
+            allow=self.discord_config.discord_event_allowlist,
+            deny=self.discord_config.discord_event_denylist,
+        )
+        self.event_interest.require(
+            EventType.GUILD_MEMBERS_CHUNK.value,
+            EventType.VOICE_STATE_UPDATE.value,
+            EventType.VOICE_SERVER_UPDATE.value,
+        )
         self.base_url: URL = URL(
             f"https://discord.com/api/v{self.discord_config.discord_api_version}",
         )
-        self.setup()
 
     @classmethod
     @override
@@ -80,18 +195,52 @@ class Adapter(BaseAdapter, HandleMixin):
 
         log("DEBUG", f"Discord api base url: <y>{escape_tag(str(self.base_url))}</y>")
 
+        if (
+            self.discord_config.discord_compress == "zstd-stream"
+            and not zstd_available()
+        ):
+            log(
+                "WARNING",
+                "zstd-stream compression requires Python 3.14+ or the zstandard "
+                "package, falling back to zlib-stream",
+            )
+
+        if (workers := self.discord_config.discord_cluster_workers) > 0:
+            await self._start_cluster(workers)
+            return
+
+        if (record_file := self.discord_config.discord_record_file) is not None:
+            self.recorder = GatewayRecorder(record_file)
+            log("INFO", f"Recording gateway traffic to {record_file}")
+
         for bot_info in self.discord_config.discord_bots:
             self.tasks.add(asyncio.create_task(self.run_bot(bot_info)))
 
+        interval = self.discord_config.discord_session_save_interval
+        if self.session_store is not None and interval > 0:
+            self.tasks.add(asyncio.create_task(self._save_sessions_task(interval)))
+
     async def shutdown(self) -> None:
+        if self.cluster is not None:
+            await self.cluster.stop()
         for task in self.tasks:
             if not task.done():
                 task.cancel()
+        for bot in self.shard_bots.values():
+            if bot.presence_updater is not None:
+                bot.presence_updater.cancel()
+        if self.session_store is not None:
+            # 等待连接关闭, 保存最终的 sequence
+            if tasks := [task for task in self.tasks if not task.done()]:
+                await asyncio.wait(tasks, timeout=SHUTDOWN_TIMEOUT)
+            await self.save_sessions()
+        if self.recorder is not None:
+            await self.recorder.close()
+            self.recorder = None
 
     async def run_bot(self, bot_info: BotInfo) -> None:
         try:
-            gateway_info = await self._get_gateway_bot(bot_info)
-            ws_url = URL(gateway_info.url)
+            ws_url, recommended_shards = await self._prepare_identify(bot_info)
         except Exception as e:
             log(
                 "ERROR",
@@ -99,37 +248,78 @@ class Adapter(BaseAdapter, HandleMixin):
                 e,
             )
             return
-        remain = (
-            gateway_info.session_start_limit
-            and gateway_info.session_start_limit.remaining
-        )
-        if remain and remain <= 0:
-            log(
-                "ERROR",
-                "<r><bg #f8bbd0>Failed to establish connection to Discord "
-                "because of session start limit.</bg #f8bbd0></r>\n"
-                f"{escape_tag(str(gateway_info))}",
-            )
-            return
 
+        total = bot_info.shard_count or recommended_shards or 1
         if bot_info.shard is not None:
+            shards = [bot_info.shard]
+        elif bot_info.shard_range is not None:
+            shards = [(i, total) for i in range(*bot_info.shard_range)]
+        else:
+            shards = [(i, total) for i in range(total)]
+        # identifies are paced by the limiter, so every shard can start right away
+        for shard in shards:
             self.tasks.add(
-                asyncio.create_task(self._forward_ws(bot_info, ws_url, bot_info.shard)),
+                asyncio.create_task(self._forward_ws(bot_info, ws_url, shard)),
             )
-            return
 
-        shards = gateway_info.shards or 1
-        for i in range(shards):
-            self.tasks.add(
-                asyncio.create_task(self._forward_ws(bot_info, ws_url, (i, shards))),
+    async def _prepare_identify(self, bot_info: BotInfo) -> tuple[URL, int | None]:
+        """获取网关地址与推荐分片数, 并准备 identify 限流器"""
+        if address := self.discord_config.discord_cluster_coordinator:
+            # 集群模式下由协调进程统一获取网关信息并分配 identify 配额
+            limiter = RemoteIdentifyLimiter(
+                address,
+                identify_key(bot_info.token),
+                self.discord_config.discord_cluster_secret,
+            )
+            self.identify_limiters[bot_info.token] = limiter
+            url, shards = await limiter.gateway()
+            return URL(url), shards
+
+        gateway_info = await self._startup_context(bot_info).get_gateway()
+        limit = gateway_info.session_start_limit
+        self.identify_limiters[bot_info.token] = (
+            IdentifyLimiter.from_session_start_limit(limit)
+        )
+        if limit.remaining <= 0:
+            log(
+                "WARNING",
+                "Session start limit of Discord is used up, shards will identify "
+                f"after it resets in {limit.reset_after / 1000:.0f}s",
             )
-            await asyncio.sleep(
-                (
-                    gateway_info.session_start_limit
-                    and gateway_info.session_start_limit.max_concurrency
+        return URL(gateway_info.url), gateway_info.shards
+
+    async def _start_cluster(self, workers: int) -> None:
+        """以协调进程运行, 将各 Bot 的分片分配给子进程"""
+        cluster = ClusterCoordinator(
+            workers, session_file=self.discord_config.discord_session_file
+        )
+        bots = self.discord_config.discord_bots
+        gateways = await asyncio.gather(
+            *(self._startup_context(bot_info).get_gateway() for bot_info in bots),
+            return_exceptions=True,
+        )
+        for bot_info, gateway in zip(bots, gateways, strict=True):
+            if isinstance(gateway, BaseException):
+                if not isinstance(gateway, Exception):
+                    raise gateway
+                log(
+                    "ERROR",
+                    "<r><bg #f8bbd0>Failed to get gateway info.</bg #f8bbd0></r>",
+                    gateway,
                 )
-                or 1,
+                continue
+            cluster.add_bot(bot_info, gateway)
+        self.cluster = cluster
+        await cluster.start(self.discord_config.discord_cluster_worker_command)
+
+    def _startup_context(self, bot_info: BotInfo) -> StartupContext:
+        """获取 Bot 各分片共享的启动信息"""
+        if (context := self.startup_contexts.get(bot_info.token)) is None:
+            context = self.startup_contexts[bot_info.token] = StartupContext(
+                partial(self._get_gateway_bot, bot_info),
+                partial(self._get_bot_user, bot_info),
             )
+        return context
 
     async def _get_gateway_bot(self, bot_info: BotInfo) -> GatewayBot:
         headers = {"Authorization": self.get_authorization(bot_info)}
@@ -165,7 +355,7 @@ class Adapter(BaseAdapter, HandleMixin):
             raise ValueError(msg)
         return type_validate_json(User, resp.content)
 
-    async def _forward_ws(  # noqa: C901
+    async def _forward_ws(
         self,
         bot_info: BotInfo,
         ws_url: URL,
@@ -175,10 +365,11 @@ class Adapter(BaseAdapter, HandleMixin):
         headers = {"Authorization": self.get_authorization(bot_info)}
         params = {
             "v": self.discord_config.discord_api_version,
-            "encoding": "json",
+            "encoding": self.discord_config.discord_encoding,
         }
-        if self.discord_config.discord_compress:
-            params["compress"] = "zlib-stream"
+        compress = resolve_compress_mode(compress=self.discord_config.discord_compress)
+        if compress is not None:
+            params["compress"] = compress
         request = Request(
             method="GET",
             url=ws_url,
@@ -187,69 +378,20 @@ class Adapter(BaseAdapter, HandleMixin):
             timeout=self.discord_config.discord_api_timeout,
             proxy=self.discord_config.discord_proxy,
         )
-        heartbeat_task: asyncio.Task | None = None
+        gateway_url = request.url
+        decompressor = create_decompressor(compress)
+        policy = self.reconnect_policy_factory()
         bot: Bot | None = None
         while True:
+            close_code: int | None = None
+            sequence = bot.sequence if bot is not None and bot.has_sequence else None
             try:
-                if bot is None:
-                    user = await self._get_bot_user(bot_info)
-                    bot = Bot(self, str(user.id), bot_info)
-                async with self.websocket(request) as ws:
-                    log(
-                        "DEBUG",
-                        "WebSocket Connection to"
-                        f" {escape_tag(str(ws_url))} established",
-                    )
-                    try:
-                        # 接收hello事件
-                        heartbeat_interval = await self._hello(ws)
-                        if not heartbeat_interval:
-                            await asyncio.sleep(RECONNECT_INTERVAL)
-                            continue
-
-                        if not heartbeat_task:
-                            # 发送第一次心跳
-                            log("DEBUG", "Waiting for first heartbeat to be send...")
-                            # await asyncio.sleep(
-                            #     random.random() * heartbeat_interval / 1000.0)  # https://discord.com/developers/docs/topics/gateway#heartbeat-interval
-                            await asyncio.sleep(5)
-                            await self._heartbeat(ws, bot)
-                            await self._heartbeat_ack(ws)
-
-                        # 开启心跳
-                        heartbeat_task = asyncio.create_task(
-                            self._heartbeat_task(ws, bot, heartbeat_interval),
-                        )
-
-                        # 进行identify和resume
-                        result = await self._authenticate(bot, ws, shard)
-                        if not result:
-                            await asyncio.sleep(RECONNECT_INTERVAL)
-                            continue
-
-                        # 处理事件
-                        await self._loop(bot, ws)
-                    except WebSocketClosed as e:
-                        log(
-                            "ERROR",
-                            "<r><bg #f8bbd0>WebSocket Closed</bg #f8bbd0></r>",
-                            e,
-                        )
-                    except Exception as e:
-                        log(
-                            "ERROR",
-                            "<r><bg #f8bbd0>Error while process data from"
-                            f" websocket {escape_tag(str(ws_url))}. Trying to"
-                            " reconnect...</bg #f8bbd0></r>",
-                            e,
-                        )
-                    finally:
-                        if heartbeat_task:
-                            heartbeat_task.cancel()
-                            heartbeat_task = None
-                        if bot.self_id in self.bots:
-                            self.bot_disconnect(bot)
-
+                bot = await self._prepare_bot(
+                    bot, bot_info, shard, request, gateway_url
+                )
+                if bot.dispatcher is not None:
+                    self.tasks.update(bot.dispatcher.start())
+                close_code = await self._connect(bot, request, decompressor, shard)
             except Exception as e:
                 log(
                     "ERROR",
@@ -258,7 +400,190 @@ class Adapter(BaseAdapter, HandleMixin):
                     "Trying to reconnect...</bg #f8bbd0></r>",
                     e,
                 )
-                await asyncio.sleep(RECONNECT_INTERVAL)
+
+            # 连接期间收到过新的事件, 说明连接已恢复正常, 重置重连次数
+            if bot is not None and bot.has_sequence and bot.sequence != sequence:
+                policy.reset()
+            decision = policy.next(
+                close_code=close_code, resumable=bot is not None and bot.ready
+            )
+            if decision.action == "stop":
+                log(
+                    "ERROR",
+                    f"<r><bg #f8bbd0>Gateway connection of shard {shard} closed "
+                    f"(close code {close_code}), stop reconnecting</bg #f8bbd0></r>",
+                )
+                return
+            if decision.action == "identify":
+                # 放弃当前会话, 重新连接到初始网关地址并重新 identify
+                # 会话可能已在收到 INVALID_SESSION 时被清除, 因此不依赖 bot.ready 判断
+                if bot is not None:
+                    bot.clear()
+                request.url = gateway_url
+                self._startup_context(bot_info).invalidate_gateway()
+            log(
+                "DEBUG",
+                f"Reconnecting shard {shard} in {decision.delay:.2f}s "
+                f"({decision.action})",
+            )
+            await asyncio.sleep(decision.delay)
+
+    def get_intents(self, bot_info: BotInfo) -> Intents:
+        """获取 Bot identify 时使用的 intents
+
+        auto 模式下在首次使用时根据已注册的事件响应器推导, 之后不再改变。
+        适配器自身等待的事件 (如语音状态) 与白名单中的事件所需的 intents 也会开启。
+        """
+        if bot_info.token not in self.intents:
+            interest = self.event_interest
+            self.intents[bot_info.token] = resolve_intents(
+                bot_info.intent, interest.required | interest.allow
+            )
+        return self.intents[bot_info.token]
+
+    async def _prepare_bot(
+        self,
+        bot: Bot | None,
+        bot_info: BotInfo,
+        shard: tuple[int, int],
+        request: Request,
+        gateway_url: URL,
+    ) -> Bot:
+        """连接前准备分片的 Bot
+
+        重新 identify 前重新获取网关地址: 集群模式下向协调进程获取,
+        否则从启动信息中获取, 启动信息失效后会重新请求。
+        """
+        if bot is None:
+            return await self._create_bot(bot_info, shard, request)
+        if not bot.ready:
+            limiter = self.identify_limiters.get(bot_info.token)
+            if isinstance(limiter, RemoteIdentifyLimiter):
+                url, _ = await limiter.gateway()
+            else:
+                url = (await self._startup_context(bot_info).get_gateway()).url
+            request.url = URL(url).with_query(gateway_url.query)
+        return bot
+
+    async def _create_bot(
+        self, bot_info: BotInfo, shard: tuple[int, int], request: Request
+    ) -> Bot:
+        """创建分片对应的 Bot, 并从会话存储中恢复上次的会话"""
+        user = await self._startup_context(bot_info).get_user()
+        bot = Bot(self, str(user.id), bot_info)
+        bot.dispatcher = self._create_dispatcher(bot)
+        bot.shard = shard
+        bot.presence_updater = PresenceCoalescer(partial(self._send_presence, bot))
+        key = session_key(bot.self_id, shard)
+        self.shard_bots[key] = bot
+        if self.session_store is not None and (
+            state := await self.session_store.load(key)
+        ):
+            bot.session_id = state.session_id
+            bot.sequence = state.sequence
+            bot.resume_gateway_url = state.resume_gateway_url
+            request.url = URL(state.resume_gateway_url).with_query(request.url.query)
+            log("INFO", f"Restored session of shard {shard}, trying to resume")
+        return bot
+
+    async def save_sessions(self) -> None:
+        """保存所有分片的会话, 以便重启后恢复"""
+        if self.session_store is None:
+            return
+        states: dict[str, SessionState | None] = {}
+        for key, bot in self.shard_bots.items():
+            states[key] = None
+            if bot.ready and bot.has_sequence and bot.resume_gateway_url:
+                states[key] = SessionState(
+                    bot.session_id, bot.sequence, bot.resume_gateway_url
+                )
+        try:
+            await self.session_store.save_many(states)
+        except Exception as e:
+            log("ERROR", "Failed to save sessions", e)
+
+    async def _save_sessions_task(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.save_sessions()
+
+    async def _connect(
+        self,
+        bot: Bot,
+        request: Request,
+        decompressor: Decompressor | None,
+        shard: tuple[int, int],
+    ) -> int | None:
+        """建立一次网关连接并处理事件, 返回服务器的关闭码"""
+        heartbeat_task: asyncio.Task | None = None
+        async with self.websocket(request) as raw_ws:
+            if decompressor is not None:
+                decompressor.reset()
+            ws = GatewayWebSocket(
+                raw_ws, decompressor, GatewaySendLimiter(), shard=shard
+            )
+            log(
+                "DEBUG",
+                f"WebSocket Connection to {escape_tag(str(request.url))} established",
+            )
+            try:
+                # 接收hello事件
+                heartbeat_interval = await self._hello(ws)
+                if not heartbeat_interval:
+                    return None
+
+                # 开启心跳
+                heartbeat_task = asyncio.create_task(
+                    self._heartbeat_task(ws, bot, heartbeat_interval),
+                )
+
+                # 进行identify和resume
+                resuming = bot.ready
+                if not await self._authenticate(bot, ws, shard):
+                    return None
+                self._gateway_ready(bot, ws, resumed=resuming)
+
+                # 处理事件
+                await self._loop(bot, ws)
+            except asyncio.CancelledError:
+                if self.session_store is not None:
+                    # 关闭连接时保留会话, 以便重启后 Resume
+                    with contextlib.suppress(Exception):
+                        await ws.close(RESUMABLE_CLOSE_CODE, "Shutting down")
+                raise
+            except WebSocketClosed as e:
+                log(
+                    "ERROR",
+                    "<r><bg #f8bbd0>WebSocket Closed</bg #f8bbd0></r>",
+                    e,
+                )
+                return e.code
+            except Exception as e:
+                log(
+                    "ERROR",
+                    "<r><bg #f8bbd0>Error while process data from"
+                    f" websocket {escape_tag(str(request.url))}. Trying to"
+                    " reconnect...</bg #f8bbd0></r>",
+                    e,
+                )
+            finally:
+                bot.gateway = None
+                if heartbeat_task:
+                    heartbeat_task.cancel()
+                if bot.self_id in self.bots:
+                    self.bot_disconnect(bot)
+        return None
+
+    def _gateway_ready(self, bot: Bot, ws: GatewayWebSocket, *, resumed: bool) -> None:
+        """连接就绪后记录分片的网关连接"""
+        bot.gateway = ws
+        if (
+            resumed
+            and bot.presence_updater is not None
+            and (presence := self.presences.get(bot.self_id)) is not None
+        ):
+            # 断线期间的状态更新可能未发送, 恢复后补发最新状态
+            bot.presence_updater.update(presence)
 
     async def _hello(self, ws: WebSocket) -> int | None:
         """接收并处理服务器的 Hello 事件
@@ -280,46 +605,84 @@ class Adapter(BaseAdapter, HandleMixin):
                 e,
             )
 
-    async def _heartbeat_ack(self, ws: WebSocket) -> None:
-        """检查是否收到心跳ACK事件
-
-        见 https://discord.com/developers/docs/topics/gateway#sending-heartbeats"""
-        payload = await self.receive_payload(ws)
-        if not isinstance(payload, HeartbeatAck):
-            await ws.close(1003)  # 除了1000和1001都行
-
-    @staticmethod
-    async def _heartbeat(ws: WebSocket, bot: Bot) -> None:
+    async def _heartbeat(self, ws: WebSocket, bot: Bot) -> None:
         """心跳"""
         log("TRACE", f"Heartbeat {bot.sequence if bot.has_sequence else ''}")
         payload = type_validate_python(
             Heartbeat,
             {"data": bot.sequence if bot.has_sequence else None},
         )
+        data = self.encode_payload(payload)
         with contextlib.suppress(Exception):
-            await ws.send(encode_model_json_text(payload, by_alias=True))
+            if isinstance(ws, GatewayWebSocket):
+                await ws.send(data, priority=True)
+                ws.heartbeat_sent()
+            else:
+                await ws.send(data)
 
     async def _heartbeat_task(
-        self, ws: WebSocket, bot: Bot, heartbeat_interval: int
+        self, ws: GatewayWebSocket, bot: Bot, heartbeat_interval: int
     ) -> None:
-        """心跳任务"""
+        """心跳任务
+
+        首次心跳前等待 heartbeat_interval * jitter, 之后每次发送心跳前检查上一次心跳是否收到 ACK,
+        未收到则视为僵死连接, 以非 1000 状态码关闭连接以便重连并 Resume。
+        事件分发队列已满而暂停读取时, 收不到 ACK 不视为僵死。
+        见 https://discord.com/developers/docs/topics/gateway#sending-heartbeats"""
+        interval = heartbeat_interval / 1000.0
+        await asyncio.sleep(interval * random.random())  # noqa: S311
         while True:
+            if ws.zombied:
+                log(
+                    "WARNING",
+                    "Heartbeat ACK not received, the connection seems to be zombied."
+                    " Try to reconnect...",
+                )
+                with contextlib.suppress(Exception):
+                    await ws.close(RESUMABLE_CLOSE_CODE, "Heartbeat ACK not received")
+                return
             await self._heartbeat(ws, bot)
-            await asyncio.sleep(heartbeat_interval / 1000.0)
+            await asyncio.sleep(interval)
+
+    def _heartbeat_acked(self, ws: GatewayWebSocket, bot: Bot) -> None:
+        latency = ws.heartbeat_ack()
+        if latency is not None:
+            bot.latency = latency
+        log("TRACE", f"Heartbeat ACK, latency: {bot.latency}")
+
+    async def _receive_after_heartbeats(
+        self, ws: GatewayWebSocket, bot: Bot
+    ) -> Payload:
+        """接收下一个非心跳 payload, 期间照常处理心跳请求与 ACK
+
+        心跳任务在鉴权前就已开始, 等待 Ready 时也可能收到心跳相关 payload"""
+        while True:
+            payload = await self.receive_payload(ws)
+            if isinstance(payload, Heartbeat):
+                await self._heartbeat(ws, bot)
+            elif isinstance(payload, HeartbeatAck):
+                self._heartbeat_acked(ws, bot)
+            else:
+                return payload
 
     async def _authenticate(
-        self, bot: Bot, ws: WebSocket, shard: tuple[int, int]
+        self, bot: Bot, ws: GatewayWebSocket, shard: tuple[int, int]
     ) -> bool | None:
         """鉴权连接"""
         if not bot.ready:
+            if limiter := self.identify_limiters.get(bot.bot_info.token):
+                await limiter.acquire(shard[0])
             payload = type_validate_python(
                 Identify,
                 {
                     "data": {
                         "token": self.get_authorization(bot.bot_info),
-                        "intents": bot.bot_info.intent.to_int(),
+                        "intents": self.get_intents(bot.bot_info).to_int(),
                         "shard": list(shard),
-                        "compress": self.discord_config.discord_compress,
+                        "presence": self.presences.get(
+                            bot.self_id, bot.bot_info.presence
+                        )
+                        or UNSET,
                         "properties": {
                             "os": sys.platform,
                             "browser": "NoneBot2",
@@ -341,11 +704,8 @@ class Adapter(BaseAdapter, HandleMixin):
             )
 
         try:
-            await ws.send(
-                encode_model_json_text(
-                    payload, by_alias=True, exclude_none=True, omit_unset_values=True
-                )
-            )
+            # presence.since 为 null 时也需要发送
+            await ws.send(self.encode_payload(payload, omit_unset_values=True))
         except Exception as e:
             log(
                 "ERROR",
@@ -360,21 +720,21 @@ class Adapter(BaseAdapter, HandleMixin):
         if not bot.ready:
             # https://discord.com/developers/docs/topics/gateway#ready-event
             # 鉴权成功之后, 后台会下发一个 Ready Event
-            payload = await self.receive_payload(ws)
-            if isinstance(payload, HeartbeatAck):
-                log(
-                    "WARNING", "Received unexpected HeartbeatAck event when identifying"
-                )
-                payload = await self.receive_payload(ws)
+            payload = await self._receive_after_heartbeats(ws, bot)
             if not isinstance(payload, Dispatch):
                 msg = f"Received unexpected payload: {payload!r}"
                 raise ValueError(msg)
             bot.sequence = payload.sequence
-            ready_event = self.payload_to_event(payload)
+            ready_event = self.payload_to_event(
+                payload, lazy=self.discord_config.discord_lazy_events
+            )
             if not isinstance(ready_event, ReadyEvent):
                 msg = f"Received unexpected event: {ready_event!r}"
                 raise ValueError(msg)
-            ws.request.url = URL(ready_event.resume_gateway_url)
+            ws.request.url = URL(ready_event.resume_gateway_url).with_query(
+                ws.request.url.query
+            )
+            bot.resume_gateway_url = ready_event.resume_gateway_url
             bot.session_id = ready_event.session_id
             bot.self_info = ready_event.user
 
@@ -393,7 +753,7 @@ class Adapter(BaseAdapter, HandleMixin):
 
         return True
 
-    async def _loop(self, bot: Bot, ws: WebSocket) -> None:
+    async def _loop(self, bot: Bot, ws: GatewayWebSocket) -> None:
         """接收并处理事件"""
         while True:
             payload = await self.receive_payload(ws)
@@ -402,31 +762,13 @@ class Adapter(BaseAdapter, HandleMixin):
                 f"Received payload: {escape_tag(repr(payload))}",
             )
             if isinstance(payload, Dispatch):
-                bot.sequence = payload.sequence
-                try:
-                    event = self.payload_to_event(payload)
-                except Exception as e:
-                    log(
-                        "WARNING",
-                        f"Failed to parse event {escape_tag(repr(payload))}",
-                        e,
-                    )
-                else:
-                    if not (
-                        isinstance(event, MessageEvent)
-                        and event.get_user_id() == bot.self_id
-                        and not self.discord_config.discord_handle_self_message
-                    ):
-                        task = asyncio.create_task(bot.handle_event(event))
-                        task.add_done_callback(self.tasks.discard)
-                        self.tasks.add(task)
+                await self._dispatch(bot, payload)
             elif isinstance(payload, Heartbeat):
                 # 当接受到心跳payload时, 需要立即发送一次心跳见 https://discord.com/developers/docs/topics/gateway#heartbeat-requests
                 await self._heartbeat(ws, bot)
 
             elif isinstance(payload, HeartbeatAck):
-                log("TRACE", "Heartbeat ACK")
-                continue
+                self._heartbeat_acked(ws, bot)
             elif isinstance(payload, Reconnect):
                 log(
                     "WARNING",
@@ -434,7 +776,9 @@ class Adapter(BaseAdapter, HandleMixin):
                 )
                 break
             elif isinstance(payload, InvalidSession):
-                bot.clear()
+                if not payload.data:
+                    # 会话不可恢复, 需要重新 identify
+                    bot.clear()
                 log(
                     "ERROR",
                     "Received invalid session event from server. Try to reconnect...",
@@ -446,17 +790,224 @@ class Adapter(BaseAdapter, HandleMixin):
                     f"Unknown payload from server: {escape_tag(repr(payload))}",
                 )
 
+    async def _dispatch(self, bot: Bot, payload: Dispatch) -> None:
+        """将 Dispatch payload 转换为事件并交由 bot 处理"""
+        bot.sequence = payload.sequence
+        if not self.event_interest.is_interested(payload.type):
+            log("TRACE", f"Skipped unhandled event {payload.type}")
+            return
+        try:
+            event = self.payload_to_event(
+                payload, lazy=self.discord_config.discord_lazy_events
+            )
+        except Exception as e:
+            log(
+                "WARNING",
+                f"Failed to parse event {escape_tag(repr(payload))}",
+                e,
+            )
+            return
+        if self._feed_requests(bot, event):
+            return
+        if (
+            isinstance(event, MessageEvent)
+            and event.get_user_id() == bot.self_id
+            and not self.discord_config.discord_handle_self_message
+        ):
+            return
+        if bot.dispatcher is not None:
+            if bot.gateway is not None and bot.dispatcher.full:
+                # 等待队列空位期间不再读取 Gateway, 心跳 ACK 也无法收到
+                with bot.gateway.reading_paused():
+                    await bot.dispatcher.put(payload.type, event)
+            else:
+                await bot.dispatcher.put(payload.type, event)
+            return
+        task = asyncio.create_task(bot.handle_event(event))
+        task.add_done_callback(self.tasks.discard)
+        self.tasks.add(task)
+
+    def _feed_requests(self, bot: Bot, event: Event) -> bool:
+        """将事件交给等待它的 Gateway 请求, 返回事件是否已被消费"""
+        if isinstance(event, GuildMembersChunkEvent):
+            return self.member_requests.feed(event)
+        # 语音事件在完成握手后仍然交由事件处理器处理
+        if isinstance(event, VoiceStateUpdateEvent):
+            self.voice_handshakes.feed_state(bot.self_id, event)
+        elif isinstance(event, VoiceServerUpdateEvent):
+            self.voice_handshakes.feed_server(bot.self_id, event)
+        return False
+
+    def update_presence(self, bot: Bot, presence: UpdatePresenceData) -> None:
+        """在 Bot 的所有分片上更新在线状态"""
+        self.presences[bot.self_id] = presence
+        for shard_bot in self.shard_bots.values():
+            if shard_bot.self_id == bot.self_id and shard_bot.presence_updater:
+                shard_bot.presence_updater.update(presence)
+
+    async def _send_presence(self, bot: Bot, presence: UpdatePresenceData) -> None:
+        if bot.gateway is None:
+            log("DEBUG", f"Shard {bot.shard} is not connected, presence deferred")
+            return
+        payload = type_validate_python(UpdatePresence, {"data": presence})
+        await bot.gateway.send(self.encode_payload(payload, omit_unset_values=True))
+
+    def _shard_gateway(self, bot: Bot, guild_id: int) -> GatewayWebSocket:
+        """获取负责该服务器的分片连接"""
+        shard = next(
+            (
+                shard_bot.shard
+                for shard_bot in self.shard_bots.values()
+                if shard_bot.self_id == bot.self_id and shard_bot.shard is not None
+            ),
+            None,
+        )
+        if shard is None:
+            msg = f"Bot {bot.self_id} is not connected"
+            raise NetworkError(msg)
+        shard = (guild_shard_id(guild_id, shard[1]), shard[1])
+        shard_bot = self.shard_bots.get(session_key(bot.self_id, shard))
+        if shard_bot is None or shard_bot.gateway is None:
+            msg = f"Shard {shard} of guild {guild_id} is not connected"
+            raise NetworkError(msg)
+        return shard_bot.gateway
+
+    async def request_guild_members(  # noqa: PLR0913
+        self,
+        bot: Bot,
+        guild_id: SnowflakeType,
+        *,
+        query: str | None = None,
+        limit: int = 0,
+        presences: bool = False,
+        user_ids: list[SnowflakeType] | None = None,
+        timeout: float = CHUNK_TIMEOUT,
+    ) -> AsyncIterator[GuildMembersChunk]:
+        """通过 Gateway 请求服务器成员, 逐个返回 GUILD_MEMBERS_CHUNK
+
+        见 https://discord.com/developers/docs/events/gateway-events#request-guild-members
+        """
+        ws = self._shard_gateway(bot, int(guild_id))
+        if query is None and user_ids is None:
+            query = ""
+        nonce = self.member_requests.open()
+        try:
+            payload = type_validate_python(
+                RequestGuildMembers,
+                {
+                    "data": {
+                        "guild_id": guild_id,
+                        "query": UNSET if query is None else query,
+                        "limit": limit,
+                        "presences": presences,
+                        "user_ids": UNSET if user_ids is None else user_ids,
+                        "nonce": nonce,
+                    }
+                },
+            )
+            await ws.send(
+                self.encode_payload(payload, exclude_none=True, omit_unset_values=True)
+            )
+            async for chunk in self.member_requests.chunks(nonce, timeout):
+                yield chunk
+        finally:
+            self.member_requests.close(nonce)
+
+    async def update_voice_state(  # noqa: PLR0913
+        self,
+        bot: Bot,
+        guild_id: SnowflakeType,
+        channel_id: SnowflakeType | None,
+        *,
+        self_mute: bool = False,
+        self_deaf: bool = False,
+        timeout: float = VOICE_TIMEOUT,
+    ) -> VoiceConnection:
+        """通过 Gateway 加入、移动或离开语音频道, 等待 Discord 下发语音连接信息
+
+        见 https://discord.com/developers/docs/events/gateway-events#update-voice-state
+        """
+        if not self.get_intents(bot.bot_info).guild_voice_states:
+            msg = "Updating voice state requires the guild_voice_states intent"
+            raise ValueError(msg)
+        ws = self._shard_gateway(bot, int(guild_id))
+        future = self.voice_handshakes.open(bot.self_id, int(guild_id))
+        try:
+            payload = type_validate_python(
+                UpdateVoiceState,
+                {
+                    "data": {
+                        "guild_id": guild_id,
+                        "channel_id": channel_id,
+                        "self_mute": self_mute,
+                        "self_deaf": self_deaf,
+                    }
+                },
+            )
+            # 离开频道时 channel_id 需要以 null 发送
+            await ws.send(self.encode_payload(payload))
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            msg = f"Timed out waiting for voice server of guild {guild_id}"
+            raise NetworkError(msg) from None
+        finally:
+            self.voice_handshakes.close(bot.self_id, int(guild_id), future)
+
+    def _create_dispatcher(self, bot: Bot) -> EventDispatcher | None:
+        config = self.discord_config
+        if config.discord_dispatch_workers <= 0:
+            return None
+        return EventDispatcher(
+            bot.handle_event,
+            workers=config.discord_dispatch_workers,
+            max_size=config.discord_dispatch_queue_size,
+            overflow=config.discord_dispatch_overflow,
+            low_priority=config.discord_dispatch_low_priority_events,
+            ordered=config.discord_dispatch_ordered,
+        )
+
     @staticmethod
     def get_authorization(bot_info: BotInfo) -> str:
         return f"Bot {bot_info.token}"
 
     async def receive_payload(self, ws: WebSocket) -> Payload:
         data = await ws.receive()
-        data = decompress_data(data, compress=self.discord_config.discord_compress)
-        return type_validate_json(cast("type[Payload]", PayloadType), data)
+        encoding = self.discord_config.discord_encoding
+        if self.recorder is not None:
+            self.recorder.record(
+                ws.shard if isinstance(ws, GatewayWebSocket) else None, data, encoding
+            )
+        if encoding == "etf":
+            if isinstance(data, str):
+                msg = "etf encoded data must be bytes"
+                raise TypeError(msg)
+            return parse_payload(etf.decode(data))
+        return parse_payload(json.loads(data))
+
+    def encode_payload(
+        self,
+        payload: Payload,
+        *,
+        exclude_none: bool = False,
+        omit_unset_values: bool = False,
+    ) -> str | bytes:
+        """按照连接的 encoding 编码需要发送的 payload"""
+        if self.discord_config.discord_encoding == "etf":
+            return encode_model_etf(
+                payload,
+                by_alias=True,
+                exclude_none=exclude_none,
+                omit_unset_values=omit_unset_values,
+            )
+        return encode_model_json_text(
+            payload,
+            by_alias=True,
+            exclude_none=exclude_none,
+            omit_unset_values=omit_unset_values,
+        )
 
     @classmethod
-    def payload_to_event(cls, payload: Dispatch) -> Event:
+    def payload_to_event(cls, payload: Dispatch, *, lazy: bool = False) -> Event:
         EventClass: type[Event] | UnionType | None = event_classes.get(  # noqa: N806
             payload.type, None
         )
@@ -465,10 +1016,13 @@ class Adapter(BaseAdapter, HandleMixin):
                 "WARNING",
                 f"Unknown payload type: {payload.type}, detail: {payload!r}",
             )
-            event = type_validate_python(Event, payload.data)
+            event = _get_event_validator(Event)(payload.data)
             event.__type__ = EventType(payload.type)
             return event
-        return type_validate_python(cast("type[Event]", EventClass), payload.data)
+        validator = _get_event_validator(EventClass)
+        if lazy and (names := lazy_field_names(EventClass)):
+            return validate_lazy(validator, names, payload.data)
+        return validator(payload.data)
 
     @override
     async def _call_api(self, bot: BaseBot, api: str, **data: Any) -> Any:
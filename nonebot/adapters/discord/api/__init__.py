@@ -10,6 +10,7 @@ from .model import (
     ActivityLocation,
     ActivityParty,
     ActivitySecrets,
+    ActivitySend,
     ActivityTimestamps,
     AddLobbyMemberParams,
     AllowedMention,
@@ -366,6 +367,7 @@ __all__ = [
     "ActivityLocation",
     "ActivityParty",
     "ActivitySecrets",
+    "ActivitySend",
     "ActivityTimestamps",
     "ActivityType",
     "AddLobbyMemberParams",
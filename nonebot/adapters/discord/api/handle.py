@@ -1,7 +1,10 @@
+import asyncio
 import base64
 from datetime import datetime, timezone
+from functools import partial
 from http import HTTPStatus
 import json
+import time
 from typing import (
     TYPE_CHECKING,
     Annotated,
@@ -198,12 +201,15 @@ from ..exception import (
     RateLimitException,
     UnauthorizedException,
 )
+from ..ratelimit import RateLimiter
+from ..retry import RetryPolicy
 from ..serialization import (
     encode_json_text,
     encode_model_json_data,
     encode_prepared_request,
 )
-from ..utils import decompress_data, log, omit_unset
+from ..singleflight import SingleFlight
+from ..utils import log, omit_unset
 
 if TYPE_CHECKING:
     from ..bot import Bot
@@ -212,6 +218,9 @@ if TYPE_CHECKING:
 class AdapterProtocol(Protocol):
     base_url: URL
     discord_config: Config
+    rate_limiter: RateLimiter
+    retry_policy: RetryPolicy
+    single_flight: SingleFlight[Response]
 
     @staticmethod
     def get_authorization(bot_info: BotInfo) -> str: ...
@@ -219,6 +228,31 @@ class AdapterProtocol(Protocol):
     async def request(self, setup: Request) -> Response: ...
 
 
+async def _send(adapter: "AdapterProtocol", request: Request) -> Response:
+    policy = adapter.retry_policy
+    deadline = time.monotonic() + policy.deadline
+    attempt = 0
+    while True:
+        ticket = await adapter.rate_limiter.acquire(request)
+        try:
+            data = await adapter.request(request)
+        except BaseException:
+            adapter.rate_limiter.release(ticket, None)
+            raise
+        adapter.rate_limiter.release(ticket, data)
+        delay = policy.delay(request.method, data, attempt)
+        if delay is None or time.monotonic() + delay > deadline:
+            return data
+        log(
+            "DEBUG",
+            f"API {request.method} {request.url.path} returned {data.status_code}, "
+            f"retrying in {delay:.2f}s",
+        )
+        policy.record(data, delay)
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
 async def _request(
     adapter: "AdapterProtocol",
     request: Request,
@@ -228,7 +262,11 @@ async def _request(
     try:
         request.timeout = adapter.discord_config.discord_api_timeout
         request.proxy = adapter.discord_config.discord_proxy
-        data = await adapter.request(request)
+        if request.method == "GET" and adapter.discord_config.discord_api_coalesce_get:
+            key = (request.headers.get("Authorization"), str(request.url))
+            data = await adapter.single_flight.do(key, partial(_send, adapter, request))
+        else:
+            data = await _send(adapter, request)
         log(
             "TRACE",
             f"API code: {data.status_code} response: {escape_tag(str(data.content))}",
@@ -238,11 +276,7 @@ async def _request(
                 return None
             if not parse_json:
                 return data.content
-            return json.loads(
-                decompress_data(
-                    data.content, compress=adapter.discord_config.discord_compress
-                )
-            )
+            return json.loads(data.content)
         if data.status_code in (HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN):
             raise UnauthorizedException(data)  # noqa: TRY301
         if data.status_code == HTTPStatus.TOO_MANY_REQUESTS:
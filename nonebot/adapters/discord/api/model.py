@@ -3238,7 +3238,7 @@ class Identify(BaseModel):
     compress: Missing[bool] = UNSET
     large_threshold: Missing[int] = UNSET
     shard: Missing[list[int]] = UNSET
-    presence: Missing["PresenceUpdate"] = UNSET
+    presence: Missing["UpdatePresence"] = UNSET
     intents: int
 
 
@@ -3273,7 +3273,7 @@ class RequestGuildMembers(BaseModel):
     query: Missing[str] = UNSET
     limit: int
     presences: Missing[bool] = UNSET
-    user_ids: Missing[Snowflake | list[Snowflake]] = UNSET
+    user_ids: Missing[list[Snowflake] | Snowflake] = UNSET
     nonce: Missing[str] = UNSET
 
 
@@ -3293,10 +3293,21 @@ class UpdatePresence(BaseModel):
 
     see https://discord.com/developers/docs/topics/gateway-events#update-presence"""
 
-    since: int | None = Field(...)
-    activities: list["Activity"]
+    since: int | None = None
+    activities: list["ActivitySend"] = Field(default_factory=list)
     status: UpdatePresenceStatusType
-    afk: bool
+    afk: bool = False
+
+
+class ActivitySend(BaseModel):
+    """Activity sent by a bot, which may only set these fields
+
+    see https://discord.com/developers/docs/events/gateway-events#activity-object"""
+
+    name: str
+    type: ActivityType
+    url: MissingOrNullable[str] = UNSET
+    state: MissingOrNullable[str] = UNSET
 
 
 class Hello(BaseModel):
@@ -4629,6 +4640,7 @@ __all__ = [
     "ActivityLocation",
     "ActivityParty",
     "ActivitySecrets",
+    "ActivitySend",
     "ActivityTimestamps",
     "AddLobbyMemberParams",
     "AllowedMention",
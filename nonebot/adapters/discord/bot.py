@@ -1,3 +1,4 @@
+from collections.abc import AsyncIterator
 from http import HTTPStatus
 from typing import TYPE_CHECKING, Any, Literal, NoReturn
 from typing_extensions import override
@@ -15,9 +16,11 @@ from yarl import URL
 
 from .api import (
     UNSET,
+    ActivitySend,
     AllowedMention,
     ApiClient,
     File,
+    GuildMembersChunk,
     InteractionCallbackMessage,
     InteractionCallbackType,
     InteractionResponse,
@@ -26,17 +29,24 @@ from .api import (
     MessageReferenceType,
     Snowflake,
     SnowflakeType,
+    UpdatePresence,
+    UpdatePresenceStatusType,
     User,
     is_not_unset,
 )
 from .config import BotInfo
 from .event import Event, InteractionCreateEvent, MessageEvent
 from .exception import ActionFailed
+from .members import CHUNK_TIMEOUT, GuildMembers
 from .message import Message, MessageSegment, parse_message
 from .utils import log
+from .voice import VOICE_TIMEOUT, VoiceConnection
 
 if TYPE_CHECKING:
     from .adapter import Adapter
+    from .dispatch import EventDispatcher
+    from .gateway import GatewayWebSocket
+    from .presence import PresenceCoalescer
 
 
 DISCORD_ATTACHMENT_HOSTS = {"cdn.discordapp.com", "media.discordapp.net"}
@@ -130,6 +140,12 @@ class Bot(BaseBot, ApiClient):
         self._session_id: str | None = None
         self._self_info: User | None = None
         self._sequence: int | None = None
+        self._latency: float | None = None
+        self.resume_gateway_url: str | None = None
+        self.shard: tuple[int, int] | None = None
+        self.gateway: GatewayWebSocket | None = None
+        self.presence_updater: PresenceCoalescer | None = None
+        self.dispatcher: EventDispatcher | None = None
 
     @override
     def __repr__(self) -> str:
@@ -184,9 +200,111 @@ class Bot(BaseBot, ApiClient):
     def sequence(self, sequence: int) -> None:
         self._sequence = sequence
 
+    @property
+    def latency(self) -> float | None:
+        """最近一次心跳的往返时间 (秒), 尚未收到心跳 ACK 时为 None"""
+        return self._latency
+
+    @latency.setter
+    def latency(self, latency: float) -> None:
+        self._latency = latency
+
     def clear(self) -> None:
         self._session_id = None
         self._sequence = None
+        self.resume_gateway_url = None
+
+    def update_presence(
+        self,
+        status: UpdatePresenceStatusType = UpdatePresenceStatusType.online,
+        activities: list[ActivitySend] | None = None,
+        *,
+        afk: bool = False,
+        since: int | None = None,
+    ) -> None:
+        """更新 Bot 在所有分片上的在线状态 (Gateway opcode 3)
+
+        短时间内的多次更新会被合并, 每个分片在每个间隔内只发送最新的状态。
+        """
+        self._adapter.update_presence(
+            self,
+            UpdatePresence(
+                since=since, activities=activities or [], status=status, afk=afk
+            ),
+        )
+
+    def iter_guild_members(  # noqa: PLR0913
+        self,
+        guild_id: SnowflakeType,
+        *,
+        query: str | None = None,
+        limit: int = 0,
+        presences: bool = False,
+        user_ids: list[SnowflakeType] | None = None,
+        timeout: float = CHUNK_TIMEOUT,
+    ) -> AsyncIterator[GuildMembersChunk]:
+        """通过 Gateway 请求服务器成员, 逐个返回收到的成员分块
+
+        不指定 query 与 user_ids 时请求全部成员 (需要 GUILD_MEMBERS intent)。
+        """
+        return self._adapter.request_guild_members(
+            self,
+            guild_id,
+            query=query,
+            limit=limit,
+            presences=presences,
+            user_ids=user_ids,
+            timeout=timeout,
+        )
+
+    async def request_guild_members(  # noqa: PLR0913
+        self,
+        guild_id: SnowflakeType,
+        *,
+        query: str | None = None,
+        limit: int = 0,
+        presences: bool = False,
+        user_ids: list[SnowflakeType] | None = None,
+        timeout: float = CHUNK_TIMEOUT,
+    ) -> GuildMembers:
+        """通过 Gateway 请求服务器成员, 返回合并后的全部分块
+
+        对大型服务器比分页调用 list_guild_members 快得多。
+        """
+        result = GuildMembers()
+        async for chunk in self.iter_guild_members(
+            guild_id,
+            query=query,
+            limit=limit,
+            presences=presences,
+            user_ids=user_ids,
+            timeout=timeout,
+        ):
+            result.add(chunk)
+        return result
+
+    async def update_voice_state(
+        self,
+        guild_id: SnowflakeType,
+        channel_id: SnowflakeType | None,
+        *,
+        self_mute: bool = False,
+        self_deaf: bool = False,
+        timeout: float = VOICE_TIMEOUT,
+    ) -> VoiceConnection:
+        """加入、移动或离开 (channel_id 为 None) 语音频道
+
+        等待 Bot 自身的 VOICE_STATE_UPDATE 与 VOICE_SERVER_UPDATE 都到达后返回,
+        其中的 session_id、endpoint 与 token 可用于连接语音网关。
+        """
+        return await self._adapter.update_voice_state(
+            self,
+            guild_id,
+            channel_id,
+            self_mute=self_mute,
+            self_deaf=self_deaf,
+            timeout=timeout,
+        )
 
     async def handle_event(self, event: Event) -> None:
         if isinstance(event, MessageEvent):
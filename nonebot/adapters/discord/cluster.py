@@ -0,0 +1,253 @@
+import asyncio
+from collections.abc import Sequence
+import contextlib
+import hashlib
+import hmac
+import json
+import os
+from pathlib import Path
+import secrets
+import sys
+from typing import Any
+
+from nonebot.compat import type_validate_python
+
+from .api.model import GatewayBot
+from .config import BotInfo
+from .identify import IdentifyLimiter
+from .utils import log, model_dump
+
+WORKER_RESTART_DELAY = 5.0
+WORKER_MODULE = "nonebot.adapters.discord.worker"
+
+
+def worker_command() -> list[str]:
+    """The default command of worker processes, see :mod:`.worker`."""
+    return [sys.executable, "-m", WORKER_MODULE]
+
+
+def identify_key(token: str) -> str:
+    """Identify a bot token over IPC without sending the token itself."""
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+
+def split_shards(shard_count: int, workers: int) -> list[tuple[int, int]]:
+    """Split ``range(shard_count)`` into ``workers`` contiguous ranges."""
+    size, extra = divmod(shard_count, workers)
+    ranges = []
+    start = 0
+    for index in range(workers):
+        stop = start + size + (index < extra)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def worker_session_file(path: str | os.PathLike[str], index: int) -> Path:
+    """The session file of the worker ``index``, next to ``path``."""
+    path = Path(path)
+    return path.with_name(f"{path.stem}.worker{index}{path.suffix}")
+
+
+async def _request(address: str, message: dict[str, Any]) -> dict[str, Any]:
+    host, port = address.rsplit(":", 1)
+    reader, writer = await asyncio.open_connection(host, int(port))
+    try:
+        writer.write(json.dumps(message).encode() + b"\n")
+        await writer.drain()
+        line = await reader.readline()
+    finally:
+        writer.close()
+        with contextlib.suppress(Exception):
+            await writer.wait_closed()
+    if not line:
+        msg = f"Cluster coordinator {address} closed the connection"
+        raise ConnectionError(msg)
+    response = json.loads(line)
+    if "error" in response:
+        raise RuntimeError(response["error"])
+    return response
+
+
+class RemoteIdentifyLimiter:
+    """Acquire identify slots from the cluster coordinator of this worker."""
+
+    def __init__(self, address: str, key: str, secret: str) -> None:
+        self.address = address
+        self.key = key
+        self.secret = secret
+
+    async def gateway(self) -> tuple[str, int]:
+        """Get the gateway url and shard count fetched by the coordinator."""
+        response = await self._request({"op": "gateway"})
+        return response["url"], response["shards"]
+
+    async def acquire(self, shard_id: int) -> None:
+        await self._request({"op": "identify", "shard": shard_id})
+
+    async def _request(self, message: dict[str, Any]) -> dict[str, Any]:
+        return await _request(
+            self.address, {**message, "key": self.key, "secret": self.secret}
+        )
+
+
+class ClusterCoordinator:
+    """Run the shards of all bots in worker processes.
+
+    The coordinator fetches ``gateway/bot`` once per bot, splits the shards into
+    ``shard_range`` slices and starts one worker process per slice with it in
+    ``DISCORD_BOTS``. Workers pace their identifies through a local TCP server, so
+    ``max_concurrency`` holds across processes. Every request must carry the
+    secret the coordinator hands to its workers, other local processes can not
+    use the server.
+
+    :class:`.session.FileSessionStore` keeps the whole file of one process in
+    memory, so with ``session_file`` each worker gets a file of its own, see
+    :func:`worker_session_file`.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        *,
+        host: str = "127.0.0.1",
+        session_file: str | os.PathLike[str] | None = None,
+    ) -> None:
+        self.workers = workers
+        self.host = host
+        self.session_file = session_file
+        self.secret = secrets.token_hex(16)
+        self.bots: list[tuple[BotInfo, GatewayBot]] = []
+        self.limiters: dict[str, IdentifyLimiter] = {}
+        self.gateways: dict[str, GatewayBot] = {}
+        self.address: str | None = None
+        self.processes: dict[int, asyncio.subprocess.Process] = {}
+        self._server: asyncio.Server | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._stopping = False
+
+    def add_bot(self, bot_info: BotInfo, gateway: GatewayBot) -> None:
+        key = identify_key(bot_info.token)
+        self.bots.append((bot_info, gateway))
+        self.gateways[key] = gateway
+        self.limiters[key] = IdentifyLimiter.from_session_start_limit(
+            gateway.session_start_limit
+        )
+
+    def worker_bots(self, index: int) -> list[BotInfo]:
+        """The bots and shard ranges the worker ``index`` should run."""
+        bots = []
+        for bot_info, gateway in self.bots:
+            if bot_info.shard is not None:
+                if index == 0:
+                    bots.append(bot_info)
+                continue
+            shard_count = bot_info.shard_count or gateway.shards or 1
+            start, stop = split_shards(shard_count, self.workers)[index]
+            if start == stop:
+                continue
+            bots.append(
+                type_validate_python(
+                    BotInfo,
+                    {
+                        **model_dump(bot_info, exclude_unset=True),
+                        "shard_range": (start, stop),
+                        "shard_count": shard_count,
+                    },
+                )
+            )
+        return bots
+
+    def worker_env(self, index: int) -> dict[str, str]:
+        env = {
+            **os.environ,
+            "DISCORD_BOTS": json.dumps(
+                [
+                    model_dump(bot_info, exclude_unset=True)
+                    for bot_info in self.worker_bots(index)
+                ]
+            ),
+            "DISCORD_CLUSTER_WORKERS": "0",
+            "DISCORD_CLUSTER_COORDINATOR": self.address or "",
+            "DISCORD_CLUSTER_SECRET": self.secret,
+        }
+        if self.session_file is not None:
+            env["DISCORD_SESSION_FILE"] = str(
+                worker_session_file(self.session_file, index)
+            )
+        return env
+
+    async def start(self, command: Sequence[str] | None = None) -> None:
+        """Start the IPC server and the worker processes.
+
+        Workers run ``command``, by default :func:`worker_command`.
+        """
+        self._server = await asyncio.start_server(self._handle, self.host, 0)
+        port = self._server.sockets[0].getsockname()[1]
+        self.address = f"{self.host}:{port}"
+        log("INFO", f"Cluster coordinator listening on {self.address}")
+        command = list(command) if command is not None else worker_command()
+        for index in range(self.workers):
+            task = asyncio.create_task(self._run_worker(index, command))
+            task.add_done_callback(self._tasks.discard)
+            self._tasks.add(task)
+
+    async def stop(self) -> None:
+        self._stopping = True
+        for process in self.processes.values():
+            if process.returncode is None:
+                process.terminate()
+        for process in self.processes.values():
+            with contextlib.suppress(Exception):
+                await process.wait()
+        for task in self._tasks:
+            task.cancel()
+        if self._server is not None:
+            self._server.close()
+
+    async def _run_worker(self, index: int, command: Sequence[str]) -> None:
+        while not self._stopping:
+            process = await asyncio.create_subprocess_exec(
+                *command, env=self.worker_env(index)
+            )
+            self.processes[index] = process
+            log("INFO", f"Started cluster worker {index} (pid {process.pid})")
+            code = await process.wait()
+            if self._stopping:
+                return
+            log(
+                "WARNING",
+                f"Cluster worker {index} exited with code {code}, restarting in "
+                f"{WORKER_RESTART_DELAY:.0f}s",
+            )
+            await asyncio.sleep(WORKER_RESTART_DELAY)
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            message = json.loads(await reader.readline())
+            response = await self._respond(message)
+        except Exception as e:
+            response = {"error": repr(e)}
+        writer.write(json.dumps(response).encode() + b"\n")
+        with contextlib.suppress(Exception):
+            await writer.drain()
+            writer.close()
+
+    async def _respond(self, message: dict[str, Any]) -> dict[str, Any]:
+        if not hmac.compare_digest(str(message.get("secret", "")), self.secret):
+            msg = "Invalid cluster secret"
+            raise PermissionError(msg)
+        key = message["key"]
+        if key not in self.gateways:
+            msg = f"Unknown bot {key}"
+            raise KeyError(msg)
+        if message["op"] == "gateway":
+            gateway = self.gateways[key]
+            return {"url": gateway.url, "shards": gateway.shards}
+        if message["op"] == "identify":
+            await self.limiters[key].acquire(message["shard"])
+            return {}
+        msg = f"Unknown op {message['op']}"
+        raise ValueError(msg)
@@ -0,0 +1,112 @@
+import importlib
+from types import ModuleType
+from typing import Any, Literal, TypeAlias
+import zlib
+
+
+def _optional_module(name: str) -> ModuleType | None:
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+# Python 3.14+
+_zstd = _optional_module("compression.zstd")
+# optional third-party binding, not a declared dependency
+_zstandard = _optional_module("zstandard")
+
+CompressMode: TypeAlias = Literal["zlib-stream", "zstd-stream"]
+
+ZLIB_SUFFIX = b"\x00\x00\xff\xff"
+
+
+class ZlibStreamDecompressor:
+    """Inflater for ``compress=zlib-stream`` gateway transport compression.
+
+    Discord shares one zlib context across the whole connection and may split a
+    message over several frames; a message is complete once the received data ends
+    with the ``Z_SYNC_FLUSH`` suffix. Use one instance per connection and call
+    :meth:`reset` whenever a new connection is established.
+
+    see https://discord.com/developers/docs/events/gateway#zlibstream
+    """
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._inflator = zlib.decompressobj()
+
+    def reset(self) -> None:
+        self._buffer.clear()
+        self._inflator = zlib.decompressobj()
+
+    def decompress(self, data: bytes) -> bytes | None:
+        """Feed one frame, return the inflated message once it is complete."""
+        if not self._buffer and data.endswith(ZLIB_SUFFIX):
+            # the common case: a whole message in a single frame, skip buffering
+            return self._inflator.decompress(data)
+        self._buffer += data
+        if not self._buffer.endswith(ZLIB_SUFFIX):
+            return None
+        try:
+            return self._inflator.decompress(self._buffer)
+        finally:
+            self._buffer.clear()
+
+
+class ZstdStreamDecompressor:
+    """Decompressor for ``compress=zstd-stream`` gateway transport compression.
+
+    The whole connection is a single zstd frame and every message is flushed at a
+    block boundary, so each websocket frame decompresses to exactly one message.
+    Requires Python 3.14+ or the ``zstandard`` package.
+
+    see https://discord.com/developers/docs/events/gateway#zstdstream
+    """
+
+    def __init__(self) -> None:
+        self._decompressor = self._create()
+
+    @staticmethod
+    def _create() -> Any:  # noqa: ANN401
+        if _zstd is not None:
+            return _zstd.ZstdDecompressor()
+        if _zstandard is not None:
+            return _zstandard.ZstdDecompressor().decompressobj()
+        msg = "zstd-stream requires Python 3.14+ or the zstandard package"
+        raise RuntimeError(msg)
+
+    def reset(self) -> None:
+        self._decompressor = self._create()
+
+    def decompress(self, data: bytes) -> bytes | None:
+        """Feed one frame, return the decompressed message."""
+        return self._decompressor.decompress(data)
+
+
+Decompressor: TypeAlias = ZlibStreamDecompressor | ZstdStreamDecompressor
+
+
+def zstd_available() -> bool:
+    return _zstd is not None or _zstandard is not None
+
+
+def resolve_compress_mode(*, compress: bool | CompressMode) -> CompressMode | None:
+    """Map the ``discord_compress`` option to the transport compression to use.
+
+    ``True`` means ``zlib-stream``; ``zstd-stream`` falls back to ``zlib-stream``
+    when no zstd binding is installed.
+    """
+    if not compress:
+        return None
+    if compress == "zstd-stream" and zstd_available():
+        return "zstd-stream"
+    return "zlib-stream"
+
+
+def create_decompressor(mode: CompressMode | None) -> Decompressor | None:
+    if mode is None:
+        return None
+    if mode == "zstd-stream":
+        return ZstdStreamDecompressor()
+    return ZlibStreamDecompressor()
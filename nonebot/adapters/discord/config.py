@@ -1,11 +1,17 @@
-from typing import Literal
+from pathlib import Path
+from typing import Any, Literal
 
+from nonebot.compat import field_validator
 from pydantic import BaseModel, Field
 
-from .api import Snowflake
+from .api import Snowflake, UpdatePresence
+from .compress import CompressMode
+from .dispatch import OverflowPolicy
 
 
 class Intents(BaseModel):
+    auto: bool = False
+    """Derive the intents from the registered matchers"""
     guilds: bool = True
     guild_members: bool = False
     guild_moderation: bool = True
@@ -57,16 +63,49 @@ class Intents(BaseModel):
 class BotInfo(BaseModel):
     token: str
     shard: tuple[int, int] | None = None
+    shard_range: tuple[int, int] | None = None
+    shard_count: int | None = None
+    presence: UpdatePresence | None = None
     intent: Intents = Field(default_factory=Intents)
     application_commands: dict[str, list[Literal["*"] | Snowflake]] = Field(
         default_factory=dict
     )
 
+    @field_validator("intent", mode="before")
+    @classmethod
+    def _auto_intent(cls, value: Any) -> Any:  # noqa: ANN401
+        return {"auto": True} if value == "auto" else value
+
 
 class Config(BaseModel):
     discord_bots: list[BotInfo] = Field(default_factory=list)
-    discord_compress: bool = False
+    discord_compress: bool | CompressMode = False
+    discord_encoding: Literal["json", "etf"] = "json"
+    discord_skip_unhandled_events: bool = False
+    discord_lazy_events: bool = False
+    discord_dispatch_workers: int = 0
+    discord_dispatch_queue_size: int = 1000
+    discord_dispatch_overflow: OverflowPolicy = "block"
+    discord_dispatch_ordered: bool = False
+    discord_dispatch_low_priority_events: set[str] = Field(
+        default_factory=lambda: {"TYPING_START", "PRESENCE_UPDATE"}
+    )
+    discord_reconnect_base_delay: float = 1.0
+    discord_reconnect_max_delay: float = 60.0
+    discord_session_file: Path | None = None
+    discord_session_save_interval: float = 30.0
+    discord_cluster_workers: int = 0
+    discord_cluster_coordinator: str | None = None
+    discord_cluster_secret: str = ""
+    discord_cluster_worker_command: list[str] | None = None
+    discord_record_file: Path | None = None
+    discord_event_allowlist: set[str] = Field(default_factory=set)
+    discord_event_denylist: set[str] = Field(default_factory=set)
     discord_api_version: int = 10
     discord_api_timeout: float = 30.0
+    discord_api_max_retries: int = 3
+    discord_api_retry_deadline: float = 60.0
+    discord_global_rate_limit: int = 50
+    discord_api_coalesce_get: bool = False
     discord_handle_self_message: bool = False
     discord_proxy: str | None = None
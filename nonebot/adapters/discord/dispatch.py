@@ -0,0 +1,157 @@
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Literal, TypeAlias
+
+from .event import Event
+from .utils import log
+
+OverflowPolicy: TypeAlias = Literal["block", "drop_oldest", "shed"]
+
+
+def _lane_key(event: Event) -> int | None:
+    """The channel, or else the guild, an event belongs to."""
+    for name in ("channel_id", "guild_id"):
+        value = getattr(event, name, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+class EventDispatcher:
+    """Bounded event queue drained by a fixed pool of workers.
+
+    With ``ordered`` enabled every worker owns a serial lane and events are
+    hashed onto lanes by ``channel_id`` (falling back to ``guild_id``), so events
+    of one channel are handled one at a time and in gateway order while other
+    lanes run concurrently. Events with neither are spread over the lanes.
+
+    When the queue is full, ``overflow`` decides what happens to a new event:
+
+    - ``block``: wait for room, which stops reading from the gateway until the
+      workers catch up (heartbeats are still sent, and unread ACKs do not mark
+      the connection as zombied meanwhile);
+    - ``drop_oldest``: discard the oldest queued ``low_priority`` event, or the new
+      event itself if it is low priority, and otherwise block;
+    - ``shed``: discard the new event.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        handler: Callable[[Event], Awaitable[None]],
+        *,
+        workers: int,
+        max_size: int,
+        overflow: OverflowPolicy = "block",
+        low_priority: Iterable[str] = (),
+        ordered: bool = False,
+    ) -> None:
+        if workers < 1 or max_size < 1:
+            msg = "dispatcher needs at least one worker and a positive queue size"
+            raise ValueError(msg)
+        self.handler = handler
+        self.workers = workers
+        self.max_size = max_size
+        self.overflow: OverflowPolicy = overflow
+        self.low_priority = frozenset(low_priority)
+        self.dropped = 0
+        self.max_depth = 0
+        self._lanes: list[deque[tuple[str, Event]]] = [
+            deque() for _ in range(workers if ordered else 1)
+        ]
+        self._size = 0
+        self._next_lane = 0
+        lock = asyncio.Lock()
+        self._not_empty = [asyncio.Condition(lock) for _ in self._lanes]
+        self._not_full = asyncio.Condition(lock)
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def ordered(self) -> bool:
+        return len(self._lanes) > 1
+
+    @property
+    def depth(self) -> int:
+        """Number of events waiting for a worker."""
+        return self._size
+
+    @property
+    def full(self) -> bool:
+        """Whether :meth:`put` may have to wait for room."""
+        return self._size >= self.max_size
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self) -> set[asyncio.Task]:
+        """Start the workers (if not running) and return their tasks."""
+        if not self._tasks:
+            self._tasks = {
+                asyncio.create_task(self._work(index % len(self._lanes)))
+                for index in range(self.workers)
+            }
+        return self._tasks
+
+    def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+
+    async def put(self, event_type: str, event: Event) -> bool:
+        """Queue an event, return ``False`` if the overflow policy dropped it."""
+        async with self._not_full:
+            while self._size >= self.max_size:
+                if self.overflow == "shed":
+                    return self._drop(event_type)
+                if self.overflow == "drop_oldest":
+                    if self._evict_low_priority():
+                        break
+                    if event_type in self.low_priority:
+                        return self._drop(event_type)
+                await self._not_full.wait()
+            lane = self._lane_of(event)
+            self._lanes[lane].append((event_type, event))
+            self._size += 1
+            self.max_depth = max(self.max_depth, self._size)
+            self._not_empty[lane].notify()
+        return True
+
+    def _lane_of(self, event: Event) -> int:
+        if len(self._lanes) == 1:
+            return 0
+        key = _lane_key(event)
+        if key is None:
+            self._next_lane = (self._next_lane + 1) % len(self._lanes)
+            return self._next_lane
+        return key % len(self._lanes)
+
+    def _drop(self, event_type: str) -> bool:
+        self.dropped += 1
+        log("DEBUG", f"Dispatch queue is full, dropped {event_type} event")
+        return False
+
+    def _evict_low_priority(self) -> bool:
+        for queue in self._lanes:
+            for index, (event_type, _) in enumerate(queue):
+                if event_type in self.low_priority:
+                    del queue[index]
+                    self._size -= 1
+                    self._drop(event_type)
+                    return True
+        return False
+
+    async def _work(self, lane: int) -> None:
+        queue = self._lanes[lane]
+        not_empty = self._not_empty[lane]
+        while True:
+            async with not_empty:
+                while not queue:
+                    await not_empty.wait()
+                _, event = queue.popleft()
+                self._size -= 1
+                self._not_full.notify()
+            try:
+                await self.handler(event)
+            except Exception as e:
+                log("ERROR", f"Error while handling event {event!r}", e)
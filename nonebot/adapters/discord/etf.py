@@ -0,0 +1,257 @@
+"""Erlang External Term Format codec for the ``encoding=etf`` gateway mode.
+
+Decoding produces the same shapes as the JSON gateway: maps become ``dict`` with
+``str`` keys, binaries become ``str`` and the ``nil``/``true``/``false`` atoms become
+``None``/``True``/``False``. Big integers (snowflakes) become ``str`` as well, like the
+64-bit ids of the JSON gateway, so the models validate both encodings alike.
+
+see https://discord.com/developers/docs/topics/gateway#encoding-and-compression
+"""
+
+from collections.abc import Callable
+import struct
+from typing import Any
+import zlib
+
+FORMAT_VERSION = 131
+
+NEW_FLOAT_EXT = 70
+COMPRESSED = 80
+SMALL_INTEGER_EXT = 97
+INTEGER_EXT = 98
+FLOAT_EXT = 99
+ATOM_EXT = 100
+SMALL_TUPLE_EXT = 104
+LARGE_TUPLE_EXT = 105
+NIL_EXT = 106
+STRING_EXT = 107
+LIST_EXT = 108
+BINARY_EXT = 109
+SMALL_BIG_EXT = 110
+LARGE_BIG_EXT = 111
+MAP_EXT = 116
+SMALL_ATOM_EXT = 115
+ATOM_UTF8_EXT = 118
+SMALL_ATOM_UTF8_EXT = 119
+
+_ATOMS: dict[str, Any] = {"nil": None, "true": True, "false": False}
+_NIL = bytes((SMALL_ATOM_UTF8_EXT, 3)) + b"nil"
+_TRUE = bytes((SMALL_ATOM_UTF8_EXT, 4)) + b"true"
+_FALSE = bytes((SMALL_ATOM_UTF8_EXT, 5)) + b"false"
+
+_unpack_int = struct.Struct(">i").unpack_from
+_unpack_uint = struct.Struct(">I").unpack_from
+_unpack_ushort = struct.Struct(">H").unpack_from
+_unpack_double = struct.Struct(">d").unpack_from
+
+
+class ETFDecodeError(ValueError):
+    pass
+
+
+class _Decoder:
+    __slots__ = ("data", "pos")
+
+    def __init__(self, data: bytes, pos: int = 0) -> None:
+        self.data = data
+        self.pos = pos
+
+    def term(self) -> Any:  # noqa: ANN401
+        tag = self.data[self.pos]
+        self.pos += 1
+        try:
+            decode = _DECODERS[tag]
+        except KeyError:
+            msg = f"unsupported ETF tag {tag} at offset {self.pos - 1}"
+            raise ETFDecodeError(msg) from None
+        return decode(self)
+
+    def _take(self, size: int) -> bytes:
+        start = self.pos
+        self.pos += size
+        if self.pos > len(self.data):
+            msg = "unexpected end of ETF data"
+            raise ETFDecodeError(msg)
+        return self.data[start : self.pos]
+
+    def small_integer_ext(self) -> int:
+        value = self.data[self.pos]
+        self.pos += 1
+        return value
+
+    def integer_ext(self) -> int:
+        (value,) = _unpack_int(self.data, self.pos)
+        self.pos += 4
+        return value
+
+    def new_float_ext(self) -> float:
+        (value,) = _unpack_double(self.data, self.pos)
+        self.pos += 8
+        return value
+
+    def float_ext(self) -> float:
+        return float(self._take(31).rstrip(b"\x00"))
+
+    def _atom_value(self, size: int) -> Any:  # noqa: ANN401
+        name = self._take(size).decode()
+        return _ATOMS.get(name, name)
+
+    def atom_ext(self) -> Any:  # noqa: ANN401
+        (size,) = _unpack_ushort(self.data, self.pos)
+        self.pos += 2
+        return self._atom_value(size)
+
+    def small_atom_ext(self) -> Any:  # noqa: ANN401
+        size = self.data[self.pos]
+        self.pos += 1
+        return self._atom_value(size)
+
+    def small_tuple_ext(self) -> list[Any]:
+        arity = self.data[self.pos]
+        self.pos += 1
+        return [self.term() for _ in range(arity)]
+
+    def large_tuple_ext(self) -> list[Any]:
+        (arity,) = _unpack_uint(self.data, self.pos)
+        self.pos += 4
+        return [self.term() for _ in range(arity)]
+
+    def string_ext(self) -> str:
+        (size,) = _unpack_ushort(self.data, self.pos)
+        self.pos += 2
+        return self._take(size).decode("latin-1")
+
+    def list_ext(self) -> list[Any]:
+        (length,) = _unpack_uint(self.data, self.pos)
+        self.pos += 4
+        items = [self.term() for _ in range(length)]
+        tail = self.term()
+        if tail != []:
+            msg = "improper ETF lists are not supported"
+            raise ETFDecodeError(msg)
+        return items
+
+    def binary_ext(self) -> str:
+        (size,) = _unpack_uint(self.data, self.pos)
+        self.pos += 4
+        return self._take(size).decode()
+
+    def _big(self, size: int) -> str:
+        sign = self.data[self.pos]
+        self.pos += 1
+        value = int.from_bytes(self._take(size), "little")
+        return str(-value if sign else value)
+
+    def small_big_ext(self) -> str:
+        size = self.data[self.pos]
+        self.pos += 1
+        return self._big(size)
+
+    def large_big_ext(self) -> str:
+        (size,) = _unpack_uint(self.data, self.pos)
+        self.pos += 4
+        return self._big(size)
+
+    def map_ext(self) -> dict[Any, Any]:
+        (arity,) = _unpack_uint(self.data, self.pos)
+        self.pos += 4
+        term = self.term
+        result = {}
+        for _ in range(arity):
+            key = term()
+            result[key] = term()
+        return result
+
+
+_DECODERS: dict[int, Callable[[_Decoder], Any]] = {
+    NEW_FLOAT_EXT: _Decoder.new_float_ext,
+    SMALL_INTEGER_EXT: _Decoder.small_integer_ext,
+    INTEGER_EXT: _Decoder.integer_ext,
+    FLOAT_EXT: _Decoder.float_ext,
+    ATOM_EXT: _Decoder.atom_ext,
+    SMALL_ATOM_EXT: _Decoder.small_atom_ext,
+    ATOM_UTF8_EXT: _Decoder.atom_ext,
+    SMALL_ATOM_UTF8_EXT: _Decoder.small_atom_ext,
+    SMALL_TUPLE_EXT: _Decoder.small_tuple_ext,
+    LARGE_TUPLE_EXT: _Decoder.large_tuple_ext,
+    NIL_EXT: lambda _: [],
+    STRING_EXT: _Decoder.string_ext,
+    LIST_EXT: _Decoder.list_ext,
+    BINARY_EXT: _Decoder.binary_ext,
+    SMALL_BIG_EXT: _Decoder.small_big_ext,
+    LARGE_BIG_EXT: _Decoder.large_big_ext,
+    MAP_EXT: _Decoder.map_ext,
+}
+
+
+def decode(data: bytes) -> Any:  # noqa: ANN401
+    """Decode one ETF encoded term."""
+    if not data or data[0] != FORMAT_VERSION:
+        msg = "ETF data must start with the format version byte"
+        raise ETFDecodeError(msg)
+    if len(data) > 1 and data[1] == COMPRESSED:
+        data = bytes([FORMAT_VERSION]) + zlib.decompress(data[6:])
+    return _Decoder(data, 1).term()
+
+
+def _encode_term(value: Any, out: bytearray) -> None:  # noqa: ANN401, C901, PLR0912
+    if value is None:
+        out += _NIL
+    elif value is True:
+        out += _TRUE
+    elif value is False:
+        out += _FALSE
+    elif isinstance(value, int):
+        if 0 <= value <= 0xFF:  # noqa: PLR2004
+            out.append(SMALL_INTEGER_EXT)
+            out.append(value)
+        elif -(2**31) <= value < 2**31:
+            out.append(INTEGER_EXT)
+            out += struct.pack(">i", value)
+        else:
+            magnitude = abs(value)
+            digits = magnitude.to_bytes((magnitude.bit_length() + 7) // 8, "little")
+            if len(digits) > 0xFF:  # noqa: PLR2004
+                msg = "integer too large for ETF encoding"
+                raise ValueError(msg)
+            out.append(SMALL_BIG_EXT)
+            out.append(len(digits))
+            out.append(1 if value < 0 else 0)
+            out += digits
+    elif isinstance(value, float):
+        out.append(NEW_FLOAT_EXT)
+        out += struct.pack(">d", value)
+    elif isinstance(value, str):
+        encoded = value.encode()
+        out.append(BINARY_EXT)
+        out += struct.pack(">I", len(encoded))
+        out += encoded
+    elif isinstance(value, (bytes, bytearray)):
+        out.append(BINARY_EXT)
+        out += struct.pack(">I", len(value))
+        out += value
+    elif isinstance(value, dict):
+        out.append(MAP_EXT)
+        out += struct.pack(">I", len(value))
+        for key, item in value.items():
+            _encode_term(key, out)
+            _encode_term(item, out)
+    elif isinstance(value, (list, tuple)):
+        if not value:
+            out.append(NIL_EXT)
+            return
+        out.append(LIST_EXT)
+        out += struct.pack(">I", len(value))
+        for item in value:
+            _encode_term(item, out)
+        out.append(NIL_EXT)
+    else:
+        msg = f"cannot encode {type(value).__name__} as ETF"
+        raise TypeError(msg)
+
+
+def encode(value: Any) -> bytes:  # noqa: ANN401
+    """Encode JSON-like data as ETF, strings are sent as binaries."""
+    out = bytearray([FORMAT_VERSION])
+    _encode_term(value, out)
+    return bytes(out)
@@ -107,6 +107,7 @@ from .api.models import (
     PingInteractionCreatePayload,
 )
 from .api.types import UNSET, Missing, is_unset
+from .lazy import LazyFieldsMixin
 from .message import Message
 from .utils import log, model_dump
 
@@ -398,12 +399,13 @@ class HelloEvent(MetaEvent):
     heartbeat_interval: int
 
 
-class ReadyEvent(MetaEvent, Ready):
+class ReadyEvent(LazyFieldsMixin, MetaEvent, Ready):
     """Ready event
 
     see https://discord.com/developers/docs/topics/gateway-events#ready"""
 
     __type__ = EventType.READY
+    __lazy_fields__ = ("guilds",)
 
 
 class ResumedEvent(MetaEvent):
@@ -551,12 +553,13 @@ class ThreadDeleteEvent(ThreadEvent, ThreadDelete):
     __type__ = EventType.THREAD_DELETE
 
 
-class ThreadListSyncEvent(ThreadEvent, ThreadListSync):
+class ThreadListSyncEvent(LazyFieldsMixin, ThreadEvent, ThreadListSync):
     """Thread list sync event
 
     see https://discord.com/developers/docs/topics/gateway-events#thread-list-sync"""
 
     __type__ = EventType.THREAD_LIST_SYNC
+    __lazy_fields__ = ("threads", "members")
 
 
 class ThreadMemberUpdateEvent(ThreadEvent, ThreadMemberUpdate):
@@ -603,12 +606,22 @@ class GuildEvent(NoticeEvent):
     see https://discord.com/developers/docs/topics/gateway-events#guilds"""
 
 
-class GuildCreateEvent(GuildEvent, GuildCreate):
+class GuildCreateEvent(LazyFieldsMixin, GuildEvent, GuildCreate):
     """Guild create event
 
     see https://discord.com/developers/docs/topics/gateway-events#guild-create"""
 
     __type__ = EventType.GUILD_CREATE
+    __lazy_fields__ = (
+        "emojis",
+        "stickers",
+        "voice_states",
+        "members",
+        "threads",
+        "presences",
+        "stage_instances",
+        "guild_scheduled_events",
+    )
 
 
 class GuildCreateCompatEvent(GuildEvent, GuildCreateCompat):
@@ -714,12 +727,13 @@ class GuildMemberUpdateEvent(GuildEvent, GuildMemberUpdate):
     __type__ = EventType.GUILD_MEMBER_UPDATE
 
 
-class GuildMembersChunkEvent(GuildEvent, GuildMembersChunk):
+class GuildMembersChunkEvent(LazyFieldsMixin, GuildEvent, GuildMembersChunk):
     """Guild members chunk event
 
     see https://discord.com/developers/docs/topics/gateway-events#guild-members-chunk"""
 
     __type__ = EventType.GUILD_MEMBERS_CHUNK
+    __lazy_fields__ = ("members", "presences")
 
 
 class GuildRoleCreateEvent(GuildEvent, GuildRoleCreate):
@@ -0,0 +1,197 @@
+import asyncio
+from collections import deque
+from collections.abc import Iterator
+import contextlib
+import time
+from typing_extensions import override
+
+from nonebot.drivers import WebSocket
+
+from .compress import Decompressor
+
+GATEWAY_SEND_LIMIT = 120
+GATEWAY_SEND_WINDOW = 60.0
+HEARTBEAT_RESERVED_SENDS = 5
+
+
+class GatewaySendLimiter:
+    """Keep one connection under the gateway send rate limit.
+
+    Discord closes the connection with ``4008`` when more than ``limit`` payloads
+    are sent in ``window`` seconds. Every send takes a token that comes back
+    ``window`` seconds later; ``reserved`` tokens are only for priority sends
+    (heartbeats), so a burst of other payloads can never starve them.
+
+    see https://discord.com/developers/docs/events/gateway#rate-limiting
+    """
+
+    def __init__(
+        self,
+        limit: int = GATEWAY_SEND_LIMIT,
+        window: float = GATEWAY_SEND_WINDOW,
+        reserved: int = HEARTBEAT_RESERVED_SENDS,
+    ) -> None:
+        if not 0 <= reserved < limit:
+            msg = "reserved sends must be less than the limit"
+            raise ValueError(msg)
+        self.limit = limit
+        self.window = window
+        self.reserved = reserved
+        self._sent: deque[float] = deque()
+        self._lock = asyncio.Lock()
+        self._priority_lock = asyncio.Lock()
+
+    @property
+    def available(self) -> int:
+        """Tokens left for regular sends right now."""
+        self._expire(time.monotonic())
+        return max(self.limit - self.reserved - len(self._sent), 0)
+
+    def _expire(self, now: float) -> None:
+        while self._sent and self._sent[0] <= now - self.window:
+            self._sent.popleft()
+
+    async def acquire(self, *, priority: bool = False) -> None:
+        """Wait for a send token, in order with other sends of the same kind."""
+        capacity = self.limit if priority else self.limit - self.reserved
+        async with self._priority_lock if priority else self._lock:
+            while True:
+                now = time.monotonic()
+                self._expire(now)
+                if len(self._sent) < capacity:
+                    self._sent.append(now)
+                    return
+                await asyncio.sleep(
+                    self._sent[len(self._sent) - capacity] + self.window - now
+                )
+
+
+class GatewayWebSocket(WebSocket):
+    """Gateway connection wrapper that hides transport compression.
+
+    Each :meth:`receive` returns one complete (decompressed) gateway message,
+    however many websocket frames it was sent in. Sends wait for the connection's
+    :class:`GatewaySendLimiter` when one is given. It also tracks whether the last
+    heartbeat of the connection was acknowledged, and whether the connection was
+    being read at all while waiting for that acknowledgement.
+    """
+
+    def __init__(
+        self,
+        ws: WebSocket,
+        decompressor: Decompressor | None = None,
+        limiter: GatewaySendLimiter | None = None,
+        shard: tuple[int, int] | None = None,
+    ) -> None:
+        super().__init__(request=ws.request)
+        self.ws = ws
+        self.shard = shard
+        self.decompressor = decompressor
+        self.limiter = limiter
+        self.heartbeat_acked = True
+        self._heartbeat_sent_at: float | None = None
+        self._reading_paused = False
+        self._reading_resumed_at: float | None = None
+
+    @override
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.ws!r})"
+
+    def heartbeat_sent(self) -> None:
+        self.heartbeat_acked = False
+        self._heartbeat_sent_at = time.monotonic()
+
+    def heartbeat_ack(self) -> float | None:
+        """Mark the last heartbeat acknowledged, return its round trip time."""
+        self.heartbeat_acked = True
+        if self._heartbeat_sent_at is None:
+            return None
+        latency = time.monotonic() - self._heartbeat_sent_at
+        self._heartbeat_sent_at = None
+        return latency
+
+    @contextlib.contextmanager
+    def reading_paused(self) -> Iterator[None]:
+        """Mark that no frames are read, e.g. while dispatch waits for room.
+
+        A heartbeat ACK cannot be seen during the pause, so it does not count
+        towards :attr:`zombied`.
+        """
+        self._reading_paused = True
+        try:
+            yield
+        finally:
+            self._reading_paused = False
+            self._reading_resumed_at = time.monotonic()
+
+    @property
+    def zombied(self) -> bool:
+        """Whether the last heartbeat went unacknowledged while frames were read.
+
+        When reading was paused after the heartbeat was sent, its ACK may still
+        be buffered, so the connection gets another interval to catch up.
+        """
+        if self.heartbeat_acked or self._reading_paused:
+            return False
+        return (
+            self._reading_resumed_at is None
+            or self._heartbeat_sent_at is None
+            or self._reading_resumed_at < self._heartbeat_sent_at
+        )
+
+    @property
+    @override
+    def closed(self) -> bool:
+        return self.ws.closed
+
+    @override
+    async def accept(self) -> None:
+        await self.ws.accept()
+
+    @override
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        await self.ws.close(code, reason)
+
+    @override
+    async def receive(self) -> str | bytes:
+        if self.decompressor is None:
+            return await self.ws.receive()
+        while True:
+            data = await self.ws.receive()
+            if isinstance(data, str):
+                return data
+            message = self.decompressor.decompress(data)
+            if message is not None:
+                return message
+
+    @override
+    async def receive_text(self) -> str:
+        data = await self.receive()
+        return data.decode() if isinstance(data, bytes) else data
+
+    @override
+    async def receive_bytes(self) -> bytes:
+        data = await self.receive()
+        return data.encode() if isinstance(data, str) else data
+
+    @override
+    async def send(self, data: str | bytes, *, priority: bool = False) -> None:
+        """Send one payload, ``priority`` sends may use the reserved tokens."""
+        if self.limiter is not None:
+            await self.limiter.acquire(priority=priority)
+        if isinstance(data, str):
+            await self.ws.send_text(data)
+        else:
+            await self.ws.send_bytes(data)
+
+    @override
+    async def send_text(self, data: str) -> None:
+        if self.limiter is not None:
+            await self.limiter.acquire()
+        await self.ws.send_text(data)
+
+    @override
+    async def send_bytes(self, data: bytes) -> None:
+        if self.limiter is not None:
+            await self.limiter.acquire()
+        await self.ws.send_bytes(data)
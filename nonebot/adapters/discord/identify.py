@@ -0,0 +1,84 @@
+import asyncio
+import time
+
+from .api.model import SessionStartLimit
+from .utils import log
+
+IDENTIFY_INTERVAL = 5.0
+
+
+class IdentifyLimiter:
+    """Pace the Identify payloads of one bot token.
+
+    Shards are grouped into ``shard_id % max_concurrency`` buckets and each bucket
+    may identify once every ``IDENTIFY_INTERVAL`` seconds, so shards of different
+    buckets start in parallel. Every identify also spends one of the remaining
+    session starts; once they are used up, identifying waits until the limit
+    resets.
+
+    see https://discord.com/developers/docs/events/gateway#sharding-max-concurrency
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 1,
+        *,
+        total: int | None = None,
+        remaining: int | None = None,
+        reset_after: float = 0.0,
+        interval: float = IDENTIFY_INTERVAL,
+    ) -> None:
+        self.max_concurrency = max(max_concurrency, 1)
+        self.total = total
+        self.remaining = remaining
+        self.interval = interval
+        self._reset_at = time.monotonic() + reset_after
+        self._locks: dict[int, asyncio.Lock] = {}
+        self._session_lock = asyncio.Lock()
+        self._last_identify: dict[int, float] = {}
+
+    @classmethod
+    def from_session_start_limit(cls, limit: SessionStartLimit) -> "IdentifyLimiter":
+        return cls(
+            limit.max_concurrency,
+            total=limit.total,
+            remaining=limit.remaining,
+            reset_after=limit.reset_after / 1000,
+        )
+
+    def bucket(self, shard_id: int) -> int:
+        return shard_id % self.max_concurrency
+
+    async def acquire(self, shard_id: int) -> None:
+        """Wait until the shard may send its Identify payload."""
+        bucket = self.bucket(shard_id)
+        async with self._locks.setdefault(bucket, asyncio.Lock()):
+            last = self._last_identify.get(bucket)
+            if (
+                last is not None
+                and (delay := last + self.interval - time.monotonic()) > 0
+            ):
+                await asyncio.sleep(delay)
+            await self._spend_session_start(shard_id)
+            self._last_identify[bucket] = time.monotonic()
+
+    async def _spend_session_start(self, shard_id: int) -> None:
+        if self.remaining is None:
+            return
+        # refresh and spend under one lock, or buckets waiting for the same reset
+        # would each restore the total and lose the other buckets' spends
+        async with self._session_lock:
+            if self.remaining <= 0:
+                delay = self._reset_at - time.monotonic()
+                if delay > 0:
+                    log(
+                        "WARNING",
+                        f"Session start limit reached, shard {shard_id} waits "
+                        f"{delay:.0f}s for it to reset",
+                    )
+                    await asyncio.sleep(delay)
+                self.remaining = self.total
+                # the limit resets every 24 hours
+                self._reset_at = time.monotonic() + 86400
+            if self.remaining is not None:
+                self.remaining -= 1
@@ -0,0 +1,192 @@
+from collections.abc import Iterable
+from types import UnionType
+from typing import get_args
+
+from nonebot.compat import PYDANTIC_V2, model_fields
+
+from .config import Intents
+from .event import (
+    AutoModerationActionExecutionEvent,
+    AutoModerationRuleCreateEvent,
+    AutoModerationRuleDeleteEvent,
+    AutoModerationRuleUpdateEvent,
+    DirectMessageCreateEvent,
+    DirectMessageDeleteBulkEvent,
+    DirectMessageDeleteEvent,
+    DirectMessagePollVoteAddEvent,
+    DirectMessagePollVoteRemoveEvent,
+    DirectMessageReactionAddEvent,
+    DirectMessageReactionRemoveAllEvent,
+    DirectMessageReactionRemoveEmojiEvent,
+    DirectMessageReactionRemoveEvent,
+    DirectMessageUpdateEvent,
+    DirectTypingStartEvent,
+    GuildAuditLogEntryCreateEvent,
+    GuildBanAddEvent,
+    GuildBanRemoveEvent,
+    GuildEmojisUpdateEvent,
+    GuildIntegrationsUpdateEvent,
+    GuildMemberAddEvent,
+    GuildMemberRemoveEvent,
+    GuildMemberUpdateEvent,
+    GuildMessageCreateEvent,
+    GuildMessageDeleteBulkEvent,
+    GuildMessageDeleteEvent,
+    GuildMessagePollVoteAddEvent,
+    GuildMessagePollVoteRemoveEvent,
+    GuildMessageReactionAddEvent,
+    GuildMessageReactionRemoveAllEvent,
+    GuildMessageReactionRemoveEmojiEvent,
+    GuildMessageReactionRemoveEvent,
+    GuildMessageUpdateEvent,
+    GuildScheduledEventCreateEvent,
+    GuildScheduledEventDeleteEvent,
+    GuildScheduledEventUpdateEvent,
+    GuildScheduledEventUserAddEvent,
+    GuildScheduledEventUserRemoveEvent,
+    GuildStickersUpdateEvent,
+    GuildTypingStartEvent,
+    IntegrationCreateEvent,
+    IntegrationDeleteEvent,
+    IntegrationUpdateEvent,
+    InviteCreateEvent,
+    InviteDeleteEvent,
+    PresenceUpdateEvent,
+    ThreadMembersUpdateEvent,
+    VoiceChannelEffectSendEvent,
+    VoiceStateUpdateEvent,
+    WebhooksUpdateEvent,
+    event_classes,
+)
+from .interest import matcher_event_classes
+from .utils import log
+
+# Discord closes the connection with 4014 when these are sent but not enabled
+# for the application in the Developer Portal
+PRIVILEGED_INTENTS = ("guild_members", "guild_presences", "message_content")
+
+# always sent in auto mode, it carries the guild and channel lifecycle
+BASE_INTENTS = ("guilds",)
+
+# see https://discord.com/developers/docs/events/gateway#list-of-intents
+EVENT_INTENTS: dict[type, tuple[str, ...]] = {
+    GuildMemberAddEvent: ("guild_members",),
+    GuildMemberUpdateEvent: ("guild_members",),
+    GuildMemberRemoveEvent: ("guild_members",),
+    ThreadMembersUpdateEvent: ("guild_members",),
+    GuildAuditLogEntryCreateEvent: ("guild_moderation",),
+    GuildBanAddEvent: ("guild_moderation",),
+    GuildBanRemoveEvent: ("guild_moderation",),
+    GuildEmojisUpdateEvent: ("guild_emojis_and_stickers",),
+    GuildStickersUpdateEvent: ("guild_emojis_and_stickers",),
+    GuildIntegrationsUpdateEvent: ("guild_integrations",),
+    IntegrationCreateEvent: ("guild_integrations",),
+    IntegrationUpdateEvent: ("guild_integrations",),
+    IntegrationDeleteEvent: ("guild_integrations",),
+    WebhooksUpdateEvent: ("guild_webhooks",),
+    InviteCreateEvent: ("guild_invites",),
+    InviteDeleteEvent: ("guild_invites",),
+    VoiceStateUpdateEvent: ("guild_voice_states",),
+    VoiceChannelEffectSendEvent: ("guild_voice_states",),
+    PresenceUpdateEvent: ("guild_presences",),
+    # the content of guild messages that do not mention the bot
+    GuildMessageCreateEvent: ("guild_messages", "message_content"),
+    GuildMessageUpdateEvent: ("guild_messages", "message_content"),
+    GuildMessageDeleteEvent: ("guild_messages",),
+    GuildMessageDeleteBulkEvent: ("guild_messages",),
+    GuildMessageReactionAddEvent: ("guild_message_reactions",),
+    GuildMessageReactionRemoveEvent: ("guild_message_reactions",),
+    GuildMessageReactionRemoveAllEvent: ("guild_message_reactions",),
+    GuildMessageReactionRemoveEmojiEvent: ("guild_message_reactions",),
+    GuildTypingStartEvent: ("guild_message_typing",),
+    DirectMessageCreateEvent: ("direct_messages",),
+    DirectMessageUpdateEvent: ("direct_messages",),
+    DirectMessageDeleteEvent: ("direct_messages",),
+    DirectMessageDeleteBulkEvent: ("direct_messages",),
+    DirectMessageReactionAddEvent: ("direct_message_reactions",),
+    DirectMessageReactionRemoveEvent: ("direct_message_reactions",),
+    DirectMessageReactionRemoveAllEvent: ("direct_message_reactions",),
+    DirectMessageReactionRemoveEmojiEvent: ("direct_message_reactions",),
+    DirectTypingStartEvent: ("direct_message_typing",),
+    GuildScheduledEventCreateEvent: ("guild_scheduled_events",),
+    GuildScheduledEventUpdateEvent: ("guild_scheduled_events",),
+    GuildScheduledEventDeleteEvent: ("guild_scheduled_events",),
+    GuildScheduledEventUserAddEvent: ("guild_scheduled_events",),
+    GuildScheduledEventUserRemoveEvent: ("guild_scheduled_events",),
+    AutoModerationRuleCreateEvent: ("auto_moderation_configuration",),
+    AutoModerationRuleUpdateEvent: ("auto_moderation_configuration",),
+    AutoModerationRuleDeleteEvent: ("auto_moderation_configuration",),
+    AutoModerationActionExecutionEvent: ("auto_moderation_execution",),
+    GuildMessagePollVoteAddEvent: ("guild_message_polls",),
+    GuildMessagePollVoteRemoveEvent: ("guild_message_polls",),
+    DirectMessagePollVoteAddEvent: ("direct_message_polls",),
+    DirectMessagePollVoteRemoveEvent: ("direct_message_polls",),
+}
+
+
+def _explicit_fields(intent: Intents) -> set[str]:
+    fields_set = intent.model_fields_set if PYDANTIC_V2 else intent.__fields_set__
+    return set(fields_set) - {"auto"}
+
+
+def matcher_intents() -> set[str]:
+    """The intents whose events a registered matcher could receive."""
+    needed: set[str] = set(BASE_INTENTS)
+    for event_class in matcher_event_classes(EVENT_INTENTS):
+        needed.update(EVENT_INTENTS[event_class])
+    return needed
+
+
+def event_intents(event_types: Iterable[str]) -> set[str]:
+    """The intents of gateway event names, e.g. ``VOICE_STATE_UPDATE``."""
+    needed: set[str] = set()
+    for event_type in event_types:
+        if (event_class := event_classes.get(event_type)) is None:
+            continue
+        classes = (
+            get_args(event_class)
+            if isinstance(event_class, UnionType)
+            else (event_class,)
+        )
+        for cls in classes:
+            needed.update(EVENT_INTENTS.get(cls, ()))
+    return needed
+
+
+def resolve_intents(intent: Intents, event_types: Iterable[str] = ()) -> Intents:
+    """Turn an ``auto`` intent config into the intents to identify with.
+
+    Intents are derived from the registered matchers and from ``event_types``,
+    the gateway events received regardless of matchers (the ones the adapter
+    waits for itself and the allowlisted ones). Privileged intents are
+    never enabled implicitly, since an application that is not approved for
+    them gets disconnected; a warning names the ones handlers would need.
+    Fields set explicitly in the config always win.
+    """
+    if not intent.auto:
+        return intent
+    needed = matcher_intents() | event_intents(event_types)
+    explicit = _explicit_fields(intent)
+    names = [field.name for field in model_fields(Intents) if field.name != "auto"]
+    values = {
+        name: getattr(intent, name)
+        if name in explicit
+        else name in needed and name not in PRIVILEGED_INTENTS
+        for name in names
+    }
+    if missing := [
+        name for name in PRIVILEGED_INTENTS if name in needed and not values[name]
+    ]:
+        log(
+            "WARNING",
+            "Registered matchers or required events need privileged intents "
+            f"{', '.join(missing)}. Enable them in the Developer Portal and set them in the intent "
+            "config, or the matching events are not received in full.",
+        )
+    resolved = Intents(**values)
+    log(
+        "INFO",
+        "Intents derived from matchers and required events: "
+        + ", ".join(name for name in names if values[name]),
+    )
+    return resolved
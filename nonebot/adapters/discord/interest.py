@@ -0,0 +1,187 @@
+from collections.abc import Iterable
+from types import UnionType
+from typing import Any, Union, get_args, get_origin
+
+from nonebot import message as nonebot_message
+
+from nonebot.dependencies import Dependent
+from nonebot.internal.params import EventParam
+from nonebot.matcher import Matcher, matchers
+
+from .event import (
+    Event,
+    MessageEvent,
+    MetaEvent,
+    NoticeEvent,
+    RequestEvent,
+    event_classes,
+)
+
+
+def _flatten_event_types(annotation: Any) -> tuple[type, ...]:  # noqa: ANN401
+    if get_origin(annotation) in (Union, UnionType):
+        return tuple(
+            cls for arg in get_args(annotation) for cls in _flatten_event_types(arg)
+        )
+    return (annotation,) if isinstance(annotation, type) else ()
+
+
+def _dependent_event_types(dependent: Dependent[Any]) -> tuple[type, ...] | None:
+    """Event classes a handler accepts, ``None`` if it accepts every event."""
+    for param in dependent.params:
+        field_info = param.field_info
+        if isinstance(field_info, EventParam):
+            if field_info.checker is None:
+                return None
+            return _flatten_event_types(field_info.checker.annotation)
+    return None
+
+
+def _event_type_name(event_class: type) -> str:
+    if issubclass(event_class, MessageEvent):
+        return "message"
+    if issubclass(event_class, MetaEvent):
+        return "meta_event"
+    if issubclass(event_class, RequestEvent):
+        return "request"
+    if issubclass(event_class, NoticeEvent):
+        return "notice"
+    return ""
+
+
+class _Consumer:
+    __slots__ = ("event_types", "matcher_type")
+
+    def __init__(self, matcher_type: str, event_types: tuple[type, ...] | None) -> None:
+        self.matcher_type = matcher_type
+        self.event_types = event_types
+
+    def accepts(self, event_class: type) -> bool:
+        if self.matcher_type and self.matcher_type != _event_type_name(event_class):
+            return False
+        return self.event_types is None or any(
+            issubclass(event_class, accepted) for accepted in self.event_types
+        )
+
+
+def _matcher_event_types(matcher: type[Matcher]) -> tuple[type, ...] | None:
+    if not matcher.handlers:
+        return None
+    event_types: list[type] = []
+    for handler in matcher.handlers:
+        handler_types = _dependent_event_types(handler)
+        if handler_types is None:
+            return None
+        event_types.extend(handler_types)
+    return tuple(event_types)
+
+
+def _matcher_consumers() -> list[_Consumer]:
+    return [
+        _Consumer(matcher.type, _matcher_event_types(matcher))
+        for priority_matchers in matchers.values()
+        for matcher in priority_matchers
+    ]
+
+
+def matcher_event_classes(candidates: Iterable[type]) -> set[type]:
+    """The ``candidates`` a registered matcher could receive.
+
+    Judged by the matcher type and the event annotations of its handlers, as
+    :class:`EventInterest` does, but ignoring event pre/post processors.
+    """
+    consumers = _matcher_consumers()
+    return {
+        event_class
+        for event_class in candidates
+        if any(consumer.accepts(event_class) for consumer in consumers)
+    }
+
+
+def _collect_consumers() -> list[_Consumer]:
+    consumers = _matcher_consumers()
+    processors = (
+        *nonebot_message._event_preprocessors,  # noqa: SLF001
+        *nonebot_message._event_postprocessors,  # noqa: SLF001
+    )
+    consumers.extend(
+        _Consumer("", _dependent_event_types(processor)) for processor in processors
+    )
+    return consumers
+
+
+def _registry_fingerprint() -> frozenset[int]:
+    """Identify the registered matchers and processors, not just count them."""
+    return frozenset(
+        id(registered)
+        for registered in (
+            *(
+                matcher
+                for priority_matchers in matchers.values()
+                for matcher in priority_matchers
+            ),
+            *nonebot_message._event_preprocessors,  # noqa: SLF001
+            *nonebot_message._event_postprocessors,  # noqa: SLF001
+        )
+    )
+
+
+class EventInterest:
+    """Decide which gateway dispatches are worth turning into events.
+
+    With ``auto`` enabled, a dispatch type is parsed only when a registered
+    matcher (or event pre/post processor) could receive one of its event classes,
+    judged by the matcher type and the event annotations of its handlers. The
+    registry is rebuilt whenever matchers are added or removed. ``allow`` and
+    ``deny`` are explicit gateway event names (e.g. ``TYPING_START``) that are
+    always parsed or always dropped. ``required`` events are parsed even when
+    denied, since the adapter itself waits for them.
+    """
+
+    def __init__(
+        self,
+        *,
+        auto: bool = False,
+        allow: Iterable[str] = (),
+        deny: Iterable[str] = (),
+    ) -> None:
+        self.auto = auto
+        self.allow = set(allow)
+        self.deny = set(deny)
+        self.required: set[str] = set()
+        self._fingerprint: frozenset[int] | None = None
+        self._interested: set[str] = set()
+        self._interested_in_unknown = True
+
+    def require(self, *event_types: str) -> None:
+        """Always parse these dispatch types, e.g. for the adapter's own use."""
+        self.required.update(event_types)
+
+    def refresh(self) -> None:
+        consumers = _collect_consumers()
+        self._interested = {
+            event_type
+            for event_type, event_class in event_classes.items()
+            if any(
+                consumer.accepts(cls)
+                for cls in _flatten_event_types(event_class)
+                for consumer in consumers
+            )
+        }
+        self._interested_in_unknown = any(
+            consumer.accepts(Event) for consumer in consumers
+        )
+        self._fingerprint = _registry_fingerprint()
+
+    def is_interested(self, event_type: str) -> bool:
+        if event_type in self.required:
+            return True
+        if event_type in self.deny:
+            return False
+        if not self.auto or event_type in self.allow:
+            return True
+        if self._fingerprint != _registry_fingerprint():
+            self.refresh()
+        if event_type in event_classes:
+            return event_type in self._interested
+        return self._interested_in_unknown
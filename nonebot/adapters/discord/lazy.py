@@ -0,0 +1,168 @@
+"""Deferred validation of the heavy nested fields of large gateway events.
+
+Events such as ``GUILD_CREATE`` or ``GUILD_MEMBERS_CHUNK`` carry thousands of
+members, presences and channels that most handlers never look at. In lazy mode
+those fields are kept as raw gateway data and only validated, with the model's
+own field validator, the first time they are read.
+"""
+
+from collections.abc import Callable, Iterable, Mapping
+from types import UnionType
+from typing import Any, ClassVar, Union, get_args, get_origin
+from typing_extensions import override
+
+from nonebot.compat import PYDANTIC_V2
+from nonebot.utils import escape_tag
+from pydantic import BaseModel
+
+from .utils import IncEx, model_dump
+
+if not PYDANTIC_V2:
+    from pydantic import ValidationError
+
+
+class _Deferred:
+    __slots__ = ("raw",)
+
+    def __init__(self, raw: Any) -> None:  # noqa: ANN401
+        self.raw = raw
+
+    @override
+    def __repr__(self) -> str:
+        if isinstance(self.raw, list):
+            return f"<deferred {len(self.raw)} items>"
+        return "<deferred>"
+
+
+def _load_field(model: BaseModel, name: str, raw: Any) -> Any:  # noqa: ANN401
+    if PYDANTIC_V2:
+        model.__pydantic_validator__.validate_assignment(model, name, raw)
+    else:
+        field = model.__fields__[name]
+        value, errors = field.validate(raw, model.__dict__, loc=name, cls=type(model))
+        if errors:
+            raise ValidationError([errors], type(model))
+        model.__dict__[name] = value
+    return model.__dict__[name]
+
+
+class _LazyField:
+    """Data descriptor that validates a deferred field on first access.
+
+    It is invisible on the class itself, so pydantic keeps treating the name as
+    a plain declared field when collecting or rebuilding the model.
+    """
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance: BaseModel | None, owner: type) -> Any:  # noqa: ANN401
+        if instance is None:
+            raise AttributeError(self.name)
+        value = vars(instance)[self.name]
+        if isinstance(value, _Deferred):
+            value = _load_field(instance, self.name, value.raw)
+        return value
+
+    def __set__(self, instance: BaseModel, value: Any) -> None:  # noqa: ANN401
+        vars(instance)[self.name] = value
+
+
+class LazyFieldsMixin:
+    """Mark the ``__lazy_fields__`` of an event model as deferrable.
+
+    Deferred fields are loaded on attribute access, before the model is dumped,
+    and are summarized instead of loaded in the event description.
+    """
+
+    __slots__ = ()
+    __lazy_fields__: ClassVar[tuple[str, ...]] = ()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:  # noqa: ANN401
+        super().__init_subclass__(**kwargs)
+        for name in cls.__dict__.get("__lazy_fields__", ()):
+            setattr(cls, name, _LazyField(name))
+
+    def _deferred_fields(self) -> dict[str, _Deferred]:
+        values = self.__dict__
+        return {
+            name: values[name]
+            for name in self.__lazy_fields__
+            if isinstance(values.get(name), _Deferred)
+        }
+
+    def load_lazy_fields(self, exclude: IncEx | None = None) -> None:
+        """Validate every field that is still deferred and not excluded."""
+        if isinstance(exclude, Mapping):
+            excluded = {key for key, value in exclude.items() if value in (True, ...)}
+        else:
+            excluded = set(exclude or ())
+        for name in self._deferred_fields():
+            if name not in excluded:
+                getattr(self, name)
+
+    def get_event_description(self) -> str:
+        deferred = self._deferred_fields()
+        if not deferred:
+            return super().get_event_description()  # pyright: ignore[reportAttributeAccessIssue]
+        data = model_dump(
+            self,  # pyright: ignore[reportArgumentType]
+            exclude=set(deferred),
+            omit_unset_values=True,
+        )
+        data.update(deferred)
+        return escape_tag(str(data))
+
+    if PYDANTIC_V2:
+
+        def model_dump(self, **kwargs: Any) -> dict[str, Any]:  # noqa: ANN401
+            self.load_lazy_fields(kwargs.get("exclude"))
+            return super().model_dump(**kwargs)  # pyright: ignore[reportAttributeAccessIssue]
+
+        def model_dump_json(self, **kwargs: Any) -> str:  # noqa: ANN401
+            self.load_lazy_fields(kwargs.get("exclude"))
+            return super().model_dump_json(**kwargs)  # pyright: ignore[reportAttributeAccessIssue]
+
+    else:
+
+        def dict(self, **kwargs: Any) -> dict[str, Any]:  # noqa: ANN401
+            self.load_lazy_fields(kwargs.get("exclude"))
+            return super().dict(**kwargs)  # pyright: ignore[reportAttributeAccessIssue]
+
+        def json(self, **kwargs: Any) -> str:  # noqa: ANN401
+            self.load_lazy_fields(kwargs.get("exclude"))
+            return super().json(**kwargs)  # pyright: ignore[reportAttributeAccessIssue]
+
+
+def lazy_field_names(event_class: type | UnionType) -> frozenset[str]:
+    """Fields any of the (possibly union) event classes can defer."""
+    if get_origin(event_class) in (Union, UnionType):
+        classes: Iterable[Any] = get_args(event_class)
+    else:
+        classes = (event_class,)
+    return frozenset(
+        name for cls in classes for name in getattr(cls, "__lazy_fields__", ())
+    )
+
+
+def validate_lazy(
+    validator: Callable[[Any], Any],
+    names: frozenset[str],
+    data: Mapping[str, Any],
+) -> Any:  # noqa: ANN401
+    """Validate ``data`` with the ``names`` fields deferred.
+
+    The deferred fields are validated against an empty list placeholder, which
+    every deferrable (list) field accepts, and replaced by the raw data after.
+    """
+    deferred = {name: data[name] for name in names if name in data}
+    if not deferred:
+        return validator(data)
+    model = validator({**data, **{name: [] for name in deferred}})
+    lazy_fields = getattr(model, "__lazy_fields__", ())
+    for name, raw in deferred.items():
+        if name in lazy_fields:
+            model.__dict__[name] = _Deferred(raw)
+    return model
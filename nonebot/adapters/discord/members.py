@@ -0,0 +1,70 @@
+import asyncio
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+import secrets
+
+from .api import Snowflake, is_not_unset
+from .api.model import GuildMember, GuildMembersChunk, PresenceUpdate
+from .exception import NetworkError
+
+CHUNK_TIMEOUT = 30.0
+
+
+def guild_shard_id(guild_id: int, shard_count: int) -> int:
+    """The shard that receives the events of a guild."""
+    return (guild_id >> 22) % shard_count
+
+
+@dataclass(slots=True)
+class GuildMembers:
+    """All chunks of one Request Guild Members call, merged."""
+
+    members: list[GuildMember] = field(default_factory=list)
+    presences: list[PresenceUpdate] = field(default_factory=list)
+    not_found: list[Snowflake] = field(default_factory=list)
+
+    def add(self, chunk: GuildMembersChunk) -> None:
+        self.members.extend(chunk.members)
+        if is_not_unset(chunk.presences):
+            self.presences.extend(chunk.presences)
+        if is_not_unset(chunk.not_found):
+            self.not_found.extend(chunk.not_found)
+
+
+class GuildMembersRequests:
+    """Route ``GUILD_MEMBERS_CHUNK`` events to the request that asked for them."""
+
+    def __init__(self) -> None:
+        self._pending: dict[str, asyncio.Queue[GuildMembersChunk]] = {}
+
+    def open(self) -> str:
+        nonce = secrets.token_hex(16)
+        self._pending[nonce] = asyncio.Queue()
+        return nonce
+
+    def close(self, nonce: str) -> None:
+        self._pending.pop(nonce, None)
+
+    def feed(self, chunk: GuildMembersChunk) -> bool:
+        """Hand a chunk to its request, returns whether one was waiting for it."""
+        if not is_not_unset(chunk.nonce) or chunk.nonce not in self._pending:
+            return False
+        self._pending[chunk.nonce].put_nowait(chunk)
+        return True
+
+    async def chunks(
+        self, nonce: str, timeout: float = CHUNK_TIMEOUT
+    ) -> AsyncIterator[GuildMembersChunk]:
+        """Yield the chunks of a request until the last one arrived."""
+        queue = self._pending[nonce]
+        received = 0
+        while True:
+            try:
+                chunk = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                msg = f"Timed out waiting for guild members chunk {received + 1}"
+                raise NetworkError(msg) from None
+            yield chunk
+            received += 1
+            if received >= chunk.chunk_count:
+                return
@@ -1,13 +1,19 @@
 from enum import IntEnum
-from typing import Annotated, Literal, TypeAlias
+from typing import Annotated, Any, Literal, TypeAlias, cast
 
-from nonebot.compat import PYDANTIC_V2, ConfigDict
+from nonebot.compat import PYDANTIC_V2, ConfigDict, type_validate_python
 from pydantic import BaseModel, Field
 
+if PYDANTIC_V2:
+    from pydantic import TypeAdapter
+
 from .api.model import (
     Hello as HelloData,
     Identify as IdentifyData,
+    RequestGuildMembers as RequestGuildMembersData,
     Resume as ResumeData,
+    UpdatePresence as UpdatePresenceData,
+    UpdateVoiceState as UpdateVoiceStateData,
 )
 
 
@@ -15,8 +21,11 @@ class Opcode(IntEnum):
     DISPATCH = 0
     HEARTBEAT = 1
     IDENTIFY = 2
+    PRESENCE_UPDATE = 3
+    VOICE_STATE_UPDATE = 4
     RESUME = 6
     RECONNECT = 7
+    REQUEST_GUILD_MEMBERS = 8
     INVALID_SESSION = 9
     HELLO = 10
     HEARTBEAT_ACK = 11
@@ -50,17 +59,37 @@ class Identify(Payload):
     data: IdentifyData = Field(alias="d")
 
 
+class UpdatePresence(Payload):
+    opcode: Literal[Opcode.PRESENCE_UPDATE] = Field(Opcode.PRESENCE_UPDATE, alias="op")
+    data: UpdatePresenceData = Field(alias="d")
+
+
+class UpdateVoiceState(Payload):
+    opcode: Literal[Opcode.VOICE_STATE_UPDATE] = Field(
+        Opcode.VOICE_STATE_UPDATE, alias="op"
+    )
+    data: UpdateVoiceStateData = Field(alias="d")
+
+
 class Resume(Payload):
     opcode: Literal[Opcode.RESUME] = Field(Opcode.RESUME, alias="op")
     data: ResumeData = Field(alias="d")
 
 
+class RequestGuildMembers(Payload):
+    opcode: Literal[Opcode.REQUEST_GUILD_MEMBERS] = Field(
+        Opcode.REQUEST_GUILD_MEMBERS, alias="op"
+    )
+    data: RequestGuildMembersData = Field(alias="d")
+
+
 class Reconnect(Payload):
     opcode: Literal[Opcode.RECONNECT] = Field(Opcode.RECONNECT, alias="op")
 
 
 class InvalidSession(Payload):
     opcode: Literal[Opcode.INVALID_SESSION] = Field(Opcode.INVALID_SESSION, alias="op")
+    data: bool = Field(default=False, alias="d")
 
 
 class Hello(Payload):
@@ -79,3 +108,40 @@ PayloadType: TypeAlias = (
     ]
     | Payload
 )
+
+
+if PYDANTIC_V2:
+    _PAYLOAD_ADAPTER: "TypeAdapter[Payload]" = TypeAdapter(PayloadType)
+
+
+def _validate_payload(data: Any) -> Payload:  # noqa: ANN401
+    if PYDANTIC_V2:
+        return _PAYLOAD_ADAPTER.validate_python(data)
+    return type_validate_python(cast("type[Payload]", PayloadType), data)
+
+
+def parse_payload(data: Any) -> Payload:  # noqa: ANN401
+    """Build a payload from a decoded gateway message.
+
+    For dispatches only ``op``/``t``/``s`` are checked here; ``d`` is passed through
+    untouched so that it is validated exactly once, into its event class.
+    """
+    if isinstance(data, dict) and data.get("op") == Opcode.DISPATCH:
+        event_type = data.get("t")
+        sequence = data.get("s")
+        event_data = data.get("d")
+        if (
+            isinstance(event_type, str)
+            and isinstance(sequence, int)
+            and isinstance(event_data, dict)
+        ):
+            fields = {
+                "opcode": Opcode.DISPATCH,
+                "data": event_data,
+                "sequence": sequence,
+                "type": event_type,
+            }
+            if PYDANTIC_V2:
+                return Dispatch.model_construct(**fields)
+            return Dispatch.construct(**fields)
+    return _validate_payload(data)
@@ -0,0 +1,55 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+import time
+
+from .api.model import UpdatePresence
+from .utils import log
+
+PRESENCE_UPDATE_INTERVAL = 5.0
+
+
+class PresenceCoalescer:
+    """Send the presence of one shard at most once per ``interval``.
+
+    The first update is sent right away. Updates made while waiting for the
+    interval to pass replace each other, and only the latest is sent once it
+    passed, so a burst of updates costs at most two gateway sends.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[UpdatePresence], Awaitable[None]],
+        interval: float = PRESENCE_UPDATE_INTERVAL,
+    ) -> None:
+        self._send = send
+        self.interval = interval
+        self._pending: UpdatePresence | None = None
+        self._task: asyncio.Task | None = None
+        self._last_sent: float | None = None
+
+    @property
+    def pending(self) -> UpdatePresence | None:
+        return self._pending
+
+    def update(self, presence: UpdatePresence) -> None:
+        self._pending = presence
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush())
+
+    def cancel(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+        self._pending = None
+
+    async def _flush(self) -> None:
+        while self._pending is not None:
+            if self._last_sent is not None and (
+                (delay := self._last_sent + self.interval - time.monotonic()) > 0
+            ):
+                await asyncio.sleep(delay)
+            presence, self._pending = self._pending, None
+            self._last_sent = time.monotonic()
+            try:
+                await self._send(presence)
+            except Exception as e:
+                log("WARNING", "Failed to update presence", e)
@@ -0,0 +1,290 @@
+import asyncio
+from dataclasses import dataclass
+import json
+import re
+import time
+
+from nonebot.drivers import Request, Response
+from yarl import URL
+
+from .utils import log
+
+# the resources whose id is the major parameter of their routes
+MAJOR_PARAMETERS = ("channels", "guilds", "webhooks")
+MAX_BUCKETS = 4096
+# requests per second a bot token may send across all routes
+GLOBAL_RATE_LIMIT = 50
+
+_VERSION = re.compile(r"v\d+")
+
+
+def route_key(method: str, url: URL) -> tuple[str, str]:
+    """Split a request into its route template and major parameter.
+
+    ``GET /channels/1/messages/2`` becomes ``("GET /channels/:major/messages/:id",
+    "channels/1")``. Requests with the same route template and major parameter
+    always share a rate limit bucket.
+
+    see https://discord.com/developers/docs/topics/rate-limits#rate-limits
+    """
+    parts = [part for part in url.parts if part != "/"]
+    if parts[:1] == ["api"]:
+        parts = parts[1:]
+    if parts and _VERSION.fullmatch(parts[0]):
+        parts = parts[1:]
+    major = ""
+    route: list[str] = []
+    for index, part in enumerate(parts):
+        if index == 1 and parts[0] in MAJOR_PARAMETERS:
+            major = f"{parts[0]}/{part}"
+            route.append(":major")
+        elif index == 2 and parts[0] in ("webhooks", "interactions"):  # noqa: PLR2004
+            # webhook and interaction tokens are part of their rate limit
+            major = f"{major}/{part}" if major else f"{parts[0]}/{parts[1]}/{part}"
+            route.append(":token")
+        elif index and parts[index - 1] == "reactions":
+            route.append(":emoji")
+        elif part.isdigit():
+            route.append(":id")
+        else:
+            route.append(part)
+    return f"{method} /{'/'.join(route)}", major
+
+
+def retry_after(response: Response) -> float:
+    """Seconds to wait before retrying a 429 response."""
+    if retry_after := response.headers.get("Retry-After"):
+        return float(retry_after)
+    try:
+        return float(json.loads(response.content or b"{}")["retry_after"])
+    except (ValueError, KeyError, TypeError):
+        return 1.0
+
+
+def is_global(response: Response) -> bool:
+    """Whether a 429 response hit the global rate limit of the token."""
+    headers = response.headers
+    if (
+        headers.get("X-RateLimit-Global")
+        or headers.get("X-RateLimit-Scope") == "global"
+    ):
+        return True
+    try:
+        return json.loads(response.content or b"{}").get("global") is True
+    except (ValueError, AttributeError):
+        return False
+
+
+class GlobalRateLimit:
+    """A token bucket for the requests of one bot token across all routes."""
+
+    def __init__(self, rate: int) -> None:
+        self.rate = rate
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+                self.tokens = min(
+                    self.rate, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def block(self, delay: float) -> None:
+        """Hold back every request of the token for ``delay`` seconds."""
+        log("WARNING", f"Hit the global rate limit, pausing requests for {delay:.2f}s")
+        self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+        self.tokens = 0.0
+
+
+class RateLimitBucket:
+    """The requests left in one REST rate limit bucket.
+
+    Until the first response told the limit, one request is sent at a time.
+    After that, requests wait for the window to reset once it is used up instead
+    of running into a 429.
+    """
+
+    def __init__(self) -> None:
+        self.limit: int | None = None
+        self.remaining: int | None = None
+        self.reset_at = 0.0
+        # the longest Reset-After seen, to guess when a new window ends
+        self.window = 0.0
+        # the route answered successfully without rate limit headers
+        self.unlimited = False
+        # counts the windows, responses from older ones are ignored
+        self.generation = 0
+        self._inflight = 0
+        self._lock = asyncio.Lock()
+        self._released = asyncio.Event()
+
+    @property
+    def idle(self) -> bool:
+        return (
+            self._inflight == 0
+            and not self._lock.locked()
+            and time.monotonic() >= self.reset_at
+        )
+
+    async def acquire(self) -> int:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if self.remaining == 0 and now < self.reset_at:
+                    log(
+                        "DEBUG",
+                        f"Rate limit bucket exhausted, waiting {self.reset_at - now:.2f}s",
+                    )
+                    await asyncio.sleep(self.reset_at - now)
+                    continue
+                if self.unlimited:
+                    break
+                if self.limit is None:
+                    # wait for the first response to tell the limit
+                    if self._inflight == 0:
+                        break
+                    self._released.clear()
+                    await self._released.wait()
+                    continue
+                if now >= self.reset_at:
+                    self.remaining = self.limit
+                    self.reset_at = now + self.window
+                    self.generation += 1
+                if self.remaining:
+                    self.remaining -= 1
+                    break
+            self._inflight += 1
+            return self.generation
+
+    def release(self, response: Response | None, generation: int) -> None:
+        self._inflight -= 1
+        if response is not None:
+            self.update(response, generation)
+        self._released.set()
+
+    def update(self, response: Response, generation: int | None = None) -> None:
+        headers = response.headers
+        if (
+            response.status_code == 429  # noqa: PLR2004
+            and headers.get("X-RateLimit-Scope") != "shared"
+            and not is_global(response)
+        ):
+            self.remaining = 0
+            self.reset_at = max(self.reset_at, time.monotonic() + retry_after(response))
+            return
+        limit = headers.get("X-RateLimit-Limit")
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset_after = headers.get("X-RateLimit-Reset-After")
+        if limit is None or remaining is None or reset_after is None:
+            # errors from the edge (e.g. a 502) come without the headers too,
+            # only a successful response tells that the route has no limit
+            if self.limit is None and 200 <= response.status_code < 300:  # noqa: PLR2004
+                self.unlimited = True
+            return
+        self.unlimited = False
+        if generation is not None and generation != self.generation:
+            # sent in a window that already ended
+            return
+        # responses of concurrent requests may arrive out of order
+        self.remaining = (
+            int(remaining)
+            if self.remaining is None
+            else min(self.remaining, int(remaining))
+        )
+        self.limit = int(limit)
+        self.window = max(self.window, float(reset_after))
+        self.reset_at = time.monotonic() + float(reset_after)
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitTicket:
+    token: str
+    route: str
+    major: str
+    bucket: RateLimitBucket
+    generation: int
+
+
+class RateLimiter:
+    """Pace REST requests by the buckets Discord reports in response headers.
+
+    Buckets are per bot token and major parameter. A route is first limited on
+    its own; once a response names its bucket (``X-RateLimit-Bucket``), every
+    route with the same bucket hash shares one limit. On top of that, all
+    requests of a token except interaction responses share ``global_limit``
+    requests per second.
+    """
+
+    def __init__(self, global_limit: int = GLOBAL_RATE_LIMIT) -> None:
+        self.global_limit = global_limit
+        self._routes: dict[tuple[str, str], str] = {}
+        self._buckets: dict[tuple[str, str, str], RateLimitBucket] = {}
+        self._globals: dict[str, GlobalRateLimit] = {}
+
+    def _global(self, token: str) -> GlobalRateLimit:
+        if (limit := self._globals.get(token)) is None:
+            limit = self._globals[token] = GlobalRateLimit(self.global_limit)
+        return limit
+
+    def _key(self, token: str, route: str, major: str) -> tuple[str, str, str]:
+        return token, self._routes.get((token, route), route), major
+
+    async def acquire(self, request: Request) -> RateLimitTicket:
+        token = request.headers.get("Authorization", "")
+        route, major = route_key(request.method, request.url)
+        key = self._key(token, route, major)
+        if (bucket := self._buckets.get(key)) is None:
+            if len(self._buckets) >= MAX_BUCKETS:
+                self._prune()
+            bucket = self._buckets[key] = RateLimitBucket()
+        generation = await bucket.acquire()
+        # interaction endpoints are not bound to the global rate limit
+        if not major.startswith("interactions/"):
+            try:
+                await self._global(token).acquire()
+            except BaseException:
+                bucket.release(None, generation)
+                raise
+        return RateLimitTicket(token, route, major, bucket, generation)
+
+    def release(self, ticket: RateLimitTicket, response: Response | None) -> None:
+        if (
+            response is not None
+            and response.status_code == 429  # noqa: PLR2004
+            and is_global(response)
+        ):
+            self._global(ticket.token).block(retry_after(response))
+        if response is not None and (
+            bucket_hash := response.headers.get("X-RateLimit-Bucket")
+        ):
+            bucket = self._learn(ticket, bucket_hash)
+            if bucket is not ticket.bucket:
+                bucket.update(response)
+        ticket.bucket.release(response, ticket.generation)
+
+    def _learn(self, ticket: RateLimitTicket, bucket_hash: str) -> RateLimitBucket:
+        key = (ticket.token, bucket_hash, ticket.major)
+        if self._routes.get((ticket.token, ticket.route)) != bucket_hash:
+            self._routes[(ticket.token, ticket.route)] = bucket_hash
+            # the route was limited on its own until now, its bucket becomes
+            # the shared one unless another route already created it
+            self._buckets.pop((ticket.token, ticket.route, ticket.major), None)
+            self._buckets.setdefault(key, ticket.bucket)
+        return self._buckets.get(key, ticket.bucket)
+
+    def _prune(self) -> None:
+        for key, bucket in list(self._buckets.items()):
+            if bucket.idle:
+                del self._buckets[key]
@@ -0,0 +1,81 @@
+from dataclasses import dataclass
+import random
+from typing import Literal, TypeAlias
+
+ReconnectAction: TypeAlias = Literal["resume", "identify", "stop"]
+
+# see https://discord.com/developers/docs/topics/opcodes-and-status-codes#gateway-gateway-close-event-codes
+FATAL_CLOSE_CODES = frozenset({4004, 4010, 4011, 4012, 4013, 4014})
+REIDENTIFY_CLOSE_CODES = frozenset({4007, 4009})
+
+
+@dataclass(frozen=True, slots=True)
+class ReconnectDecision:
+    action: ReconnectAction
+    delay: float = 0.0
+
+
+class ReconnectPolicy:
+    """Decide how and when a shard reconnects after its connection ended.
+
+    Delays grow exponentially with full jitter (a random delay between ``0`` and
+    ``min(max_delay, base_delay * 2 ** attempt)``), so shards do not reconnect in
+    lockstep. Resuming and re-identifying count their attempts separately: after
+    ``max_resume_attempts`` failed resumes the session is dropped and the shard
+    identifies again, and after ``max_identify_attempts`` (if set) failed
+    identifies it gives up. Fatal close codes (invalid token, shard or intents)
+    stop the shard at once, and 4007/4009 always re-identify.
+
+    Subclass it, or give the adapter another ``reconnect_policy_factory``, to
+    change the behaviour. One policy is used per shard and :meth:`reset` is
+    called once a connection works again.
+    """
+
+    def __init__(
+        self,
+        *,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        max_resume_attempts: int = 3,
+        max_identify_attempts: int | None = None,
+    ) -> None:
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_resume_attempts = max_resume_attempts
+        self.max_identify_attempts = max_identify_attempts
+        self.resume_attempts = 0
+        self.identify_attempts = 0
+
+    def reset(self) -> None:
+        self.resume_attempts = 0
+        self.identify_attempts = 0
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(  # noqa: S311
+            0, min(self.max_delay, self.base_delay * 2**attempt)
+        )
+
+    def next(self, *, close_code: int | None, resumable: bool) -> ReconnectDecision:
+        """Decide the next step after a connection ended.
+
+        ``close_code`` is the gateway close code if the connection was closed by
+        Discord, ``resumable`` whether the shard still has a session to resume.
+        """
+        if close_code in FATAL_CLOSE_CODES:
+            return ReconnectDecision("stop")
+        if (
+            resumable
+            and close_code not in REIDENTIFY_CLOSE_CODES
+            and self.resume_attempts < self.max_resume_attempts
+        ):
+            delay = self.backoff(self.resume_attempts)
+            self.resume_attempts += 1
+            return ReconnectDecision("resume", delay)
+        if (
+            self.max_identify_attempts is not None
+            and self.identify_attempts >= self.max_identify_attempts
+        ):
+            return ReconnectDecision("stop")
+        delay = self.backoff(self.identify_attempts)
+        self.identify_attempts += 1
+        return ReconnectDecision("identify", delay)
@@ -0,0 +1,184 @@
+import asyncio
+import base64
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import gzip
+import json
+from pathlib import Path
+import time
+import tracemalloc
+from typing import TYPE_CHECKING, Any, Literal, cast
+
+from . import etf
+from .payload import Dispatch, parse_payload
+from .utils import log
+
+if TYPE_CHECKING:
+    from .adapter import Adapter
+    from .bot import Bot
+
+Encoding = Literal["json", "etf"]
+
+# seconds between writes of the recorded messages
+FLUSH_INTERVAL = 1.0
+
+
+@dataclass(frozen=True, slots=True)
+class RecordedFrame:
+    time: float
+    shard: tuple[int, int] | None
+    data: str | bytes
+    encoding: Encoding = "json"
+
+    def decode(self) -> Any:  # noqa: ANN401
+        if self.encoding == "etf":
+            if isinstance(self.data, str):
+                msg = "etf encoded data must be bytes"
+                raise TypeError(msg)
+            return etf.decode(self.data)
+        return json.loads(self.data)
+
+
+class GatewayRecorder:
+    """Append every received gateway message to a gzip compressed JSONL file.
+
+    Messages are recorded after transport decompression, one line each with the
+    wall clock time, the shard and the text of JSON messages (or base64 of ETF
+    bytes). Lines are buffered and written every :data:`FLUSH_INTERVAL` seconds
+    in a worker thread, so compressing them never blocks the event loop.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._file = gzip.open(path, "at", encoding="utf-8")  # noqa: SIM115
+        # a single worker keeps the writes in order
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="discord-recorder")
+        self._buffer: list[str] = []
+        self._flush_task: asyncio.Task | None = None
+
+    def record(
+        self, shard: tuple[int, int] | None, data: str | bytes, encoding: Encoding
+    ) -> None:
+        line: dict[str, Any] = {
+            "time": time.time(),
+            "shard": list(shard) if shard else None,
+        }
+        if encoding == "etf":
+            line["etf"] = base64.b64encode(
+                data if isinstance(data, bytes) else data.encode()
+            ).decode()
+        else:
+            line["data"] = data.decode() if isinstance(data, bytes) else data
+        self._buffer.append(json.dumps(line, separators=(",", ":")) + "\n")
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(FLUSH_INTERVAL)
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Write the buffered lines."""
+        if self._buffer:
+            lines, self._buffer = self._buffer, []
+            await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._file.writelines, lines
+            )
+
+    async def close(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+        await self.flush()
+        await asyncio.get_running_loop().run_in_executor(
+            self._executor, self._file.close
+        )
+        self._executor.shutdown(wait=False)
+
+
+def read_recording(path: Path) -> Iterator[RecordedFrame]:
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        for line in file:
+            frame = json.loads(line)
+            shard = tuple(frame["shard"]) if frame["shard"] else None
+            if "etf" in frame:
+                yield RecordedFrame(
+                    frame["time"], shard, base64.b64decode(frame["etf"]), "etf"
+                )
+            else:
+                yield RecordedFrame(frame["time"], shard, frame["data"])
+
+
+@dataclass(frozen=True, slots=True)
+class ReplayReport:
+    events: int
+    duration: float
+    p50_latency: float
+    p99_latency: float
+    peak_memory: int | None
+
+    @property
+    def events_per_second(self) -> float:
+        return self.events / self.duration if self.duration else 0.0
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * percent / 100), len(values) - 1)]
+
+
+async def replay(
+    bot: "Bot",
+    path: Path,
+    *,
+    speed: float | None = None,
+    trace_memory: bool = True,
+) -> ReplayReport:
+    """Feed the dispatches of a recording through event parsing and handling.
+
+    With ``speed`` ``None`` events are replayed back to back, otherwise the
+    original gaps are kept, divided by ``speed``. Latency is measured from
+    parsing a dispatch until ``bot.handle_event`` returned. ``trace_memory``
+    reports the peak of Python allocations, at the cost of slower handling.
+    """
+    adapter = cast("Adapter", bot.adapter)
+    lazy = adapter.discord_config.discord_lazy_events
+    latencies: list[float] = []
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if trace_memory:
+        tracemalloc.reset_peak()
+    first_frame: float | None = None
+    start = time.perf_counter()
+    try:
+        for frame in read_recording(path):
+            if speed is not None:
+                if first_frame is None:
+                    first_frame = frame.time
+                delay = (frame.time - first_frame) / speed
+                await asyncio.sleep(delay - (time.perf_counter() - start))
+            payload = parse_payload(frame.decode())
+            if not isinstance(payload, Dispatch):
+                continue
+            handle_start = time.perf_counter()
+            try:
+                event = adapter.payload_to_event(payload, lazy=lazy)
+                await bot.handle_event(event)
+            except Exception as e:
+                log("WARNING", f"Failed to replay {payload.type}", e)
+            latencies.append(time.perf_counter() - handle_start)
+        duration = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+    return ReplayReport(
+        len(latencies),
+        duration,
+        _percentile(latencies, 50),
+        _percentile(latencies, 99),
+        peak,
+    )
@@ -0,0 +1,72 @@
+from dataclasses import dataclass
+import random
+
+from nonebot.drivers import Response
+
+from .ratelimit import retry_after
+
+# server errors that are usually gone a moment later
+RETRY_STATUS_CODES = frozenset({500, 502, 503, 504})
+# methods that can be sent twice without doing anything twice
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+@dataclass(slots=True)
+class RetryStats:
+    retries: int = 0
+    rate_limited: int = 0
+    server_errors: int = 0
+    # seconds spent waiting before retries
+    waited: float = 0.0
+
+
+class RetryPolicy:
+    """Decide whether and when a failed API request is sent again.
+
+    A 429 is retried for any method after its ``retry_after``. 500, 502, 503 and
+    504 are retried for idempotent methods only, after an exponential backoff
+    with full jitter. At most ``max_retries`` retries are made, and none that
+    would start later than ``deadline`` seconds after the first attempt.
+
+    The retries made so far are counted in :attr:`stats`.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_retries: int = 3,
+        deadline: float = 60.0,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+    ) -> None:
+        self.max_retries = max_retries
+        self.deadline = deadline
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats = RetryStats()
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(  # noqa: S311
+            0, min(self.max_delay, self.base_delay * 2**attempt)
+        )
+
+    def delay(self, method: str, response: Response, attempt: int) -> float | None:
+        """The delay before retrying ``response``, ``None`` to give up."""
+        if attempt >= self.max_retries:
+            return None
+        if response.status_code == 429:  # noqa: PLR2004
+            return retry_after(response)
+        if (
+            response.status_code in RETRY_STATUS_CODES
+            and method.upper() in IDEMPOTENT_METHODS
+        ):
+            return self.backoff(attempt)
+        return None
+
+    def record(self, response: Response, delay: float) -> None:
+        self.stats.retries += 1
+        self.stats.waited += delay
+        if response.status_code == 429:  # noqa: PLR2004
+            self.stats.rate_limited += 1
+        else:
+            self.stats.server_errors += 1
@@ -11,6 +11,7 @@ if PYDANTIC_V2:
 else:
     from pydantic.json import pydantic_encoder
 
+from . import etf
 from .api.model import File
 from .utils import IncEx, model_dump
 
@@ -138,6 +139,30 @@ def encode_model_json_data(  # noqa: PLR0913
     return json.loads(encode_json_text(payload))
 
 
+def encode_model_etf(  # noqa: PLR0913
+    model: BaseModel,
+    include: IncEx | None = None,
+    exclude: IncEx | None = None,
+    *,
+    by_alias: bool = False,
+    exclude_unset: bool = False,
+    exclude_defaults: bool = False,
+    exclude_none: bool = False,
+    omit_unset_values: bool = False,
+) -> bytes:
+    payload = encode_model_json_data(
+        model,
+        include=include,
+        exclude=exclude,
+        by_alias=by_alias,
+        exclude_unset=exclude_unset,
+        exclude_defaults=exclude_defaults,
+        exclude_none=exclude_none,
+        omit_unset_values=omit_unset_values,
+    )
+    return etf.encode(payload)
+
+
 def _resolve_attachment_owner(
     payload: dict[str, Any], attachment_owner_path: tuple[str, ...]
 ) -> dict[str, Any]:
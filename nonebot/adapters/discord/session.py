@@ -0,0 +1,89 @@
+import asyncio
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass
+import json
+import os
+from pathlib import Path
+from typing_extensions import Protocol
+
+
+@dataclass(frozen=True, slots=True)
+class SessionState:
+    """The state a shard needs to resume its gateway session."""
+
+    session_id: str
+    sequence: int
+    resume_gateway_url: str
+
+
+def session_key(self_id: str, shard: tuple[int, int]) -> str:
+    return f"{self_id}:{shard[0]}:{shard[1]}"
+
+
+class SessionStore(Protocol):
+    """Persist gateway sessions across restarts, keyed by :func:`session_key`."""
+
+    async def load(self, key: str) -> SessionState | None: ...
+
+    async def save(self, key: str, state: SessionState | None) -> None:
+        """Save the state of a shard, or forget it if ``state`` is ``None``."""
+        ...
+
+    async def save_many(self, states: Mapping[str, SessionState | None]) -> None:
+        """Save the states of several shards at once, like :meth:`save`."""
+        ...
+
+
+class FileSessionStore:
+    """Keep the sessions of all shards in one JSON file.
+
+    The file is read once and rewritten atomically on every change, once per
+    :meth:`save_many` call however many shards it covers.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self.path = Path(path)
+        self._lock = asyncio.Lock()
+        self._data: dict[str, dict] | None = None
+
+    async def load(self, key: str) -> SessionState | None:
+        async with self._lock:
+            data = await self._read()
+        if (state := data.get(key)) is None:
+            return None
+        try:
+            return SessionState(**state)
+        except TypeError:
+            return None
+
+    async def save(self, key: str, state: SessionState | None) -> None:
+        await self.save_many({key: state})
+
+    async def save_many(self, states: Mapping[str, SessionState | None]) -> None:
+        async with self._lock:
+            data = await self._read()
+            changed = False
+            for key, state in states.items():
+                if state is None:
+                    changed = data.pop(key, None) is not None or changed
+                elif data.get(key) != (value := asdict(state)):
+                    data[key] = value
+                    changed = True
+            if changed:
+                await asyncio.to_thread(self._write, json.dumps(data, indent=2))
+
+    async def _read(self) -> dict[str, dict]:
+        if self._data is None:
+            try:
+                content = await asyncio.to_thread(self.path.read_text, "utf-8")
+                data = json.loads(content)
+            except (OSError, ValueError):
+                data = {}
+            self._data = data if isinstance(data, dict) else {}
+        return self._data
+
+    def _write(self, content: str) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp = self.path.with_name(f"{self.path.name}.tmp")
+        temp.write_text(content, "utf-8")
+        temp.replace(self.path)
@@ -0,0 +1,59 @@
+import asyncio
+from collections.abc import Callable, Coroutine
+from typing import Any, Generic, TypeVar
+
+from .api.model import GatewayBot, User
+
+T = TypeVar("T")
+
+
+class _Shared(Generic[T]):
+    """Run ``fetch`` once and share the result with every caller.
+
+    Concurrent callers wait for the same request. A failed request is retried
+    by the next caller, and :meth:`invalidate` makes the next caller fetch again.
+    """
+
+    def __init__(self, fetch: Callable[[], Coroutine[Any, Any, T]]) -> None:
+        self._fetch = fetch
+        self._task: asyncio.Task[T] | None = None
+
+    async def get(self) -> T:
+        task = self._task
+        if task is None or (
+            task.done() and (task.cancelled() or task.exception() is not None)
+        ):
+            task = self._task = asyncio.create_task(self._fetch())
+        # a cancelled caller must not cancel the request of the others
+        return await asyncio.shield(task)
+
+    def invalidate(self) -> None:
+        if self._task is not None and self._task.done():
+            self._task = None
+
+
+class StartupContext:
+    """The ``gateway/bot`` and ``users/@me`` responses of one bot token.
+
+    All shards of the token share them, so a cold start costs two REST calls
+    instead of two per shard. After :meth:`invalidate_gateway`, the next access
+    fetches the gateway again, which a shard does before it re-identifies. The
+    user of a token does not change, it is only fetched again after a failure.
+    """
+
+    def __init__(
+        self,
+        fetch_gateway: Callable[[], Coroutine[Any, Any, GatewayBot]],
+        fetch_user: Callable[[], Coroutine[Any, Any, User]],
+    ) -> None:
+        self._gateway = _Shared(fetch_gateway)
+        self._user = _Shared(fetch_user)
+
+    async def get_gateway(self) -> GatewayBot:
+        return await self._gateway.get()
+
+    async def get_user(self) -> User:
+        return await self._user.get()
+
+    def invalidate_gateway(self) -> None:
+        self._gateway.invalidate()
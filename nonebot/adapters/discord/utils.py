@@ -1,5 +1,4 @@
 from typing import Any, TypeAlias
-import zlib
 
 from nonebot.compat import PYDANTIC_V2
 from nonebot.utils import logger_wrapper
@@ -76,12 +75,3 @@ def escape(s: str) -> str:
 
 def unescape(s: str) -> str:
     return s.replace("&lt;", "<").replace("&gt;", ">").replace("&amp;", "&")
-
-
-def decompress_data(data: str | bytes, *, compress: bool) -> str | bytes:
-    if not compress:
-        return data
-    if isinstance(data, str):
-        msg = "compressed data must be bytes"
-        raise TypeError(msg)
-    return zlib.decompress(data)
@@ -0,0 +1,99 @@
+import asyncio
+from dataclasses import dataclass
+
+from .api import Snowflake, is_not_unset
+from .api.model import VoiceServerUpdate, VoiceStateUpdate
+from .exception import NetworkError
+
+VOICE_TIMEOUT = 10.0
+
+
+@dataclass(slots=True)
+class VoiceConnection:
+    """The answer of Discord to one Update Voice State.
+
+    ``server`` is ``None`` when the bot left the voice channel. Otherwise
+    ``session_id``, ``endpoint`` and ``token`` are what a voice worker needs to
+    connect to the voice gateway.
+    """
+
+    guild_id: Snowflake
+    state: VoiceStateUpdate
+    server: VoiceServerUpdate | None = None
+
+    @property
+    def channel_id(self) -> Snowflake | None:
+        return self.state.channel_id
+
+    @property
+    def session_id(self) -> str:
+        return self.state.session_id
+
+    @property
+    def endpoint(self) -> str | None:
+        return self.server.endpoint if self.server else None
+
+    @property
+    def token(self) -> str | None:
+        return self.server.token if self.server else None
+
+
+class _Handshake:
+    __slots__ = ("future", "guild_id", "server", "state")
+
+    def __init__(self, guild_id: int) -> None:
+        self.guild_id = Snowflake(guild_id)
+        self.future: asyncio.Future[VoiceConnection] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self.state: VoiceStateUpdate | None = None
+        self.server: VoiceServerUpdate | None = None
+
+    def check(self) -> None:
+        if self.future.done() or self.state is None:
+            return
+        if self.state.channel_id is None:
+            self.future.set_result(VoiceConnection(self.guild_id, self.state))
+        elif self.server is not None:
+            self.future.set_result(
+                VoiceConnection(self.guild_id, self.state, self.server)
+            )
+
+
+class VoiceHandshakes:
+    """Pair the ``VOICE_STATE_UPDATE`` and ``VOICE_SERVER_UPDATE`` of a request.
+
+    Discord sends both events after an Update Voice State, in either order, and
+    only the state when the bot left the channel. A newer request for the same
+    guild supersedes the pending one.
+    """
+
+    def __init__(self) -> None:
+        self._pending: dict[tuple[str, int], _Handshake] = {}
+
+    def open(self, self_id: str, guild_id: int) -> asyncio.Future[VoiceConnection]:
+        previous = self._pending.get((self_id, guild_id))
+        if previous is not None and not previous.future.done():
+            msg = f"Voice state update of guild {guild_id} was superseded"
+            previous.future.set_exception(NetworkError(msg))
+        handshake = self._pending[(self_id, guild_id)] = _Handshake(guild_id)
+        return handshake.future
+
+    def close(
+        self, self_id: str, guild_id: int, future: asyncio.Future[VoiceConnection]
+    ) -> None:
+        handshake = self._pending.get((self_id, guild_id))
+        if handshake is not None and handshake.future is future:
+            del self._pending[(self_id, guild_id)]
+
+    def feed_state(self, self_id: str, state: VoiceStateUpdate) -> None:
+        if str(state.user_id) != self_id or not is_not_unset(state.guild_id):
+            return
+        if handshake := self._pending.get((self_id, state.guild_id)):
+            handshake.state = state
+            handshake.check()
+
+    def feed_server(self, self_id: str, server: VoiceServerUpdate) -> None:
+        if handshake := self._pending.get((self_id, server.guild_id)):
+            handshake.server = server
+            handshake.check()
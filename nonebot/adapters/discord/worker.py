@@ -0,0 +1,25 @@
+"""Entry point of cluster worker processes.
+
+``python -m nonebot.adapters.discord.worker`` starts NoneBot with the Discord
+adapter and the plugins listed in the ``pyproject.toml`` of the working directory,
+like the ``bot.py`` generated by nb-cli. The coordinator passes the shards of the
+worker through the environment, which takes precedence over ``.env`` files.
+"""
+
+from pathlib import Path
+
+import nonebot
+
+from .adapter import Adapter
+
+
+def main() -> None:
+    nonebot.init()
+    nonebot.get_driver().register_adapter(Adapter)
+    if Path("pyproject.toml").is_file():
+        nonebot.load_from_toml("pyproject.toml")
+    nonebot.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+import asyncio
+from collections.abc import AsyncIterator
 from pathlib import Path
 
 import nonebot.adapters
@@ -9,6 +11,7 @@ nonebot.adapters.__path__.append(
     str((Path(__file__).parent.parent / "nonebot" / "adapters").resolve())
 )
 
+from tests.fake.clock import FakeClock  # noqa: E402
 from tests.fake.doubles import DummyAdapter, DummyBot  # noqa: E402
 
 
@@ -32,3 +35,11 @@ def dummy_adapter_list_response() -> DummyAdapter:
 @pytest.fixture
 def dummy_bot() -> DummyBot:
     return DummyBot()
+
+
+@pytest.fixture
+async def fake_clock() -> AsyncIterator[FakeClock]:
+    clock = FakeClock()
+    task = asyncio.create_task(clock.run())
+    yield clock
+    task.cancel()
@@ -0,0 +1,64 @@
+import asyncio
+import heapq
+import itertools
+from types import ModuleType
+from typing import Any
+
+import pytest
+
+# 让出事件循环的次数, 超过后认为其他任务都在等待, 可以推进时间
+SETTLE_ROUNDS = 20
+
+_real_sleep = asyncio.sleep
+
+
+class FakeClock:
+    """Virtual monotonic clock for timing tests.
+
+    ``sleep`` never waits in real time: once every other task is blocked, the clock
+    jumps to the earliest pending wake up time and resumes those sleepers. Patch
+    it in with :meth:`install` and start :meth:`run` in the background.
+    """
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self._sleepers: list[tuple[float, int, asyncio.Future[None]]] = []
+        self._counter = itertools.count()
+        self._pending = asyncio.Event()
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float, result: Any = None) -> Any:  # noqa: ANN401
+        if delay <= 0:
+            return await _real_sleep(0, result)
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._sleepers, (self.now + delay, next(self._counter), future))
+        self._pending.set()
+        await future
+        return result
+
+    def install(self, monkeypatch: pytest.MonkeyPatch, *modules: ModuleType) -> None:
+        """Use the clock for ``asyncio.sleep`` and the ``time`` of ``modules``."""
+        monkeypatch.setattr(asyncio, "sleep", self.sleep)
+        for module in modules:
+            monkeypatch.setattr(module, "time", self)
+
+    async def _settle(self) -> None:
+        for _ in range(SETTLE_ROUNDS):
+            await _real_sleep(0)
+
+    async def run(self) -> None:
+        """Advance the clock whenever every other task is waiting."""
+        while True:
+            await self._pending.wait()
+            await self._settle()
+            if not self._sleepers:
+                self._pending.clear()
+                continue
+            wake_at = self._sleepers[0][0]
+            self.now = max(self.now, wake_at)
+            while self._sleepers and self._sleepers[0][0] <= self.now:
+                _, _, future = heapq.heappop(self._sleepers)
+                if not future.done():
+                    future.set_result(None)
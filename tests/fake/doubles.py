@@ -1,19 +1,24 @@
+from functools import partial
 from typing_extensions import override
 
 from nonebot.adapters.discord.adapter import Adapter
 from nonebot.adapters.discord.api.handle import HandleMixin
 from nonebot.adapters.discord.bot import Bot
 from nonebot.adapters.discord.config import BotInfo, Config
+from nonebot.adapters.discord.gateway import GatewayWebSocket
+from nonebot.adapters.discord.presence import PresenceCoalescer
+from nonebot.adapters.discord.session import session_key
+from tests.fake.websocket import ScriptedWebSocket
 
 from nonebot.drivers import Request, Response
-from yarl import URL
 
 
 class DummyAdapter(Adapter, HandleMixin):
-    base_url = URL("https://discord.com/api/v10")
+    """An adapter without a driver, with the state of a freshly started one."""
 
     def __init__(self, *, status_code: int = 200, content: bytes = b"{}") -> None:
         self.discord_config = Config()
+        self._init_state()
         self.status_code = status_code
         self.content = content
         self.request_calls = 0
@@ -41,3 +46,24 @@ class DummyBot(Bot):
         if adapter is None:
             adapter = DummyAdapter()
         super().__init__(adapter=adapter, self_id="1", bot_info=BotInfo(token=token))
+
+
+def sharded_bots(
+    adapter: DummyAdapter, shard_count: int = 2
+) -> list[tuple[DummyBot, ScriptedWebSocket]]:
+    """Connect one bot per shard, as ``_create_bot`` and ``_connect`` do.
+
+    Returns each bot with the websocket that records what its shard sends.
+    """
+    shards = []
+    for shard_id in range(shard_count):
+        bot = DummyBot(adapter)
+        bot.shard = (shard_id, shard_count)
+        ws = ScriptedWebSocket()
+        bot.gateway = GatewayWebSocket(ws, shard=bot.shard)
+        bot.presence_updater = PresenceCoalescer(
+            partial(adapter._send_presence, bot)  # noqa: SLF001
+        )
+        adapter.shard_bots[session_key(bot.self_id, bot.shard)] = bot
+        shards.append((bot, ws))
+    return shards
@@ -0,0 +1,471 @@
+"""An in-process stand-in for the Discord gateway.
+
+:class:`FakeGateway` speaks enough of the gateway protocol (HELLO, IDENTIFY,
+RESUME, heartbeats, zlib-stream, json and etf) to run the real connection code
+of the adapter against it. Tests can inject RECONNECT, INVALID_SESSION and close
+codes on a connection, and emit synthetic dispatch streams at a given rate
+across every connected shard. :class:`FakeGatewayAdapter` is an adapter whose
+websocket and REST calls go to a :class:`FakeGateway` instead of Discord.
+"""
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncGenerator, AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+import itertools
+import json
+import time
+from typing import Any
+from typing_extensions import override
+from unittest import mock
+import zlib
+
+import nonebot
+from nonebot.adapters.discord import etf
+from nonebot.adapters.discord.adapter import Adapter
+from nonebot.adapters.discord.config import BotInfo, Config
+from nonebot.adapters.discord.identify import IdentifyLimiter
+
+from nonebot.drivers import Request, Response, WebSocket
+from nonebot.exception import WebSocketClosed
+from yarl import URL
+
+GATEWAY_URL = "wss://gateway.discord.test"
+RESUME_GATEWAY_URL = "wss://resume.discord.test"
+BOT_USER = {
+    "id": "1000",
+    "username": "fake-bot",
+    "discriminator": "0",
+    "avatar": None,
+    "bot": True,
+}
+APPLICATION_ID = "2000"
+# close codes after which Discord does not allow resuming the session
+SESSION_ENDING_CLOSE_CODES = {1000, 1001, 4007, 4009}
+HISTORY_SIZE = 1000
+
+EventFactory = Callable[[int, int], tuple[str, dict[str, Any]]]
+
+
+def message_event(index: int, guild_id: int) -> tuple[str, dict[str, Any]]:
+    """A guild ``MESSAGE_CREATE`` from a user other than the bot."""
+    return "MESSAGE_CREATE", {
+        "id": str(10_000 + index),
+        "channel_id": "3000",
+        "guild_id": str(guild_id),
+        "author": {
+            "id": "4000",
+            "username": "user",
+            "discriminator": "0",
+            "avatar": None,
+        },
+        "content": f"message {index}",
+        "timestamp": "2026-01-01T00:00:00+00:00",
+        "edited_timestamp": None,
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": [],
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": [],
+        "pinned": False,
+        "type": 0,
+    }
+
+
+@dataclass(eq=False)
+class FakeSession:
+    session_id: str
+    shard: tuple[int, int]
+    sequence: int = 0
+    history: deque[dict[str, Any]] = field(
+        default_factory=lambda: deque(maxlen=HISTORY_SIZE)
+    )
+
+
+@dataclass(frozen=True)
+class _Close:
+    code: int
+    reason: str = ""
+
+
+class FakeConnection:
+    """The server side of one gateway connection."""
+
+    def __init__(self, gateway: "FakeGateway", request: Request) -> None:
+        self.gateway = gateway
+        self.request = request
+        # the adapter reuses and updates one request per shard
+        self.url = request.url
+        query = self.url.query
+        self.etf = query.get("encoding") == "etf"
+        compress = query.get("compress")
+        if compress not in {None, "zlib-stream"}:
+            msg = f"FakeGateway does not support {compress}"
+            raise ValueError(msg)
+        self._compressor = zlib.compressobj() if compress else None
+        self.inbox: asyncio.Queue[str | bytes | _Close] = asyncio.Queue()
+        self.outbox: asyncio.Queue[str | bytes | _Close] = asyncio.Queue()
+        self.received: list[dict[str, Any]] = []
+        self.session: FakeSession | None = None
+        self.ready = asyncio.Event()
+        self.close_code: int | None = None
+
+    @property
+    def closed(self) -> bool:
+        return self.close_code is not None
+
+    @property
+    def shard(self) -> tuple[int, int] | None:
+        return self.session.shard if self.session else None
+
+    def _encode(self, payload: dict[str, Any]) -> str | bytes:
+        data: str | bytes = (
+            etf.encode(payload)
+            if self.etf
+            else json.dumps(payload, separators=(",", ":"))
+        )
+        if self._compressor is None:
+            return data
+        raw = data if isinstance(data, bytes) else data.encode()
+        return self._compressor.compress(raw) + self._compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def _decode(self, data: str | bytes) -> dict[str, Any]:
+        return etf.decode(data) if isinstance(data, bytes) else json.loads(data)
+
+    async def send(self, payload: dict[str, Any]) -> None:
+        if not self.closed:
+            await self.outbox.put(self._encode(payload))
+
+    async def dispatch(self, event_type: str, data: dict[str, Any]) -> None:
+        if self.session is None:
+            msg = "The connection has no session yet"
+            raise RuntimeError(msg)
+        self.session.sequence += 1
+        payload = {"op": 0, "s": self.session.sequence, "t": event_type, "d": data}
+        self.session.history.append(payload)
+        await self.send(payload)
+
+    async def reconnect(self) -> None:
+        """Ask the client to reconnect and resume (opcode 7)."""
+        await self.send({"op": 7, "d": None})
+
+    async def invalidate_session(self, *, resumable: bool = False) -> None:
+        """Send INVALID_SESSION (opcode 9)."""
+        if not resumable and self.session is not None:
+            self.gateway.sessions.pop(self.session.session_id, None)
+        await self.send({"op": 9, "d": resumable})
+
+    async def close(self, code: int = 4000, reason: str = "") -> None:
+        """Close the connection from the server side with ``code``."""
+        if self.closed:
+            return
+        self.close_code = code
+        if code in SESSION_ENDING_CLOSE_CODES and self.session is not None:
+            self.gateway.sessions.pop(self.session.session_id, None)
+        await self.outbox.put(_Close(code, reason))
+        await self.inbox.put(_Close(code, reason))
+
+    async def serve(self) -> None:
+        await self.send(
+            {"op": 10, "d": {"heartbeat_interval": self.gateway.heartbeat_interval}}
+        )
+        while True:
+            data = await self.inbox.get()
+            if isinstance(data, _Close):
+                return
+            payload = self._decode(data)
+            self.received.append(payload)
+            if payload["op"] == 1 and self.gateway.ack_heartbeats:
+                await self.send({"op": 11})
+            elif payload["op"] == 2:
+                await self.gateway.identify(self, payload["d"])
+            elif payload["op"] == 6:
+                await self.gateway.resume(self, payload["d"])
+
+
+class FakeClientWebSocket(WebSocket):
+    """The client side of a :class:`FakeConnection`."""
+
+    def __init__(self, connection: FakeConnection) -> None:
+        super().__init__(request=connection.request)
+        self.connection = connection
+
+    @property
+    @override
+    def closed(self) -> bool:
+        return self.connection.closed
+
+    @override
+    async def accept(self) -> None:
+        return None
+
+    @override
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        await self.connection.close(code, reason)
+
+    @override
+    async def receive(self) -> str | bytes:
+        data = await self.connection.outbox.get()
+        if isinstance(data, _Close):
+            await self.connection.outbox.put(data)
+            raise WebSocketClosed(data.code, data.reason)
+        return data
+
+    @override
+    async def receive_text(self) -> str:
+        data = await self.receive()
+        return data.decode() if isinstance(data, bytes) else data
+
+    @override
+    async def receive_bytes(self) -> bytes:
+        data = await self.receive()
+        return data.encode() if isinstance(data, str) else data
+
+    @override
+    async def send_text(self, data: str) -> None:
+        if self.closed:
+            raise WebSocketClosed(self.connection.close_code or 1006)
+        await self.connection.inbox.put(data)
+
+    @override
+    async def send_bytes(self, data: bytes) -> None:
+        if self.closed:
+            raise WebSocketClosed(self.connection.close_code or 1006)
+        await self.connection.inbox.put(data)
+
+
+class FakeGateway:
+    """A local gateway for ``shard_count`` shards of one bot.
+
+    ``guild_ids`` are announced in READY to the shard that owns them, and are
+    where synthetic events are sent from.
+    """
+
+    def __init__(
+        self,
+        *,
+        shard_count: int = 1,
+        heartbeat_interval: int = 41250,
+        guild_ids: list[int] | None = None,
+        max_concurrency: int = 1,
+    ) -> None:
+        self.shard_count = shard_count
+        self.heartbeat_interval = heartbeat_interval
+        self.guild_ids = guild_ids or [shard << 22 for shard in range(shard_count)]
+        self.max_concurrency = max_concurrency
+        self.ack_heartbeats = True
+        # close code sent instead of READY, e.g. 4004 for an invalid token
+        self.identify_close_code: int | None = None
+        self.sessions: dict[str, FakeSession] = {}
+        self.connections: list[FakeConnection] = []
+        self._session_ids = itertools.count(1)
+        self._ready_changed = asyncio.Condition()
+
+    @property
+    def ready_connections(self) -> list[FakeConnection]:
+        return [
+            connection
+            for connection in self.connections
+            if connection.ready.is_set() and not connection.closed
+        ]
+
+    def shard_guilds(self, shard: tuple[int, int]) -> list[int]:
+        return [
+            guild_id
+            for guild_id in self.guild_ids
+            if (guild_id >> 22) % shard[1] == shard[0]
+        ]
+
+    def gateway_bot(self) -> dict[str, Any]:
+        return {
+            "url": GATEWAY_URL,
+            "shards": self.shard_count,
+            "session_start_limit": {
+                "total": 1000,
+                "remaining": 1000,
+                "reset_after": 0,
+                "max_concurrency": self.max_concurrency,
+            },
+        }
+
+    @asynccontextmanager
+    async def connect(self, request: Request) -> AsyncGenerator[WebSocket, None]:
+        connection = FakeConnection(self, request)
+        self.connections.append(connection)
+        task = asyncio.create_task(connection.serve())
+        try:
+            yield FakeClientWebSocket(connection)
+        finally:
+            task.cancel()
+            if not connection.closed:
+                connection.close_code = 1006
+
+    async def identify(self, connection: FakeConnection, data: dict[str, Any]) -> None:
+        if self.identify_close_code is not None:
+            await connection.close(self.identify_close_code)
+            return
+        shard_id, shard_count = data.get("shard", [0, 1])
+        if shard_count != self.shard_count or not 0 <= shard_id < shard_count:
+            await connection.close(4010, "Invalid shard")
+            return
+        session = FakeSession(
+            f"session-{next(self._session_ids)}", (shard_id, shard_count)
+        )
+        self.sessions[session.session_id] = session
+        connection.session = session
+        await connection.dispatch(
+            "READY",
+            {
+                "v": 10,
+                "user": BOT_USER,
+                "guilds": [
+                    {"id": str(guild_id), "unavailable": True}
+                    for guild_id in self.shard_guilds(session.shard)
+                ],
+                "session_id": session.session_id,
+                "resume_gateway_url": RESUME_GATEWAY_URL,
+                "shard": list(session.shard),
+                "application": {"id": APPLICATION_ID, "flags": 0},
+            },
+        )
+        await self._set_ready(connection)
+
+    async def resume(self, connection: FakeConnection, data: dict[str, Any]) -> None:
+        session = self.sessions.get(data["session_id"])
+        if session is None:
+            await connection.send({"op": 9, "d": False})
+            return
+        connection.session = session
+        # replay what the client missed, as Discord does
+        for payload in list(session.history):
+            if payload["s"] > data["seq"]:
+                await connection.send(payload)
+        await connection.dispatch("RESUMED", {})
+        await self._set_ready(connection)
+
+    async def _set_ready(self, connection: FakeConnection) -> None:
+        connection.ready.set()
+        async with self._ready_changed:
+            self._ready_changed.notify_all()
+
+    async def wait_ready(self, count: int | None = None, timeout: float = 5) -> None:
+        """Wait until ``count`` (default: every shard) connections are ready."""
+        count = self.shard_count if count is None else count
+
+        async def _wait() -> None:
+            async with self._ready_changed:
+                await self._ready_changed.wait_for(
+                    lambda: len(self.ready_connections) >= count
+                )
+
+        await asyncio.wait_for(_wait(), timeout)
+
+    async def wait_connection(self, index: int, timeout: float = 5) -> FakeConnection:
+        """Wait until the ``index``-th connection is ready and return it."""
+
+        async def _wait() -> None:
+            async with self._ready_changed:
+                await self._ready_changed.wait_for(
+                    lambda: (
+                        len(self.connections) > index
+                        and self.connections[index].ready.is_set()
+                    )
+                )
+
+        await asyncio.wait_for(_wait(), timeout)
+        return self.connections[index]
+
+    async def stream(
+        self,
+        rate: float,
+        count: int,
+        event: EventFactory = message_event,
+    ) -> int:
+        """Emit ``count`` dispatches at ``rate`` per second across all shards.
+
+        Each event comes from the next guild in turn, on the shard that owns it.
+        Returns how many were sent, events of disconnected shards are dropped.
+        """
+        start = time.perf_counter()
+        sent = 0
+        for index in range(count):
+            if (delay := start + index / rate - time.perf_counter()) > 0:
+                await asyncio.sleep(delay)
+            guild_id = self.guild_ids[index % len(self.guild_ids)]
+            shard_id = (guild_id >> 22) % self.shard_count
+            connection = next(
+                (
+                    connection
+                    for connection in self.ready_connections
+                    if connection.shard == (shard_id, self.shard_count)
+                ),
+                None,
+            )
+            if connection is None:
+                continue
+            await connection.dispatch(*event(index, guild_id))
+            sent += 1
+        return sent
+
+
+class FakeGatewayAdapter(Adapter):
+    """A real adapter whose gateway and REST endpoints are a :class:`FakeGateway`.
+
+    Identifies are paced every ``identify_interval`` seconds per bucket instead
+    of Discord's five, so reconnect tests do not have to wait.
+    """
+
+    def __init__(
+        self, gateway: FakeGateway, config: Config, *, identify_interval: float = 0.0
+    ) -> None:
+        with mock.patch(
+            "nonebot.adapters.discord.adapter.get_plugin_config", return_value=config
+        ):
+            super().__init__(nonebot.get_driver())
+        self.gateway = gateway
+        self.identify_interval = identify_interval
+        # paths of the REST requests made so far
+        self.requested: list[str] = []
+
+    @override
+    async def _prepare_identify(self, bot_info: BotInfo) -> tuple[URL, int | None]:
+        result = await super()._prepare_identify(bot_info)
+        limiter = self.identify_limiters[bot_info.token]
+        if isinstance(limiter, IdentifyLimiter):
+            limiter.interval = self.identify_interval
+        return result
+
+    @override
+    def setup(self) -> None:
+        return None
+
+    @override
+    @asynccontextmanager
+    async def websocket(self, setup: Request) -> AsyncGenerator[WebSocket, None]:
+        async with self.gateway.connect(setup) as ws:
+            yield ws
+
+    @override
+    async def request(self, setup: Request) -> Response:
+        path = setup.url.path
+        self.requested.append(path)
+        if path.endswith("/gateway/bot"):
+            return Response(200, content=json.dumps(self.gateway.gateway_bot()))
+        if path.endswith("/users/@me"):
+            return Response(200, content=json.dumps(BOT_USER))
+        return Response(404, content=b'{"message": "404: Not Found", "code": 0}')
+
+
+@asynccontextmanager
+async def running(adapter: FakeGatewayAdapter) -> AsyncIterator[None]:
+    """Start ``adapter`` and shut it down with all its tasks afterwards."""
+    await adapter.startup()
+    try:
+        yield
+    finally:
+        await adapter.shutdown()
+        await asyncio.gather(*adapter.tasks, return_exceptions=True)
@@ -0,0 +1,95 @@
+import asyncio
+from collections.abc import Iterable
+import json
+from typing import Any
+from typing_extensions import override
+
+from nonebot.drivers import Request, WebSocket
+from nonebot.exception import WebSocketClosed
+
+
+class ScriptedWebSocket(WebSocket):
+    """A client websocket that receives scripted frames and records what is sent.
+
+    ``receive`` returns the ``frames`` and those passed to :meth:`feed` in order,
+    and waits when there are none left. Feeding ``None`` closes the socket from
+    the server side. Sending on a closed socket fails like a real one.
+    """
+
+    def __init__(
+        self,
+        frames: Iterable[str | bytes | None] = (),
+        *,
+        request: Request | None = None,
+    ) -> None:
+        super().__init__(
+            request=request or Request("GET", "wss://discord.test/gateway")
+        )
+        self.incoming: asyncio.Queue[str | bytes | None] = asyncio.Queue()
+        self.feed(*frames)
+        self.sent: list[str | bytes] = []
+        self.close_code: int | None = None
+        self._sent_changed = asyncio.Condition()
+
+    def feed(self, *frames: str | bytes | None) -> None:
+        for frame in frames:
+            self.incoming.put_nowait(frame)
+
+    @property
+    def sent_payloads(self) -> list[dict[str, Any]]:
+        return [json.loads(data) for data in self.sent]
+
+    async def wait_sent(self, count: int = 1, timeout: float = 1) -> None:
+        """Wait until at least ``count`` frames were sent."""
+
+        async def _wait() -> None:
+            async with self._sent_changed:
+                await self._sent_changed.wait_for(lambda: len(self.sent) >= count)
+
+        await asyncio.wait_for(_wait(), timeout)
+
+    @property
+    @override
+    def closed(self) -> bool:
+        return self.close_code is not None
+
+    @override
+    async def accept(self) -> None:
+        return None
+
+    @override
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        del reason
+        self.close_code = code
+
+    @override
+    async def receive(self) -> str | bytes:
+        data = await self.incoming.get()
+        if data is None:
+            raise WebSocketClosed(1000)
+        return data
+
+    @override
+    async def receive_text(self) -> str:
+        data = await self.receive()
+        return data.decode() if isinstance(data, bytes) else data
+
+    @override
+    async def receive_bytes(self) -> bytes:
+        data = await self.receive()
+        return data.encode() if isinstance(data, str) else data
+
+    @override
+    async def send_text(self, data: str) -> None:
+        await self._record(data)
+
+    @override
+    async def send_bytes(self, data: bytes) -> None:
+        await self._record(data)
+
+    async def _record(self, data: str | bytes) -> None:
+        if self.closed:
+            raise WebSocketClosed(self.close_code or 1006)
+        async with self._sent_changed:
+            self.sent.append(data)
+            self._sent_changed.notify_all()
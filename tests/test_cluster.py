@@ -0,0 +1,233 @@
+import asyncio
+import itertools
+import json
+from pathlib import Path
+import sys
+import time
+
+from nonebot.adapters.discord.api.model import GatewayBot
+from nonebot.adapters.discord.cluster import (
+    ClusterCoordinator,
+    RemoteIdentifyLimiter,
+    identify_key,
+    split_shards,
+    worker_command,
+)
+from nonebot.adapters.discord.config import BotInfo, Config
+from nonebot.adapters.discord.session import FileSessionStore, SessionState
+from tests.fake.doubles import DummyAdapter
+
+from nonebot.compat import type_validate_python
+import pytest
+from yarl import URL
+
+ADAPTERS_PATH = Path(__file__).parent.parent / "nonebot" / "adapters"
+
+# a worker that identifies every shard of its range and records when
+WORKER_SCRIPT = f"""
+import asyncio, json, os, sys, time
+from pathlib import Path
+
+import nonebot.adapters
+
+nonebot.adapters.__path__.append({str(ADAPTERS_PATH.resolve())!r})
+
+from nonebot.adapters.discord.cluster import RemoteIdentifyLimiter, identify_key
+
+
+async def main():
+    times = []
+    for bot in json.loads(os.environ["DISCORD_BOTS"]):
+        limiter = RemoteIdentifyLimiter(
+            os.environ["DISCORD_CLUSTER_COORDINATOR"],
+            identify_key(bot["token"]),
+            os.environ["DISCORD_CLUSTER_SECRET"],
+        )
+        for shard in range(*bot["shard_range"]):
+            await limiter.acquire(shard)
+            times.append(time.time())
+    start = bot["shard_range"][0]
+    Path(sys.argv[1], f"{{start}}.json").write_text(json.dumps(times))
+
+
+asyncio.run(main())
+"""
+
+
+def _gateway(shards: int, max_concurrency: int = 1) -> GatewayBot:
+    return type_validate_python(
+        GatewayBot,
+        {
+            "url": "wss://gateway.discord.gg",
+            "shards": shards,
+            "session_start_limit": {
+                "total": 1000,
+                "remaining": 1000,
+                "reset_after": 0,
+                "max_concurrency": max_concurrency,
+            },
+        },
+    )
+
+
+def _read_times(path: Path) -> list[float]:
+    return sorted(
+        at for file in path.glob("*.json") for at in json.loads(file.read_text())
+    )
+
+
+def test_split_shards() -> None:
+    assert split_shards(8, 3) == [(0, 3), (3, 6), (6, 8)]
+    assert split_shards(2, 3) == [(0, 1), (1, 2), (2, 2)]
+
+
+def test_worker_env_assigns_shard_ranges() -> None:
+    cluster = ClusterCoordinator(2)
+    cluster.add_bot(BotInfo(token="a" * 10), _gateway(5))
+    cluster.add_bot(BotInfo(token="b" * 10, shard=(0, 1)), _gateway(1))
+    cluster.address = "127.0.0.1:1234"
+
+    workers = [
+        type_validate_python(Config, {"discord_bots": json.loads(env["DISCORD_BOTS"])})
+        for env in (cluster.worker_env(0), cluster.worker_env(1))
+    ]
+
+    assert [
+        (bot.token, bot.shard, bot.shard_range, bot.shard_count)
+        for bot in workers[0].discord_bots
+    ] == [("a" * 10, None, (0, 3), 5), ("b" * 10, (0, 1), None, None)]
+    assert [
+        (bot.token, bot.shard_range, bot.shard_count) for bot in workers[1].discord_bots
+    ] == [("a" * 10, (3, 5), 5)]
+    assert cluster.worker_env(1)["DISCORD_CLUSTER_COORDINATOR"] == "127.0.0.1:1234"
+    assert cluster.worker_env(1)["DISCORD_CLUSTER_WORKERS"] == "0"
+    assert cluster.worker_env(1)["DISCORD_CLUSTER_SECRET"] == cluster.secret
+
+
+@pytest.mark.asyncio
+async def test_workers_keep_their_sessions_apart(tmp_path: Path) -> None:
+    path = tmp_path / "sessions.json"
+    cluster = ClusterCoordinator(2, session_file=path)
+    cluster.add_bot(BotInfo(token="a" * 10), _gateway(2))
+    state = SessionState("abc", 42, "wss://resume.discord.gg")
+
+    workers = [
+        FileSessionStore(env["DISCORD_SESSION_FILE"])
+        for env in (cluster.worker_env(0), cluster.worker_env(1))
+    ]
+    # both workers read their file before either of them saved
+    assert [await store.load("1:0:2") for store in workers] == [None, None]
+    await workers[0].save("1:0:2", state)
+    await workers[1].save("1:1:2", state)
+
+    assert {store.path.name for store in workers} == {
+        "sessions.worker0.json",
+        "sessions.worker1.json",
+    }
+    assert await FileSessionStore(workers[0].path).load("1:0:2") == state
+    assert await FileSessionStore(workers[1].path).load("1:1:2") == state
+
+
+def test_worker_env_keeps_auto_intents() -> None:
+    cluster = ClusterCoordinator(1)
+    cluster.add_bot(
+        type_validate_python(BotInfo, {"token": "a" * 10, "intent": "auto"}),
+        _gateway(1),
+    )
+
+    (bot,) = json.loads(cluster.worker_env(0)["DISCORD_BOTS"])
+    assert bot["intent"] == {"auto": True}
+
+
+@pytest.mark.asyncio
+async def test_worker_runs_its_shard_range_with_remote_identify(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    bot_info = BotInfo(token="x" * 10, shard_range=(2, 4), shard_count=8)
+    cluster = ClusterCoordinator(0)
+    cluster.add_bot(bot_info, _gateway(6))
+    cluster.limiters[identify_key(bot_info.token)].interval = 0.05
+    await cluster.start()
+    assert cluster.address is not None
+
+    adapter = DummyAdapter()
+    adapter.discord_config = Config(
+        discord_cluster_coordinator=cluster.address,
+        discord_cluster_secret=cluster.secret,
+    )
+    started: list[tuple[URL, tuple[int, int]]] = []
+
+    async def forward_ws(
+        bot_info: BotInfo, ws_url: URL, shard: tuple[int, int]
+    ) -> None:
+        del bot_info
+        started.append((ws_url, shard))
+
+    monkeypatch.setattr(adapter, "_forward_ws", forward_ws)
+    try:
+        await adapter.run_bot(bot_info)
+        await asyncio.gather(*adapter.tasks)
+
+        limiter = adapter.identify_limiters[bot_info.token]
+        assert isinstance(limiter, RemoteIdentifyLimiter)
+        start = time.monotonic()
+        await asyncio.gather(limiter.acquire(2), limiter.acquire(3))
+        assert time.monotonic() - start >= 0.045
+    finally:
+        await cluster.stop()
+
+    assert started == [
+        (URL("wss://gateway.discord.gg"), (2, 8)),
+        (URL("wss://gateway.discord.gg"), (3, 8)),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_coordinator_rejects_requests_without_secret() -> None:
+    bot_info = BotInfo(token="x" * 10)
+    cluster = ClusterCoordinator(0)
+    cluster.add_bot(bot_info, _gateway(1))
+    await cluster.start()
+    assert cluster.address is not None
+    try:
+        for secret in ("", "0" * len(cluster.secret)):
+            limiter = RemoteIdentifyLimiter(
+                cluster.address, identify_key(bot_info.token), secret
+            )
+            with pytest.raises(RuntimeError, match="Invalid cluster secret"):
+                await limiter.gateway()
+            with pytest.raises(RuntimeError, match="Invalid cluster secret"):
+                await limiter.acquire(0)
+    finally:
+        await cluster.stop()
+
+
+def test_default_worker_command_runs_the_worker_module() -> None:
+    assert worker_command() == [
+        sys.executable,
+        "-m",
+        "nonebot.adapters.discord.worker",
+    ]
+    assert ClusterCoordinator(1).secret != ClusterCoordinator(1).secret
+
+
+@pytest.mark.asyncio
+async def test_workers_share_identify_buckets(tmp_path: Path) -> None:
+    bot_info = BotInfo(token="x" * 10)
+    cluster = ClusterCoordinator(2)
+    cluster.add_bot(bot_info, _gateway(4))
+    cluster.limiters[identify_key(bot_info.token)].interval = 0.1
+
+    await cluster.start([sys.executable, "-c", WORKER_SCRIPT, str(tmp_path)])
+    try:
+        await asyncio.sleep(0.1)
+        await asyncio.wait_for(
+            asyncio.gather(*(process.wait() for process in cluster.processes.values())),
+            30,
+        )
+    finally:
+        await cluster.stop()
+
+    times = _read_times(tmp_path)
+    assert len(times) == 4
+    assert all(b - a >= 0.09 for a, b in itertools.pairwise(times))
@@ -0,0 +1,183 @@
+import asyncio
+
+from nonebot.adapters.discord.dispatch import EventDispatcher
+from nonebot.adapters.discord.event import (
+    DirectTypingStartEvent,
+    Event,
+    GuildRoleDeleteEvent,
+    ResumedEvent,
+)
+from nonebot.adapters.discord.payload import Dispatch, Opcode
+from tests.fake.doubles import DummyAdapter, DummyBot
+
+from nonebot.compat import type_validate_python
+import pytest
+
+
+class _Recorder:
+    def __init__(self) -> None:
+        self.handled: list[Event] = []
+        self.release = asyncio.Event()
+        self.running = 0
+        self.max_running = 0
+
+    async def __call__(self, event: Event) -> None:
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await self.release.wait()
+            self.handled.append(event)
+        finally:
+            self.running -= 1
+
+
+def _event() -> Event:
+    return type_validate_python(ResumedEvent, {})
+
+
+@pytest.mark.asyncio
+async def test_workers_bound_concurrency_and_drain_queue() -> None:
+    recorder = _Recorder()
+    dispatcher = EventDispatcher(recorder, workers=2, max_size=10)
+    tasks = dispatcher.start()
+    assert len(tasks) == 2
+    assert dispatcher.start() is tasks
+
+    events = [_event() for _ in range(5)]
+    for event in events:
+        assert await dispatcher.put("MESSAGE_CREATE", event)
+    await asyncio.sleep(0)
+
+    assert recorder.max_running == 2
+    assert dispatcher.depth == 3
+    assert dispatcher.max_depth == 5
+
+    recorder.release.set()
+    for _ in range(10):
+        await asyncio.sleep(0)
+    assert sorted(map(id, recorder.handled)) == sorted(map(id, events))
+    assert dispatcher.depth == 0
+    dispatcher.stop()
+    assert not dispatcher.running
+
+
+@pytest.mark.asyncio
+async def test_block_policy_waits_for_room() -> None:
+    recorder = _Recorder()
+    dispatcher = EventDispatcher(recorder, workers=1, max_size=1)
+    dispatcher.start()
+    await dispatcher.put("MESSAGE_CREATE", _event())
+    await asyncio.sleep(0)
+    await dispatcher.put("MESSAGE_CREATE", _event())
+
+    blocked = asyncio.create_task(dispatcher.put("MESSAGE_CREATE", _event()))
+    await asyncio.sleep(0)
+    assert not blocked.done()
+
+    recorder.release.set()
+    assert await asyncio.wait_for(blocked, 1)
+    assert dispatcher.dropped == 0
+    dispatcher.stop()
+
+
+@pytest.mark.asyncio
+async def test_shed_policy_drops_new_events() -> None:
+    dispatcher = EventDispatcher(_Recorder(), workers=1, max_size=2, overflow="shed")
+
+    assert await dispatcher.put("MESSAGE_CREATE", _event())
+    assert await dispatcher.put("MESSAGE_CREATE", _event())
+    assert not await dispatcher.put("MESSAGE_CREATE", _event())
+    assert dispatcher.depth == 2
+    assert dispatcher.dropped == 1
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest_policy_evicts_low_priority_events() -> None:
+    dispatcher = EventDispatcher(
+        _Recorder(),
+        workers=1,
+        max_size=2,
+        overflow="drop_oldest",
+        low_priority={"TYPING_START"},
+    )
+    typing, message = _event(), _event()
+    await dispatcher.put("TYPING_START", typing)
+    await dispatcher.put("MESSAGE_CREATE", message)
+
+    assert await dispatcher.put("MESSAGE_CREATE", _event())
+    assert all(event is not typing for _, event in dispatcher._lanes[0])  # noqa: SLF001
+    assert not await dispatcher.put("TYPING_START", _event())
+    assert dispatcher.dropped == 2
+
+    blocked = asyncio.create_task(dispatcher.put("MESSAGE_CREATE", _event()))
+    await asyncio.sleep(0)
+    assert not blocked.done()
+    blocked.cancel()
+
+
+@pytest.mark.asyncio
+async def test_adapter_dispatch_uses_bot_dispatcher() -> None:
+    adapter = DummyAdapter()
+    bot = DummyBot(adapter)
+    bot.dispatcher = EventDispatcher(_Recorder(), workers=1, max_size=10)
+
+    await adapter._dispatch(  # noqa: SLF001
+        bot, Dispatch(op=Opcode.DISPATCH, s=3, t="RESUMED", d={})
+    )
+
+    assert bot.dispatcher.depth == 1
+    assert not adapter.tasks
+
+
+def _typing(channel_id: int, user_id: int = 1) -> Event:
+    return type_validate_python(
+        DirectTypingStartEvent,
+        {"channel_id": channel_id, "user_id": user_id, "timestamp": 0},
+    )
+
+
+@pytest.mark.asyncio
+async def test_ordered_lanes_keep_channel_order() -> None:
+    handled: list[tuple[int, int]] = []
+    running: set[int] = set()
+    overlapped: list[int] = []
+    done = asyncio.Event()
+
+    async def handler(event: Event) -> None:
+        assert isinstance(event, DirectTypingStartEvent)
+        if event.channel_id in running:
+            overlapped.append(event.channel_id)
+        running.add(event.channel_id)
+        await asyncio.sleep(0.001 * (event.user_id % 3))
+        running.discard(event.channel_id)
+        handled.append((event.channel_id, event.user_id))
+        if len(handled) == 30:
+            done.set()
+
+    dispatcher = EventDispatcher(handler, workers=4, max_size=100, ordered=True)
+    assert dispatcher.ordered
+    dispatcher.start()
+    for user_id in range(1, 11):
+        for channel_id in (100, 101, 102):
+            await dispatcher.put("TYPING_START", _typing(channel_id, user_id))
+    await asyncio.wait_for(done.wait(), 5)
+    dispatcher.stop()
+
+    assert not overlapped
+    for channel_id in (100, 101, 102):
+        users = [user for channel, user in handled if channel == channel_id]
+        assert users == list(range(1, 11))
+
+
+@pytest.mark.asyncio
+async def test_ordered_lanes_fall_back_to_guild_id() -> None:
+    dispatcher = EventDispatcher(_Recorder(), workers=4, max_size=10, ordered=True)
+    role_delete = type_validate_python(
+        GuildRoleDeleteEvent, {"guild_id": 6, "role_id": 1}
+    )
+
+    await dispatcher.put("GUILD_ROLE_DELETE", role_delete)
+    await dispatcher.put("TYPING_START", _typing(10))
+
+    lanes = dispatcher._lanes  # noqa: SLF001
+    assert [len(lane) for lane in lanes] == [0, 0, 2, 0]
@@ -0,0 +1,151 @@
+from collections.abc import Iterator
+
+from nonebot import on, on_message, on_notice
+from nonebot.adapters import Event as BaseEvent
+from nonebot.adapters.discord.event import (
+    GuildMessageCreateEvent,
+    TypingStartEvent,
+)
+from nonebot.adapters.discord.interest import EventInterest
+from nonebot.adapters.discord.payload import Dispatch, Opcode
+from tests.fake.doubles import DummyAdapter, DummyBot
+
+from nonebot.matcher import Matcher
+import pytest
+
+
+@pytest.fixture
+def registered() -> Iterator[list[type[Matcher]]]:
+    created: list[type[Matcher]] = []
+    yield created
+    for matcher in created:
+        matcher.destroy()
+
+
+def test_disabled_interest_parses_everything() -> None:
+    interest = EventInterest()
+
+    assert interest.is_interested("MESSAGE_CREATE")
+    assert interest.is_interested("TYPING_START")
+
+
+def test_message_matcher_only_wants_message_events(
+    registered: list[type[Matcher]],
+) -> None:
+    registered.append(on_message())
+    interest = EventInterest(auto=True)
+
+    assert interest.is_interested("MESSAGE_CREATE")
+    assert not interest.is_interested("TYPING_START")
+    assert not interest.is_interested("GUILD_ROLE_CREATE")
+
+
+def test_handler_annotation_narrows_interest(
+    registered: list[type[Matcher]],
+) -> None:
+    matcher = on_notice()
+
+    @matcher.handle()
+    async def _(event: TypingStartEvent) -> None:
+        del event
+
+    registered.append(matcher)
+    interest = EventInterest(auto=True)
+
+    assert interest.is_interested("TYPING_START")
+    assert not interest.is_interested("GUILD_ROLE_CREATE")
+    assert not interest.is_interested("MESSAGE_CREATE")
+
+
+def test_union_annotation_and_base_event(registered: list[type[Matcher]]) -> None:
+    matcher = on_message()
+
+    @matcher.handle()
+    async def _(event: GuildMessageCreateEvent | TypingStartEvent) -> None:
+        del event
+
+    registered.append(matcher)
+    interest = EventInterest(auto=True)
+    assert interest.is_interested("MESSAGE_CREATE")
+    assert not interest.is_interested("MESSAGE_UPDATE")
+
+    any_matcher = on()
+
+    @any_matcher.handle()
+    async def _(event: BaseEvent) -> None:
+        del event
+
+    registered.append(any_matcher)
+    assert interest.is_interested("GUILD_ROLE_CREATE")
+    assert interest.is_interested("SOME_FUTURE_EVENT")
+
+
+def test_registry_changes_are_picked_up(registered: list[type[Matcher]]) -> None:
+    interest = EventInterest(auto=True)
+    assert not interest.is_interested("MESSAGE_CREATE")
+
+    matcher = on_message()
+    registered.append(matcher)
+    assert interest.is_interested("MESSAGE_CREATE")
+
+    registered.remove(matcher)
+    matcher.destroy()
+    assert not interest.is_interested("MESSAGE_CREATE")
+
+
+def test_replaced_matcher_is_picked_up(registered: list[type[Matcher]]) -> None:
+    interest = EventInterest(auto=True)
+    matcher = on_message()
+    registered.append(matcher)
+    assert interest.is_interested("MESSAGE_CREATE")
+
+    # the same number of matchers, but a different one
+    registered.remove(matcher)
+    matcher.destroy()
+    registered.append(on_notice())
+    assert not interest.is_interested("MESSAGE_CREATE")
+    assert interest.is_interested("TYPING_START")
+
+
+def test_allow_deny_and_required() -> None:
+    interest = EventInterest(auto=True, allow={"TYPING_START"}, deny={"MESSAGE_CREATE"})
+
+    assert interest.is_interested("TYPING_START")
+    assert not interest.is_interested("GUILD_MEMBERS_CHUNK")
+    interest.require("GUILD_MEMBERS_CHUNK")
+    assert interest.is_interested("GUILD_MEMBERS_CHUNK")
+
+    # the adapter waits for required events, so they are never denied
+    interest.deny.add("GUILD_MEMBERS_CHUNK")
+    assert interest.is_interested("GUILD_MEMBERS_CHUNK")
+
+    interest.deny.clear()
+    interest.allow.add("MESSAGE_CREATE")
+    assert interest.is_interested("MESSAGE_CREATE")
+
+
+@pytest.mark.asyncio
+async def test_dispatch_skips_uninteresting_payload(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    adapter = DummyAdapter()
+    adapter.event_interest = EventInterest(auto=True)
+    bot = DummyBot(adapter)
+
+    def fail(payload: Dispatch) -> None:
+        msg = f"{payload.type} should not be parsed"
+        raise AssertionError(msg)
+
+    monkeypatch.setattr(adapter, "payload_to_event", fail)
+    await adapter._dispatch(  # noqa: SLF001
+        bot,
+        Dispatch(
+            op=Opcode.DISPATCH,
+            s=7,
+            t="TYPING_START",
+            d={"channel_id": "1", "user_id": "2", "timestamp": 0},
+        ),
+    )
+
+    assert bot.sequence == 7
+    assert not adapter.tasks
@@ -0,0 +1,245 @@
+import asyncio
+from collections.abc import Callable
+
+from nonebot.adapters.discord.bot import Bot
+from nonebot.adapters.discord.cluster import RemoteIdentifyLimiter
+from nonebot.adapters.discord.config import Config
+from nonebot.adapters.discord.event import (
+    Event,
+    GuildMessageCreateEvent,
+    ReadyEvent,
+)
+from tests.fake.gateway import (
+    GATEWAY_URL,
+    RESUME_GATEWAY_URL,
+    FakeGateway,
+    FakeGatewayAdapter,
+    message_event,
+    running,
+)
+
+from nonebot.compat import type_validate_python
+import pytest
+from yarl import URL
+
+
+class Handled:
+    def __init__(self) -> None:
+        self.events: list[tuple[Bot, Event]] = []
+        self._changed = asyncio.Condition()
+
+    async def add(self, bot: Bot, event: Event) -> None:
+        self.events.append((bot, event))
+        async with self._changed:
+            self._changed.notify_all()
+
+    @property
+    def messages(self) -> list[tuple[Bot, GuildMessageCreateEvent]]:
+        return [
+            (bot, event)
+            for bot, event in self.events
+            if isinstance(event, GuildMessageCreateEvent)
+        ]
+
+    async def wait_for(self, predicate: Callable[[], bool], timeout: float = 5) -> None:
+        async with self._changed:
+            await asyncio.wait_for(self._changed.wait_for(predicate), timeout)
+
+
+@pytest.fixture
+def handled(monkeypatch: pytest.MonkeyPatch) -> Handled:
+    recorder = Handled()
+
+    async def handle_event(self: Bot, event: Event) -> None:
+        await recorder.add(self, event)
+
+    monkeypatch.setattr(Bot, "handle_event", handle_event)
+    return recorder
+
+
+def _config(**kwargs: object) -> Config:
+    return type_validate_python(
+        Config,
+        {
+            "discord_bots": [{"token": "x" * 10}],
+            "discord_reconnect_base_delay": 0.01,
+            "discord_reconnect_max_delay": 0.05,
+            **kwargs,
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_event_stream_across_shards(handled: Handled) -> None:
+    gateway = FakeGateway(shard_count=2, guild_ids=[0, 1 << 22, 2 << 22, 3 << 22])
+    adapter = FakeGatewayAdapter(gateway, _config())
+
+    async with running(adapter):
+        await gateway.wait_ready()
+        sent = await gateway.stream(rate=2000, count=200)
+        await handled.wait_for(lambda: len(handled.messages) == sent)
+
+    assert sent == 200
+    shards = [bot.shard for bot, _ in handled.messages]
+    assert shards.count((0, 2)) == shards.count((1, 2)) == 100
+    assert [connection.shard for connection in gateway.connections] in (
+        [(0, 2), (1, 2)],
+        [(1, 2), (0, 2)],
+    )
+
+
+@pytest.mark.asyncio
+async def test_zlib_stream_and_etf(handled: Handled) -> None:
+    gateway = FakeGateway(heartbeat_interval=20)
+    adapter = FakeGatewayAdapter(
+        gateway, _config(discord_compress=True, discord_encoding="etf")
+    )
+
+    async with running(adapter):
+        await gateway.wait_ready()
+        await gateway.stream(rate=1000, count=10)
+        await handled.wait_for(lambda: len(handled.messages) == 10)
+        await asyncio.sleep(0.1)
+        # acknowledged heartbeats keep the connection open
+        (connection,) = gateway.connections
+        assert not connection.closed
+
+    assert connection.url.query["compress"] == "zlib-stream"
+    assert [event.content for _, event in handled.messages] == [
+        f"message {index}" for index in range(10)
+    ]
+    assert any(payload["op"] == 1 for payload in connection.received)
+
+
+@pytest.mark.asyncio
+async def test_reconnect_resumes_and_replays_missed_events(handled: Handled) -> None:
+    gateway = FakeGateway()
+    adapter = FakeGatewayAdapter(gateway, _config())
+
+    async with running(adapter):
+        await gateway.wait_ready()
+        first = gateway.connections[0]
+        await gateway.stream(rate=1000, count=2)
+        await handled.wait_for(lambda: len(handled.messages) == 2)
+        # sent while the client is already reconnecting
+        await first.reconnect()
+        await first.dispatch(*message_event(2, 0))
+        await first.close(4000)
+        await handled.wait_for(lambda: len(handled.messages) >= 3)
+
+    second = gateway.connections[1]
+    assert second.url.host == URL(RESUME_GATEWAY_URL).host
+    resume = next(payload for payload in second.received if payload["op"] == 6)
+    assert first.session is not None
+    assert resume["d"]["session_id"] == first.session.session_id
+    assert not any(payload["op"] == 2 for payload in second.received)
+    assert [event.content for _, event in handled.messages][:3] == [
+        "message 0",
+        "message 1",
+        "message 2",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_invalid_session_identifies_again(handled: Handled) -> None:
+    gateway = FakeGateway()
+    adapter = FakeGatewayAdapter(gateway, _config())
+
+    async with running(adapter):
+        await gateway.wait_ready()
+        first = gateway.connections[0]
+        await first.invalidate_session(resumable=False)
+        await handled.wait_for(
+            lambda: (
+                sum(isinstance(event, ReadyEvent) for _, event in handled.events) == 2
+            )
+        )
+
+    second = gateway.connections[1]
+    assert first.url.host == URL(GATEWAY_URL).host
+    assert second.url.host == URL(GATEWAY_URL).host
+    assert [payload["op"] for payload in second.received][:1] == [2]
+    assert second.session is not first.session
+    # the invalidated gateway info is fetched again before re-identifying
+    assert [path for path in adapter.requested if path.endswith("/gateway/bot")] == [
+        "/api/v10/gateway/bot",
+    ] * 2
+    # the user of the token is still known
+    assert [path for path in adapter.requested if path.endswith("/users/@me")] == [
+        "/api/v10/users/@me"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_cluster_worker_identifies_again_with_the_coordinator_gateway(
+    handled: Handled, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    gateway = FakeGateway()
+    adapter = FakeGatewayAdapter(
+        gateway, _config(discord_cluster_coordinator="127.0.0.1:1")
+    )
+    asked: list[str] = []
+
+    async def coordinator_gateway(self: RemoteIdentifyLimiter) -> tuple[str, int]:
+        asked.append(self.key)
+        return GATEWAY_URL, 1
+
+    async def acquire(self: RemoteIdentifyLimiter, shard_id: int) -> None:
+        del self, shard_id
+
+    monkeypatch.setattr(RemoteIdentifyLimiter, "gateway", coordinator_gateway)
+    monkeypatch.setattr(RemoteIdentifyLimiter, "acquire", acquire)
+
+    async with running(adapter):
+        await gateway.wait_ready()
+        await gateway.connections[0].invalidate_session(resumable=False)
+        await handled.wait_for(
+            lambda: (
+                sum(isinstance(event, ReadyEvent) for _, event in handled.events) == 2
+            )
+        )
+
+    assert len(asked) == 2
+    assert not any(path.endswith("/gateway/bot") for path in adapter.requested)
+    assert gateway.connections[1].url.host == URL(GATEWAY_URL).host
+
+
+@pytest.mark.asyncio
+async def test_invalid_session_after_resume_reconnects_to_the_gateway(
+    handled: Handled,
+) -> None:
+    gateway = FakeGateway()
+    adapter = FakeGatewayAdapter(gateway, _config())
+
+    async with running(adapter):
+        await gateway.wait_ready()
+        # the first reconnect resumes on resume_gateway_url
+        await gateway.connections[0].reconnect()
+        resumed = await gateway.wait_connection(1)
+        await resumed.invalidate_session(resumable=False)
+        await handled.wait_for(
+            lambda: (
+                sum(isinstance(event, ReadyEvent) for _, event in handled.events) == 2
+            )
+        )
+
+    assert resumed.url.host == URL(RESUME_GATEWAY_URL).host
+    identified = gateway.connections[2]
+    assert identified.url.host == URL(GATEWAY_URL).host
+    assert identified.url.query["v"] == "10"
+    assert [payload["op"] for payload in identified.received][:1] == [2]
+
+
+@pytest.mark.asyncio
+async def test_fatal_close_code_stops_the_shard(handled: Handled) -> None:
+    gateway = FakeGateway()
+    gateway.identify_close_code = 4004
+    adapter = FakeGatewayAdapter(gateway, _config())
+
+    async with running(adapter):
+        await asyncio.sleep(0.1)
+        assert all(task.done() for task in adapter.tasks)
+
+    assert len(gateway.connections) == 1
+    assert gateway.connections[0].close_code == 4004
+    assert handled.events == []
@@ -0,0 +1,180 @@
+from collections.abc import Callable
+import json
+import time
+import zlib
+
+from nonebot.adapters.discord import compress
+from nonebot.adapters.discord.compress import (
+    ZlibStreamDecompressor,
+    ZstdStreamDecompressor,
+    resolve_compress_mode,
+)
+from nonebot.adapters.discord.gateway import GatewayWebSocket
+from tests.fake.websocket import ScriptedWebSocket
+
+import pytest
+
+
+def _compress_stream(*messages: dict[str, object]) -> list[bytes]:
+    compressor = zlib.compressobj()
+    return [
+        compressor.compress(json.dumps(message).encode())
+        + compressor.flush(zlib.Z_SYNC_FLUSH)
+        for message in messages
+    ]
+
+
+def test_zlib_stream_shares_context_across_messages() -> None:
+    first, second = _compress_stream({"op": 10}, {"op": 11})
+    decompressor = ZlibStreamDecompressor()
+
+    assert json.loads(decompressor.decompress(first) or b"") == {"op": 10}
+    assert json.loads(decompressor.decompress(second) or b"") == {"op": 11}
+
+    # the second message depends on the first one's context
+    with pytest.raises(zlib.error):
+        zlib.decompressobj().decompress(second)
+
+
+def test_zlib_stream_buffers_until_sync_flush_suffix() -> None:
+    (frame,) = _compress_stream({"op": 0, "d": {"content": "x" * 1024}})
+    decompressor = ZlibStreamDecompressor()
+
+    assert decompressor.decompress(frame[:5]) is None
+    assert decompressor.decompress(frame[5:-2]) is None
+    data = decompressor.decompress(frame[-2:])
+
+    assert data is not None
+    assert json.loads(data)["d"]["content"] == "x" * 1024
+
+
+def test_zlib_stream_reset_starts_new_context() -> None:
+    decompressor = ZlibStreamDecompressor()
+    first, _ = _compress_stream({"op": 10}, {"op": 11})
+    decompressor.decompress(first[:3])
+
+    decompressor.reset()
+    (fresh,) = _compress_stream({"op": 10})
+
+    assert json.loads(decompressor.decompress(fresh) or b"") == {"op": 10}
+
+
+@pytest.mark.asyncio
+async def test_gateway_websocket_joins_split_frames() -> None:
+    first, second = _compress_stream({"op": 10}, {"op": 11})
+    ws = GatewayWebSocket(
+        ScriptedWebSocket([first[:4], first[4:], second]), ZlibStreamDecompressor()
+    )
+
+    assert json.loads(await ws.receive()) == {"op": 10}
+    assert json.loads(await ws.receive()) == {"op": 11}
+
+
+def _compress_zstd_stream(*messages: bytes) -> list[bytes]:
+    zstandard = pytest.importorskip("zstandard")
+    compressor = zstandard.ZstdCompressor().compressobj()
+    return [
+        compressor.compress(message)
+        + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        for message in messages
+    ]
+
+
+def _recorded_burst() -> list[bytes]:
+    """READY/GUILD_CREATE/MESSAGE_CREATE shaped payloads of a mid-size guild."""
+    members = [
+        {
+            "user": {
+                "id": str(10**17 + i),
+                "username": f"member{i}",
+                "discriminator": "0",
+                "global_name": None,
+                "avatar": None,
+            },
+            "roles": [str(10**17 + i % 7)],
+            "joined_at": "2026-02-14T00:00:00+00:00",
+            "deaf": False,
+            "mute": False,
+        }
+        for i in range(200)
+    ]
+    channels = [
+        {"id": str(2 * 10**17 + i), "type": 0, "name": f"channel-{i}", "position": i}
+        for i in range(50)
+    ]
+    burst = [
+        {
+            "op": 0,
+            "s": 1,
+            "t": "READY",
+            "d": {"v": 10, "session_id": "a" * 32, "guilds": [{"id": "1"}]},
+        },
+        {
+            "op": 0,
+            "s": 2,
+            "t": "GUILD_CREATE",
+            "d": {"id": "1", "members": members, "channels": channels},
+        },
+    ]
+    burst.extend(
+        {
+            "op": 0,
+            "s": 3 + i,
+            "t": "MESSAGE_CREATE",
+            "d": {
+                "id": str(3 * 10**17 + i),
+                "channel_id": channels[i % 50]["id"],
+                "author": members[i % 200]["user"],
+                "content": f"hello {i}",
+            },
+        }
+        for i in range(100)
+    )
+    return [json.dumps(message).encode() for message in burst]
+
+
+def test_zstd_stream_decompresses_every_frame() -> None:
+    first, second = _compress_zstd_stream(b'{"op":10}', b'{"op":11}')
+    decompressor = ZstdStreamDecompressor()
+
+    assert decompressor.decompress(first) == b'{"op":10}'
+    assert decompressor.decompress(second) == b'{"op":11}'
+
+
+def test_resolve_compress_mode(monkeypatch: pytest.MonkeyPatch) -> None:
+    assert resolve_compress_mode(compress=False) is None
+    assert resolve_compress_mode(compress=True) == "zlib-stream"
+    assert resolve_compress_mode(compress="zlib-stream") == "zlib-stream"
+
+    monkeypatch.setattr(compress, "_zstd", None)
+    monkeypatch.setattr(compress, "_zstandard", None)
+    assert resolve_compress_mode(compress="zstd-stream") == "zlib-stream"
+
+
+@pytest.mark.benchmark
+def test_benchmark_zlib_vs_zstd_stream_on_burst(
+    record_property: Callable[[str, object], None],
+) -> None:
+    messages = _recorded_burst()
+    zlib_frames = _compress_stream(*(json.loads(message) for message in messages))
+    zstd_frames = _compress_zstd_stream(*messages)
+
+    results: dict[str, tuple[int, float]] = {}
+    for name, decompressor, frames in (
+        ("zlib-stream", ZlibStreamDecompressor(), zlib_frames),
+        ("zstd-stream", ZstdStreamDecompressor(), zstd_frames),
+    ):
+        start = time.perf_counter()
+        decoded = [decompressor.decompress(frame) for frame in frames]
+        elapsed = time.perf_counter() - start
+        assert [json.loads(data or b"") for data in decoded] == [
+            json.loads(message) for message in messages
+        ]
+        results[name] = (sum(map(len, frames)), elapsed)
+
+    raw_size = sum(map(len, messages))
+    record_property("raw_bytes", raw_size)
+    for name, (size, elapsed) in results.items():
+        record_property(f"{name}_bytes", size)
+        record_property(f"{name}_ms", round(elapsed * 1000, 3))
+    assert results["zstd-stream"][0] < results["zlib-stream"][0]
@@ -0,0 +1,143 @@
+from nonebot.adapters.discord import etf
+from nonebot.adapters.discord.adapter import Adapter
+from nonebot.adapters.discord.config import Config
+from nonebot.adapters.discord.event import GuildMessageCreateEvent, ReadyEvent
+from nonebot.adapters.discord.payload import Dispatch, Heartbeat, Hello
+from tests.fake.doubles import DummyAdapter
+from tests.fake.websocket import ScriptedWebSocket
+
+from nonebot.compat import type_validate_python
+import pytest
+
+GUILD_ID = 1_234_567_890_123_456_789
+USER_ID = 987_654_321_098_765_432
+CHANNEL_ID = 1_122_334_455_667_788_990
+
+
+def _etf_adapter() -> DummyAdapter:
+    adapter = DummyAdapter()
+    adapter.discord_config = Config(discord_encoding="etf")
+    return adapter
+
+
+def test_decode_erlang_term_to_binary_output() -> None:
+    # term_to_binary(#{<<"op">> => 10, <<"d">> => #{<<"heartbeat_interval">> => 41250}})
+    data = (
+        b"\x83t\x00\x00\x00\x02m\x00\x00\x00\x02opa\nm\x00\x00\x00\x01d"
+        b"t\x00\x00\x00\x01m\x00\x00\x00\x12heartbeat_intervalb\x00\x00\xa1\x22"
+    )
+
+    assert etf.decode(data) == {"op": 10, "d": {"heartbeat_interval": 41250}}
+
+
+def test_encode_decode_roundtrip_turns_big_integers_into_str() -> None:
+    value = {
+        "id": GUILD_ID,
+        "name": "测试",
+        "negative": -(2**40),
+        "small": 7,
+        "int": -5,
+        "ratio": 0.5,
+        "flags": [True, False, None],
+        "empty": [],
+        "nested": {"members": [{"user": {"id": USER_ID}}]},
+    }
+
+    decoded = etf.decode(etf.encode(value))
+
+    assert decoded == {
+        **value,
+        "id": str(GUILD_ID),
+        "negative": str(-(2**40)),
+        "nested": {"members": [{"user": {"id": str(USER_ID)}}]},
+    }
+    assert type(decoded["small"]) is int
+
+
+def test_decode_rejects_unknown_tag() -> None:
+    with pytest.raises(etf.ETFDecodeError):
+        etf.decode(b"\x83\x01")
+
+
+@pytest.mark.asyncio
+async def test_receive_payload_decodes_etf_frames_into_events() -> None:
+    adapter = _etf_adapter()
+    ready = {
+        "op": 0,
+        "s": 1,
+        "t": "READY",
+        "d": {
+            "v": 10,
+            "user": {
+                "id": USER_ID,
+                "username": "bot",
+                "discriminator": "0",
+                "global_name": None,
+                "avatar": None,
+            },
+            "guilds": [{"id": GUILD_ID, "unavailable": True}],
+            "session_id": "session",
+            "resume_gateway_url": "wss://gateway.discord.test",
+            "application": {"id": USER_ID, "flags": 0},
+        },
+    }
+    message = {
+        "op": 0,
+        "s": 2,
+        "t": "MESSAGE_CREATE",
+        "d": {
+            "id": 1,
+            "channel_id": 100,
+            "guild_id": GUILD_ID,
+            "author": ready["d"]["user"],
+            "content": "hello",
+            "timestamp": "2026-02-14T00:00:00+00:00",
+            "edited_timestamp": None,
+            "tts": False,
+            "mention_everyone": False,
+            "mentions": [],
+            "mention_roles": [],
+            "attachments": [],
+            "embeds": [],
+            "pinned": False,
+            "type": 0,
+            "mention_channels": [
+                {"id": CHANNEL_ID, "guild_id": GUILD_ID, "type": 0, "name": "general"}
+            ],
+        },
+    }
+    ws = ScriptedWebSocket(
+        [
+            etf.encode({"op": 10, "d": {"heartbeat_interval": 41250}}),
+            etf.encode(ready),
+            etf.encode(message),
+        ]
+    )
+
+    hello = await adapter.receive_payload(ws)
+    assert isinstance(hello, Hello)
+    assert hello.data.heartbeat_interval == 41250
+
+    payload = await adapter.receive_payload(ws)
+    assert isinstance(payload, Dispatch)
+    event = Adapter.payload_to_event(payload)
+    assert isinstance(event, ReadyEvent)
+    assert event.user.id == USER_ID
+    assert event.application.id == str(USER_ID)
+
+    payload = await adapter.receive_payload(ws)
+    assert isinstance(payload, Dispatch)
+    event = Adapter.payload_to_event(payload)
+    assert isinstance(event, GuildMessageCreateEvent)
+    assert event.guild_id == GUILD_ID
+    assert isinstance(event.mention_channels, list)
+    assert event.mention_channels[0].guild_id == str(GUILD_ID)
+
+
+def test_encode_payload_uses_configured_encoding() -> None:
+    heartbeat = type_validate_python(Heartbeat, {"data": 42})
+
+    assert DummyAdapter().encode_payload(heartbeat) == '{"op":1,"d":42}'
+    data = _etf_adapter().encode_payload(heartbeat)
+    assert isinstance(data, bytes)
+    assert etf.decode(data) == {"op": 1, "d": 42}
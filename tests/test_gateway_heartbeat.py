@@ -0,0 +1,168 @@
+import asyncio
+import json
+import random
+
+from nonebot.adapters.discord import adapter as adapter_module, gateway
+from nonebot.adapters.discord.dispatch import EventDispatcher
+from nonebot.adapters.discord.event import Event
+from nonebot.adapters.discord.gateway import GatewayWebSocket
+from tests.fake.clock import FakeClock
+from tests.fake.doubles import DummyAdapter, DummyBot
+from tests.fake.websocket import ScriptedWebSocket
+
+from nonebot.exception import WebSocketClosed
+import pytest
+
+
+def test_heartbeat_ack_measures_latency() -> None:
+    ws = GatewayWebSocket(ScriptedWebSocket())
+    assert ws.heartbeat_acked
+    assert ws.heartbeat_ack() is None
+
+    ws.heartbeat_sent()
+    assert not ws.heartbeat_acked
+    latency = ws.heartbeat_ack()
+
+    assert ws.heartbeat_acked
+    assert latency is not None
+    assert latency >= 0
+
+
+@pytest.fixture
+def clock(fake_clock: FakeClock, monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    fake_clock.install(monkeypatch, gateway)
+    return fake_clock
+
+
+@pytest.mark.asyncio
+async def test_first_heartbeat_is_jittered(
+    clock: FakeClock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(random, "random", lambda: 0.5)
+    raw = ScriptedWebSocket()
+    ws = GatewayWebSocket(raw)
+    adapter = DummyAdapter()
+    task = asyncio.create_task(
+        adapter._heartbeat_task(ws, DummyBot(adapter), 1000)  # noqa: SLF001
+    )
+
+    await asyncio.sleep(0.25)
+    assert raw.sent == []
+    await asyncio.sleep(0.5)
+    assert raw.sent == ['{"op":1,"d":null}']
+    assert clock.now == 0.75
+    task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_missing_ack_closes_zombie_connection(
+    clock: FakeClock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(random, "random", lambda: 0.0)
+    raw = ScriptedWebSocket()
+    ws = GatewayWebSocket(raw)
+    adapter = DummyAdapter()
+
+    await adapter._heartbeat_task(ws, DummyBot(adapter), 1000)  # noqa: SLF001
+
+    assert len(raw.sent) == 1
+    assert raw.close_code == adapter_module.RESUMABLE_CLOSE_CODE
+    assert clock.now == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("clock")
+async def test_acked_heartbeats_keep_connection_and_set_latency(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(random, "random", lambda: 0.0)
+    raw = ScriptedWebSocket()
+    ws = GatewayWebSocket(raw)
+    adapter = DummyAdapter()
+    bot = DummyBot(adapter)
+    assert bot.latency is None
+
+    heartbeat = asyncio.create_task(
+        adapter._heartbeat_task(ws, bot, 1000)  # noqa: SLF001
+    )
+    loop = asyncio.create_task(adapter._loop(bot, ws))  # noqa: SLF001
+    for _ in range(3):
+        await asyncio.sleep(0.25)
+        await raw.incoming.put(json.dumps({"op": 11}))
+        await asyncio.sleep(0.75)
+
+    assert len(raw.sent) == 4
+    assert raw.close_code is None
+    assert bot.latency == 0.25
+    heartbeat.cancel()
+    await raw.incoming.put(None)
+    with pytest.raises(WebSocketClosed):
+        await loop
+
+
+@pytest.mark.asyncio
+async def test_paused_reading_does_not_count_as_zombied(clock: FakeClock) -> None:
+    ws = GatewayWebSocket(ScriptedWebSocket())
+
+    ws.heartbeat_sent()
+    with ws.reading_paused():
+        clock.now = 2
+        assert not ws.zombied
+    assert not ws.zombied
+
+    clock.now = 3
+    ws.heartbeat_sent()
+    assert ws.zombied
+
+
+def _resumed(sequence: int) -> str:
+    return json.dumps({"op": 0, "s": sequence, "t": "RESUMED", "d": {}})
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("clock")
+async def test_blocked_dispatch_keeps_connection_alive(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(random, "random", lambda: 0.0)
+    raw = ScriptedWebSocket()
+    ws = GatewayWebSocket(raw)
+    adapter = DummyAdapter()
+    bot = DummyBot(adapter)
+    bot.gateway = ws
+    release = asyncio.Event()
+    handled: list[Event] = []
+
+    async def handler(event: Event) -> None:
+        await release.wait()
+        handled.append(event)
+
+    bot.dispatcher = EventDispatcher(handler, workers=1, max_size=1, overflow="block")
+    bot.dispatcher.start()
+    heartbeat = asyncio.create_task(
+        adapter._heartbeat_task(ws, bot, 1000)  # noqa: SLF001
+    )
+    loop = asyncio.create_task(adapter._loop(bot, ws))  # noqa: SLF001
+    # one event is being handled, one fills the queue and the third blocks
+    for sequence in range(1, 4):
+        await raw.incoming.put(_resumed(sequence))
+    await raw.incoming.put(json.dumps({"op": 11}))
+
+    await asyncio.sleep(5.5)
+    assert bot.dispatcher.full
+    assert len(raw.sent) == 6
+    assert raw.close_code is None
+
+    release.set()
+    await asyncio.sleep(1)
+    assert len(handled) == 3
+    assert raw.close_code is None
+    assert ws.heartbeat_acked is False
+
+    # reading goes on, so a missing ACK is a zombie connection again
+    await asyncio.wait_for(heartbeat, 5)
+    assert raw.close_code == adapter_module.RESUMABLE_CLOSE_CODE
+    bot.dispatcher.stop()
+    await raw.incoming.put(None)
+    with pytest.raises(WebSocketClosed):
+        await loop
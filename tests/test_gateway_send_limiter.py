@@ -0,0 +1,72 @@
+import asyncio
+
+from nonebot.adapters.discord import gateway
+from nonebot.adapters.discord.gateway import GatewaySendLimiter, GatewayWebSocket
+from tests.fake.clock import FakeClock
+from tests.fake.doubles import DummyAdapter, DummyBot
+from tests.fake.websocket import ScriptedWebSocket
+
+import pytest
+
+
+def test_reserved_tokens_must_leave_room() -> None:
+    with pytest.raises(ValueError, match="reserved"):
+        GatewaySendLimiter(limit=2, reserved=2)
+
+
+@pytest.fixture
+def clock(fake_clock: FakeClock, monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    fake_clock.install(monkeypatch, gateway)
+    return fake_clock
+
+
+@pytest.mark.asyncio
+async def test_regular_sends_wait_for_the_window(clock: FakeClock) -> None:
+    limiter = GatewaySendLimiter(limit=4, window=60, reserved=1)
+
+    for _ in range(3):
+        await limiter.acquire()
+    assert limiter.available == 0
+    assert clock.now == 0
+
+    await limiter.acquire()
+    assert clock.now == 60
+
+
+@pytest.mark.asyncio
+async def test_heartbeats_use_reserved_tokens_during_a_burst(clock: FakeClock) -> None:
+    ws = ScriptedWebSocket()
+    gateway_ws = GatewayWebSocket(ws, limiter=GatewaySendLimiter(4, 60, reserved=1))
+
+    burst = asyncio.gather(*(gateway_ws.send(f"presence {i}") for i in range(6)))
+    await asyncio.sleep(1)
+    assert ws.sent == ["presence 0", "presence 1", "presence 2"]
+
+    adapter = DummyAdapter()
+    bot = DummyBot(adapter)
+    bot.sequence = 7
+    await adapter._heartbeat(gateway_ws, bot)  # noqa: SLF001
+    assert ws.sent[-1] == '{"op":1,"d":7}'
+    assert clock.now == 1
+
+    await burst
+    assert ws.sent[4:] == ["presence 3", "presence 4", "presence 5"]
+    # the heartbeat sent at 1s counts against the window as well
+    assert clock.now == 61
+
+
+@pytest.mark.asyncio
+async def test_send_limit_holds_for_any_window(clock: FakeClock) -> None:
+    limiter = GatewaySendLimiter(limit=10, window=60, reserved=2)
+    sent_at: list[float] = []
+
+    async def send(*, priority: bool) -> None:
+        await limiter.acquire(priority=priority)
+        sent_at.append(clock.now)
+
+    await asyncio.gather(*(send(priority=i % 5 == 0) for i in range(40)))
+
+    sent_at.sort()
+    for index, at in enumerate(sent_at):
+        in_window = [other for other in sent_at[index:] if other - at < 60]
+        assert len(in_window) <= 10
@@ -0,0 +1,129 @@
+import asyncio
+
+from nonebot.adapters.discord.api import is_not_unset
+from nonebot.adapters.discord.event import Event, GuildMembersChunkEvent
+from nonebot.adapters.discord.exception import NetworkError
+from nonebot.adapters.discord.members import guild_shard_id
+from nonebot.adapters.discord.payload import Dispatch, Opcode
+from tests.fake.doubles import DummyAdapter, sharded_bots
+
+import pytest
+
+# a guild of shard 1 when the bot runs 2 shards
+GUILD_ID = 1 << 22
+
+
+def _chunk(nonce: str, index: int, count: int, user_ids: list[int]) -> Dispatch:
+    return Dispatch(
+        op=Opcode.DISPATCH,
+        s=index + 10,
+        t="GUILD_MEMBERS_CHUNK",
+        d={
+            "guild_id": str(GUILD_ID),
+            "members": [
+                {
+                    "user": {
+                        "id": str(user_id),
+                        "username": f"user{user_id}",
+                        "discriminator": "0",
+                        "avatar": None,
+                    },
+                    "roles": [],
+                    "joined_at": "2026-02-14T00:00:00+00:00",
+                    "deaf": False,
+                    "mute": False,
+                    "flags": 0,
+                }
+                for user_id in user_ids
+            ],
+            "chunk_index": index,
+            "chunk_count": count,
+            "not_found": ["99"] if index == count - 1 else [],
+            "nonce": nonce,
+        },
+    )
+
+
+def test_guild_shard_id() -> None:
+    assert guild_shard_id(GUILD_ID, 2) == 1
+    assert guild_shard_id(81384788765712384, 16) == (81384788765712384 >> 22) % 16
+
+
+@pytest.mark.asyncio
+async def test_request_guild_members_collects_all_chunks(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    adapter = DummyAdapter()
+    (bot, ws), (guild_bot, guild_ws) = sharded_bots(adapter)
+    handled: list[Event] = []
+
+    async def handle_event(event: Event) -> None:
+        handled.append(event)
+
+    monkeypatch.setattr(guild_bot, "handle_event", handle_event)
+
+    request = asyncio.create_task(bot.request_guild_members(GUILD_ID, presences=True))
+    await guild_ws.wait_sent()
+
+    assert ws.sent == []
+    payload = guild_ws.sent_payloads[0]
+    assert payload["op"] == Opcode.REQUEST_GUILD_MEMBERS
+    nonce = payload["d"]["nonce"]
+    assert payload["d"] == {
+        "guild_id": GUILD_ID,
+        "query": "",
+        "limit": 0,
+        "presences": True,
+        "nonce": nonce,
+    }
+
+    await adapter._dispatch(guild_bot, _chunk(nonce, 0, 2, [1, 2]))  # noqa: SLF001
+    await adapter._dispatch(guild_bot, _chunk("other", 0, 1, [5]))  # noqa: SLF001
+    await adapter._dispatch(guild_bot, _chunk(nonce, 1, 2, [3]))  # noqa: SLF001
+    members = await asyncio.wait_for(request, 1)
+
+    assert [
+        member.user.id for member in members.members if is_not_unset(member.user)
+    ] == [1, 2, 3]
+    assert members.not_found == [99]
+    # chunks of other requests still reach the event handlers
+    assert [type(event) for event in handled] == [GuildMembersChunkEvent]
+    assert adapter.member_requests._pending == {}  # noqa: SLF001
+
+
+@pytest.mark.asyncio
+async def test_iter_guild_members_yields_chunks_by_user_ids() -> None:
+    adapter = DummyAdapter()
+    (bot, _), (guild_bot, guild_ws) = sharded_bots(adapter)
+    chunks = bot.iter_guild_members(GUILD_ID, user_ids=[1, 2])
+
+    first = asyncio.ensure_future(anext(chunks))
+    await guild_ws.wait_sent()
+    data = guild_ws.sent_payloads[0]["d"]
+    assert data["user_ids"] == [1, 2]
+    assert "query" not in data
+    await adapter._dispatch(guild_bot, _chunk(data["nonce"], 0, 1, [1, 2]))  # noqa: SLF001
+
+    chunk = await asyncio.wait_for(first, 1)
+    assert chunk.chunk_count == 1
+    with pytest.raises(StopAsyncIteration):
+        await anext(chunks)
+
+
+@pytest.mark.asyncio
+async def test_request_guild_members_needs_a_connected_shard() -> None:
+    (bot, _), (guild_bot, _) = sharded_bots(DummyAdapter())
+    guild_bot.gateway = None
+
+    with pytest.raises(NetworkError):
+        await bot.request_guild_members(GUILD_ID)
+
+
+@pytest.mark.asyncio
+async def test_request_guild_members_times_out() -> None:
+    adapter = DummyAdapter()
+    (bot, _), _ = sharded_bots(adapter)
+
+    with pytest.raises(NetworkError, match="Timed out"):
+        await bot.request_guild_members(GUILD_ID, timeout=0.01)
+    assert adapter.member_requests._pending == {}  # noqa: SLF001
@@ -0,0 +1,114 @@
+import asyncio
+
+from nonebot.adapters.discord import identify
+from nonebot.adapters.discord.api.model import GatewayBot
+from nonebot.adapters.discord.config import BotInfo
+from nonebot.adapters.discord.identify import IDENTIFY_INTERVAL, IdentifyLimiter
+from tests.fake.clock import FakeClock
+from tests.fake.doubles import DummyAdapter
+
+from nonebot.compat import type_validate_python
+import pytest
+from yarl import URL
+
+
+async def _identify_times(
+    clock: FakeClock, limiter: IdentifyLimiter, shards: int
+) -> list[float]:
+    times: dict[int, float] = {}
+
+    async def identify_shard(shard_id: int) -> None:
+        await limiter.acquire(shard_id)
+        times[shard_id] = clock.monotonic()
+
+    await asyncio.gather(*(identify_shard(shard_id) for shard_id in range(shards)))
+    return [times[shard_id] for shard_id in range(shards)]
+
+
+@pytest.fixture
+def clock(fake_clock: FakeClock, monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    fake_clock.install(monkeypatch, identify)
+    return fake_clock
+
+
+@pytest.mark.asyncio
+async def test_buckets_identify_in_parallel(clock: FakeClock) -> None:
+    limiter = IdentifyLimiter(4)
+
+    times = await _identify_times(clock, limiter, 8)
+
+    assert [limiter.bucket(shard_id) for shard_id in range(8)] == [0, 1, 2, 3] * 2
+    assert times == [0.0] * 4 + [IDENTIFY_INTERVAL] * 4
+
+
+@pytest.mark.asyncio
+async def test_single_bucket_identifies_one_by_one(clock: FakeClock) -> None:
+    limiter = IdentifyLimiter(1)
+
+    times = await _identify_times(clock, limiter, 4)
+
+    assert times == [i * IDENTIFY_INTERVAL for i in range(4)]
+
+
+@pytest.mark.asyncio
+async def test_exhausted_session_starts_wait_for_reset(clock: FakeClock) -> None:
+    limiter = IdentifyLimiter(2, total=10, remaining=1, reset_after=50)
+
+    times = await _identify_times(clock, limiter, 2)
+
+    assert times == [0.0, 50.0]
+    assert limiter.remaining == 9
+
+
+@pytest.mark.asyncio
+async def test_buckets_share_one_session_start_reset(clock: FakeClock) -> None:
+    limiter = IdentifyLimiter(4, total=10, remaining=0, reset_after=50)
+
+    times = await _identify_times(clock, limiter, 4)
+
+    assert times == [50.0] * 4
+    assert limiter.remaining == 6
+
+
+@pytest.mark.asyncio
+async def test_run_bot_starts_every_shard_at_once(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    adapter = DummyAdapter()
+    gateway = type_validate_python(
+        GatewayBot,
+        {
+            "url": "wss://gateway.discord.gg",
+            "shards": 16,
+            "session_start_limit": {
+                "total": 1000,
+                "remaining": 900,
+                "reset_after": 1000,
+                "max_concurrency": 16,
+            },
+        },
+    )
+    started: list[tuple[int, int]] = []
+
+    async def get_gateway_bot(bot_info: BotInfo) -> GatewayBot:
+        del bot_info
+        return gateway
+
+    async def forward_ws(
+        bot_info: BotInfo, ws_url: URL, shard: tuple[int, int]
+    ) -> None:
+        del bot_info, ws_url
+        started.append(shard)
+
+    monkeypatch.setattr(adapter, "_get_gateway_bot", get_gateway_bot)
+    monkeypatch.setattr(adapter, "_forward_ws", forward_ws)
+    bot_info = BotInfo(token="x" * 10)
+
+    await asyncio.wait_for(adapter.run_bot(bot_info), 0.5)
+    await asyncio.gather(*adapter.tasks)
+
+    assert sorted(started) == [(i, 16) for i in range(16)]
+    limiter = adapter.identify_limiters[bot_info.token]
+    assert isinstance(limiter, IdentifyLimiter)
+    assert limiter.max_concurrency == 16
+    assert limiter.remaining == 900
@@ -0,0 +1,125 @@
+from collections.abc import Iterator
+
+from nonebot import on_message, on_notice
+from nonebot.adapters.discord.config import BotInfo, Intents
+from nonebot.adapters.discord.event import (
+    DirectMessageCreateEvent,
+    GuildMemberAddEvent,
+    GuildMessageReactionAddEvent,
+)
+from nonebot.adapters.discord.intents import matcher_intents, resolve_intents
+from tests.fake.doubles import DummyAdapter
+
+from nonebot.compat import type_validate_python
+from nonebot.matcher import Matcher
+import pytest
+
+
+@pytest.fixture
+def registered() -> Iterator[list[type[Matcher]]]:
+    created: list[type[Matcher]] = []
+    yield created
+    for matcher in created:
+        matcher.destroy()
+
+
+def test_auto_intent_config() -> None:
+    bot_info = type_validate_python(BotInfo, {"token": "x" * 10, "intent": "auto"})
+
+    assert bot_info.intent.auto
+    assert not BotInfo(token="x" * 10).intent.auto
+
+
+def test_intents_without_auto_are_kept() -> None:
+    intent = Intents(guild_message_typing=False)
+
+    assert resolve_intents(intent) is intent
+
+
+def test_message_matcher_needs_message_intents(
+    registered: list[type[Matcher]],
+) -> None:
+    registered.append(on_message())
+
+    assert matcher_intents() == {
+        "guilds",
+        "guild_messages",
+        "message_content",
+        "direct_messages",
+    }
+
+
+def test_handler_annotation_narrows_intents(
+    registered: list[type[Matcher]],
+) -> None:
+    messages = on_message()
+    notices = on_notice()
+
+    @messages.handle()
+    async def _(event: DirectMessageCreateEvent) -> None:
+        del event
+
+    @notices.handle()
+    async def _(event: GuildMessageReactionAddEvent) -> None:
+        del event
+
+    registered.extend((messages, notices))
+
+    assert matcher_intents() == {
+        "guilds",
+        "direct_messages",
+        "guild_message_reactions",
+    }
+    resolved = resolve_intents(Intents(auto=True))
+    assert resolved.to_int() == 1 << 0 | 1 << 10 | 1 << 12
+    assert not resolved.auto
+
+
+def test_privileged_intents_need_explicit_config(
+    registered: list[type[Matcher]],
+) -> None:
+    members = on_notice()
+
+    @members.handle()
+    async def _(event: GuildMemberAddEvent) -> None:
+        del event
+
+    registered.extend((members, on_message()))
+
+    resolved = resolve_intents(Intents(auto=True))
+    assert resolved.guild_messages
+    assert not resolved.guild_members
+    assert not resolved.message_content
+
+    resolved = resolve_intents(
+        Intents(auto=True, message_content=True, guild_message_typing=True)
+    )
+    assert not resolved.guild_members
+    assert resolved.message_content
+    # explicit fields win over derived ones
+    assert resolved.guild_message_typing
+
+
+def test_adapter_resolves_intents_once_per_token(
+    registered: list[type[Matcher]],
+) -> None:
+    adapter = DummyAdapter()
+    bot_info = BotInfo(token="x" * 10, intent=Intents(auto=True))
+
+    first = adapter.get_intents(bot_info)
+    registered.append(on_message())
+
+    assert adapter.get_intents(bot_info) is first
+    # guilds, and guild_voice_states for update_voice_state
+    assert first.to_int() == 1 << 0 | 1 << 7
+
+
+def test_required_and_allowlisted_events_need_their_intents() -> None:
+    resolved = resolve_intents(
+        Intents(auto=True), ["VOICE_STATE_UPDATE", "TYPING_START", "UNKNOWN"]
+    )
+
+    assert resolved.guild_voice_states
+    assert resolved.guild_message_typing
+    assert resolved.direct_message_typing
+    assert not resolved.guild_messages
@@ -0,0 +1,135 @@
+from collections.abc import Callable
+import time
+from typing import Any
+
+from nonebot.adapters.discord.adapter import Adapter
+from nonebot.adapters.discord.api.model import GuildMember, User
+from nonebot.adapters.discord.api.types import UNSET
+from nonebot.adapters.discord.event import (
+    GuildCreateCompatEvent,
+    GuildCreateEvent,
+    GuildMembersChunkEvent,
+)
+from nonebot.adapters.discord.payload import Dispatch, Opcode
+from nonebot.adapters.discord.utils import model_dump
+
+from pydantic import ValidationError
+import pytest
+
+
+def _member(user_id: int) -> dict[str, Any]:
+    return {
+        "user": {
+            "id": str(user_id),
+            "username": f"user{user_id}",
+            "discriminator": "0",
+            "global_name": None,
+            "avatar": None,
+        },
+        "roles": ["10", "11"],
+        "joined_at": "2026-02-14T00:00:00+00:00",
+        "deaf": False,
+        "mute": False,
+        "flags": 0,
+    }
+
+
+def _dispatch(event_type: str, data: dict[str, Any]) -> Dispatch:
+    return Dispatch(op=Opcode.DISPATCH, s=1, t=event_type, d=data)
+
+
+def _members_chunk(member_count: int) -> Dispatch:
+    members = [_member(i) for i in range(1, member_count + 1)]
+    return _dispatch(
+        "GUILD_MEMBERS_CHUNK",
+        {
+            "guild_id": "300",
+            "members": members,
+            "chunk_index": 0,
+            "chunk_count": 1,
+            "presences": [
+                {
+                    "user": {"id": member["user"]["id"]},
+                    "guild_id": "300",
+                    "status": "online",
+                    "activities": [],
+                    "client_status": {"desktop": "online"},
+                }
+                for member in members
+            ],
+        },
+    )
+
+
+def test_heavy_fields_are_validated_on_first_access() -> None:
+    event = Adapter.payload_to_event(_members_chunk(2), lazy=True)
+
+    assert isinstance(event, GuildMembersChunkEvent)
+    assert event.guild_id == 300
+    assert "deferred 2 items" in event.get_event_description()
+    assert "deferred" in repr(event.__dict__["members"])
+    assert all(isinstance(member, GuildMember) for member in event.members)
+    assert event.__dict__["members"] is event.members
+    assert isinstance(event.members[1].user, User)
+    assert event.members[1].user.id == 2
+
+
+def test_lazy_event_dumps_like_eager_event() -> None:
+    payload = _members_chunk(3)
+
+    lazy = Adapter.payload_to_event(payload, lazy=True)
+    eager = Adapter.payload_to_event(payload)
+
+    assert isinstance(lazy, GuildMembersChunkEvent)
+    assert model_dump(lazy, exclude={"timestamp__"}) == model_dump(
+        eager, exclude={"timestamp__"}
+    )
+
+
+def test_invalid_deferred_field_raises_on_access() -> None:
+    payload = _dispatch(
+        "GUILD_MEMBERS_CHUNK",
+        {"guild_id": "300", "members": [{}], "chunk_index": 0, "chunk_count": 1},
+    )
+
+    event = Adapter.payload_to_event(payload, lazy=True)
+
+    with pytest.raises(ValidationError):
+        _ = event.members
+
+
+def test_guild_create_defers_members_but_not_compat_fields() -> None:
+    data = {"id": "300", "roles": [], "channels": [], "members": [_member(1)]}
+
+    event = Adapter.payload_to_event(_dispatch("GUILD_CREATE", data), lazy=True)
+
+    assert isinstance(event, GuildCreateEvent)
+    assert event.roles == []
+    assert "deferred 1 items" in repr(event.__dict__["members"])
+    assert isinstance(event.members, list)
+    assert event.members[0].nick is UNSET
+
+    data["roles"] = [{"id": "1", "permissions": 8}]
+    event = Adapter.payload_to_event(_dispatch("GUILD_CREATE", data), lazy=True)
+
+    assert isinstance(event, GuildCreateCompatEvent)
+
+
+@pytest.mark.benchmark
+def test_benchmark_lazy_members_chunk(
+    record_property: Callable[[str, object], None],
+) -> None:
+    payload = _members_chunk(1000)
+    rounds = 20
+    results: dict[str, float] = {}
+    for name, lazy in (("eager", False), ("lazy", True)):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            event = Adapter.payload_to_event(payload, lazy=lazy)
+            assert isinstance(event, GuildMembersChunkEvent)
+            assert event.guild_id == 300
+        results[name] = (time.perf_counter() - start) / rounds
+
+    for name, elapsed in results.items():
+        record_property(f"{name}_ms_per_chunk", round(elapsed * 1_000, 2))
+    assert results["lazy"] < results["eager"]
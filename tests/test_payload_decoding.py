@@ -0,0 +1,127 @@
+from collections.abc import Callable
+import json
+import time
+from typing import cast
+
+from nonebot.adapters.discord.adapter import Adapter
+from nonebot.adapters.discord.event import (
+    Event,
+    GuildMessageCreateEvent,
+    event_classes,
+)
+from nonebot.adapters.discord.payload import (
+    Dispatch,
+    Hello,
+    Payload,
+    PayloadType,
+    parse_payload,
+)
+
+from nonebot.compat import type_validate_json, type_validate_python
+import pytest
+
+
+def _message_create_frame(sequence: int = 1) -> bytes:
+    author = {
+        "id": "2",
+        "username": "tester",
+        "discriminator": "0",
+        "global_name": None,
+        "avatar": None,
+    }
+    return json.dumps(
+        {
+            "op": 0,
+            "s": sequence,
+            "t": "MESSAGE_CREATE",
+            "d": {
+                "id": "1",
+                "channel_id": "100",
+                "guild_id": "300",
+                "author": author,
+                "member": {
+                    "roles": [str(i) for i in range(10)],
+                    "joined_at": "2026-02-14T00:00:00+00:00",
+                    "deaf": False,
+                    "mute": False,
+                    "flags": 0,
+                },
+                "content": "hello world",
+                "timestamp": "2026-02-14T00:00:00+00:00",
+                "edited_timestamp": None,
+                "tts": False,
+                "mention_everyone": False,
+                "mentions": [author] * 5,
+                "mention_roles": [],
+                "attachments": [],
+                "embeds": [],
+                "pinned": False,
+                "type": 0,
+            },
+        }
+    ).encode()
+
+
+def _decode_twice(frame: bytes) -> Event:
+    """The previous decode path: frame -> PayloadType, then d -> event class."""
+    payload = type_validate_json(cast("type[Payload]", PayloadType), frame)
+    assert isinstance(payload, Dispatch)
+    return type_validate_python(
+        cast("type[Event]", event_classes[payload.type]), payload.data
+    )
+
+
+def _decode_once(frame: bytes) -> Event:
+    payload = parse_payload(json.loads(frame))
+    assert isinstance(payload, Dispatch)
+    return Adapter.payload_to_event(payload)
+
+
+def test_dispatch_is_built_without_copying_data() -> None:
+    data = json.loads(_message_create_frame(7))
+
+    payload = parse_payload(data)
+
+    assert isinstance(payload, Dispatch)
+    assert payload.sequence == 7
+    assert payload.type == "MESSAGE_CREATE"
+    assert payload.data is data["d"]
+
+
+def test_non_dispatch_and_malformed_dispatch_are_validated() -> None:
+    hello = parse_payload({"op": 10, "d": {"heartbeat_interval": 41250}})
+    assert isinstance(hello, Hello)
+
+    dispatch = parse_payload({"op": 0, "s": "3", "t": "RESUMED", "d": {}})
+    assert isinstance(dispatch, Dispatch)
+    assert dispatch.sequence == 3
+
+
+def test_single_pass_decode_matches_previous_result() -> None:
+    frame = _message_create_frame()
+
+    event = _decode_once(frame)
+
+    assert isinstance(event, GuildMessageCreateEvent)
+    assert event.model_dump(exclude={"timestamp__"}) == _decode_twice(frame).model_dump(
+        exclude={"timestamp__"}
+    )
+
+
+@pytest.mark.benchmark
+def test_benchmark_single_pass_dispatch_decoding(
+    record_property: Callable[[str, object], None],
+) -> None:
+    frame = _message_create_frame()
+    rounds = 200
+    results: dict[str, float] = {}
+    for name, decode in (("two-pass", _decode_twice), ("single-pass", _decode_once)):
+        decode(frame)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            decode(frame)
+        results[name] = (time.perf_counter() - start) / rounds
+
+    for name, elapsed in results.items():
+        record_property(f"{name}_us_per_dispatch", round(elapsed * 1_000_000, 1))
+    assert results["single-pass"] < results["two-pass"]
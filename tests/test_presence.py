@@ -0,0 +1,134 @@
+import asyncio
+
+from nonebot.adapters.discord.api import (
+    ActivitySend,
+    ActivityType,
+    UpdatePresence,
+    UpdatePresenceStatusType,
+)
+from nonebot.adapters.discord.config import BotInfo, Config
+from nonebot.adapters.discord.gateway import GatewayWebSocket
+from nonebot.adapters.discord.payload import Opcode
+from nonebot.adapters.discord.presence import PresenceCoalescer
+from tests.fake.doubles import DummyAdapter, sharded_bots
+from tests.fake.gateway import FakeGateway, FakeGatewayAdapter, running
+from tests.fake.websocket import ScriptedWebSocket
+
+from nonebot.compat import type_validate_python
+import pytest
+
+
+def _presence(status: str) -> UpdatePresence:
+    return UpdatePresence(status=UpdatePresenceStatusType(status))
+
+
+def _identify_presences(gateway: FakeGateway) -> list[dict | None]:
+    return [
+        payload["d"].get("presence")
+        for connection in gateway.connections
+        for payload in connection.received
+        if payload["op"] == Opcode.IDENTIFY
+    ]
+
+
+@pytest.mark.asyncio
+async def test_coalescer_sends_only_the_latest_presence_per_interval() -> None:
+    sent: list[str] = []
+
+    async def send(presence: UpdatePresence) -> None:
+        sent.append(presence.status)
+
+    coalescer = PresenceCoalescer(send, interval=0.05)
+    coalescer.update(_presence("idle"))
+    await asyncio.sleep(0)
+    coalescer.update(_presence("dnd"))
+    coalescer.update(_presence("invisible"))
+    coalescer.update(_presence("online"))
+    assert sent == ["idle"]
+
+    await asyncio.sleep(0.1)
+    assert sent == ["idle", "online"]
+    assert coalescer.pending is None
+
+
+@pytest.mark.asyncio
+async def test_update_presence_is_sent_on_every_shard() -> None:
+    adapter = DummyAdapter()
+    shards = sharded_bots(adapter)
+
+    shards[1][0].update_presence(
+        UpdatePresenceStatusType.dnd,
+        [ActivitySend(name="NoneBot", type=ActivityType.Game)],
+    )
+
+    for bot, ws in shards:
+        await ws.wait_sent()
+        assert ws.sent_payloads == [
+            {
+                "op": Opcode.PRESENCE_UPDATE,
+                "d": {
+                    "since": None,
+                    "activities": [{"name": "NoneBot", "type": 0}],
+                    "status": "dnd",
+                    "afk": False,
+                },
+            }
+        ]
+        assert adapter.presences[bot.self_id].status == "dnd"
+
+
+@pytest.mark.asyncio
+async def test_failed_presence_send_does_not_stop_later_updates() -> None:
+    ((bot, ws),) = sharded_bots(DummyAdapter(), 1)
+    assert bot.presence_updater is not None
+    bot.presence_updater.interval = 0.05
+    await ws.close()
+
+    bot.update_presence(UpdatePresenceStatusType.idle)
+    await asyncio.sleep(0.01)
+    # the shard reconnected
+    reconnected = ScriptedWebSocket()
+    bot.gateway = GatewayWebSocket(reconnected, shard=bot.shard)
+    bot.update_presence(UpdatePresenceStatusType.online)
+    await reconnected.wait_sent()
+
+    assert ws.sent == []
+    assert [payload["d"]["status"] for payload in reconnected.sent_payloads] == [
+        "online"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_identify_sends_the_latest_presence() -> None:
+    gateway = FakeGateway()
+    bot_info = type_validate_python(
+        BotInfo, {"token": "x" * 10, "presence": {"status": "idle"}}
+    )
+    adapter = FakeGatewayAdapter(
+        gateway, Config(discord_bots=[bot_info], discord_reconnect_base_delay=0.01)
+    )
+
+    async with running(adapter):
+        await gateway.wait_ready()
+        (bot,) = adapter.shard_bots.values()
+        bot.update_presence(UpdatePresenceStatusType.dnd)
+        await gateway.connections[0].invalidate_session(resumable=False)
+        await gateway.wait_connection(1)
+
+    assert _identify_presences(gateway) == [
+        {"since": None, "activities": [], "status": "idle", "afk": False},
+        {"since": None, "activities": [], "status": "dnd", "afk": False},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_identify_without_presence() -> None:
+    gateway = FakeGateway()
+    adapter = FakeGatewayAdapter(
+        gateway, Config(discord_bots=[BotInfo(token="x" * 10)])
+    )
+
+    async with running(adapter):
+        await gateway.wait_ready()
+
+    assert _identify_presences(gateway) == [None]
@@ -0,0 +1,232 @@
+import asyncio
+import time
+from typing_extensions import override
+
+from nonebot.adapters.discord.api.handle import _request
+from nonebot.adapters.discord.exception import RateLimitException
+from nonebot.adapters.discord.ratelimit import RateLimitBucket, RateLimiter, route_key
+from nonebot.adapters.discord.retry import RetryPolicy
+from tests.fake.doubles import DummyAdapter
+
+from nonebot.drivers import Request, Response
+import pytest
+from yarl import URL
+
+
+class BucketAdapter(DummyAdapter):
+    """Answer like Discord with one bucket of ``limit`` requests per window."""
+
+    def __init__(self, *, limit: int = 2, window: float = 0.2) -> None:
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self.windows: dict[str, tuple[float, int]] = {}
+        self.sent: list[tuple[float, str]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @override
+    async def request(self, setup: Request) -> Response:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        now = time.monotonic()
+        # every route shares one bucket per channel
+        key = setup.url.parts[4]
+        started, used = self.windows.get(key, (now, 0))
+        if now - started >= self.window:
+            started, used = now, 0
+        self.sent.append((now, setup.url.path))
+        headers = {
+            "X-RateLimit-Bucket": "shared",
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Reset-After": f"{self.window - (now - started):.3f}",
+        }
+        if used >= self.limit:
+            headers["X-RateLimit-Remaining"] = "0"
+            headers["Retry-After"] = headers["X-RateLimit-Reset-After"]
+            return Response(429, headers=headers, content=b'{"retry_after": 0.2}')
+        self.windows[key] = (started, used + 1)
+        headers["X-RateLimit-Remaining"] = str(self.limit - used - 1)
+        return Response(200, headers=headers, content=b"{}")
+
+
+def _get(adapter: DummyAdapter, path: str) -> Request:
+    return Request(
+        "GET", adapter.base_url / path, headers={"Authorization": "Bot test-token"}
+    )
+
+
+def test_route_key() -> None:
+    base = URL("https://discord.com/api/v10")
+
+    assert route_key("GET", base / "channels/1/messages/2") == (
+        "GET /channels/:major/messages/:id",
+        "channels/1",
+    )
+    assert route_key("PUT", base / "channels/1/messages/2/reactions/x:3/@me") == (
+        "PUT /channels/:major/messages/:id/reactions/:emoji/@me",
+        "channels/1",
+    )
+    assert route_key("POST", base / "webhooks/4/token") == (
+        "POST /webhooks/:major/:token",
+        "webhooks/4/token",
+    )
+    assert route_key("POST", base / "interactions/5/token/callback") == (
+        "POST /interactions/:id/:token/callback",
+        "interactions/5/token",
+    )
+    assert route_key("GET", base / "users/@me") == ("GET /users/@me", "")
+
+
+@pytest.mark.asyncio
+async def test_requests_wait_for_the_window_instead_of_failing() -> None:
+    adapter = BucketAdapter(limit=2, window=0.2)
+
+    start = time.monotonic()
+    await asyncio.gather(
+        *(_request(adapter, _get(adapter, "channels/1/messages")) for _ in range(5))
+    )
+
+    assert len(adapter.sent) == 5
+    offsets = [sent - start for sent, _ in adapter.sent]
+    assert offsets[1] < 0.15
+    assert offsets[2] >= 0.15
+    assert offsets[4] >= 0.35
+
+
+@pytest.mark.asyncio
+async def test_unknown_bucket_sends_one_request_at_a_time() -> None:
+    adapter = BucketAdapter(limit=10)
+
+    await asyncio.gather(
+        *(_request(adapter, _get(adapter, "channels/1/messages")) for _ in range(5))
+    )
+
+    # only the first request went out before the limit was known
+    assert adapter.max_in_flight == 4
+
+
+@pytest.mark.asyncio
+async def test_routes_share_buckets_by_hash_and_major_parameter() -> None:
+    adapter = BucketAdapter(limit=2, window=0.2)
+
+    start = time.monotonic()
+    await _request(adapter, _get(adapter, "channels/1/messages"))
+    # its response names the same bucket as the first route
+    await _request(adapter, _get(adapter, "channels/1/pins"))
+    await _request(adapter, _get(adapter, "channels/2/messages"))
+    await _request(adapter, _get(adapter, "channels/1/messages"))
+    await _request(adapter, _get(adapter, "channels/1/pins"))
+
+    offsets = {path: sent - start for sent, path in adapter.sent}
+    assert offsets["/api/v10/channels/2/messages"] < 0.15
+    assert offsets["/api/v10/channels/1/messages"] >= 0.15
+    assert offsets["/api/v10/channels/1/pins"] >= 0.15
+    assert len(adapter.sent) == 5
+
+
+@pytest.mark.asyncio
+async def test_unlimited_routes_are_not_serialized() -> None:
+    adapter = DummyAdapter()
+
+    await _request(adapter, _get(adapter, "gateway"))
+    await asyncio.gather(
+        *(_request(adapter, _get(adapter, "gateway")) for _ in range(3))
+    )
+
+    assert adapter.request_calls == 4
+
+
+@pytest.mark.asyncio
+async def test_error_without_headers_does_not_unlimit_the_bucket() -> None:
+    bucket = RateLimitBucket()
+
+    bucket.release(Response(502), await bucket.acquire())
+    assert not bucket.unlimited
+    headers = {
+        "X-RateLimit-Limit": "2",
+        "X-RateLimit-Remaining": "1",
+        "X-RateLimit-Reset-After": "0.2",
+    }
+    bucket.release(Response(200, headers=headers), await bucket.acquire())
+
+    start = time.monotonic()
+    for _ in range(5):
+        bucket.release(None, await bucket.acquire())
+    # one request was left in the window, then two per window
+    assert time.monotonic() - start >= 0.35
+
+
+@pytest.mark.asyncio
+async def test_headers_limit_a_bucket_thought_unlimited() -> None:
+    bucket = RateLimitBucket()
+
+    bucket.release(Response(200), await bucket.acquire())
+    assert bucket.unlimited
+    headers = {
+        "X-RateLimit-Limit": "1",
+        "X-RateLimit-Remaining": "0",
+        "X-RateLimit-Reset-After": "0.2",
+    }
+    bucket.release(Response(200, headers=headers), await bucket.acquire())
+
+    assert not bucket.unlimited
+    start = time.monotonic()
+    bucket.release(None, await bucket.acquire())
+    assert time.monotonic() - start >= 0.15
+
+
+@pytest.mark.asyncio
+async def test_429_raises_and_blocks_the_bucket() -> None:
+    adapter = DummyAdapter(status_code=429, content=b'{"retry_after": 0.2}')
+    adapter.retry_policy = RetryPolicy(max_retries=0)
+
+    with pytest.raises(RateLimitException):
+        await _request(adapter, _get(adapter, "channels/1/messages"))
+
+    adapter.status_code = 200
+    start = time.monotonic()
+    await _request(adapter, _get(adapter, "channels/1/messages"))
+
+    assert time.monotonic() - start >= 0.15
+
+
+@pytest.mark.asyncio
+async def test_global_limit_paces_all_routes_of_a_token() -> None:
+    adapter = DummyAdapter()
+    adapter.rate_limiter = RateLimiter(global_limit=50)
+
+    start = time.monotonic()
+    await asyncio.gather(
+        *(
+            _request(adapter, _get(adapter, f"channels/{channel}/messages"))
+            for channel in range(60)
+        )
+    )
+
+    # the first 50 are a burst, the other 10 come at 50 per second
+    assert time.monotonic() - start >= 0.15
+    assert adapter.request_calls == 60
+
+
+@pytest.mark.asyncio
+async def test_global_429_pauses_every_route_but_interactions() -> None:
+    adapter = DummyAdapter(
+        status_code=429, content=b'{"retry_after": 0.2, "global": true}'
+    )
+    adapter.retry_policy = RetryPolicy(max_retries=0)
+
+    with pytest.raises(RateLimitException):
+        await _request(adapter, _get(adapter, "channels/1/messages"))
+
+    adapter.status_code = 200
+    start = time.monotonic()
+    await _request(adapter, _get(adapter, "interactions/1/token/callback"))
+    assert time.monotonic() - start < 0.1
+    await _request(adapter, _get(adapter, "guilds/2"))
+    assert time.monotonic() - start >= 0.15
+    # only the global limit was hit, the route itself is not blocked
+    await _request(adapter, _get(adapter, "channels/1/messages"))
+    assert time.monotonic() - start < 0.35
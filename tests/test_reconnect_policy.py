@@ -0,0 +1,169 @@
+import asyncio
+import contextlib
+
+from nonebot.adapters.discord.api.model import GatewayBot, User
+from nonebot.adapters.discord.bot import Bot
+from nonebot.adapters.discord.config import BotInfo
+from nonebot.adapters.discord.payload import InvalidSession
+from nonebot.adapters.discord.reconnect import ReconnectPolicy
+from tests.fake.doubles import DummyAdapter
+
+from nonebot.compat import type_validate_python
+from nonebot.drivers import Request
+import pytest
+from yarl import URL
+
+
+def test_backoff_is_exponential_with_full_jitter(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    bounds: list[float] = []
+
+    def uniform(low: float, high: float) -> float:
+        assert low == 0
+        bounds.append(high)
+        return high / 2
+
+    monkeypatch.setattr("random.uniform", uniform)
+    policy = ReconnectPolicy(base_delay=1, max_delay=10, max_resume_attempts=0)
+
+    delays = [policy.next(close_code=None, resumable=False).delay for _ in range(6)]
+
+    assert bounds == [1, 2, 4, 8, 10, 10]
+    assert delays == [0.5, 1, 2, 4, 5, 5]
+
+
+def test_resume_budget_falls_back_to_identify() -> None:
+    policy = ReconnectPolicy(base_delay=0, max_resume_attempts=2)
+
+    actions = [policy.next(close_code=1006, resumable=True).action for _ in range(3)]
+    assert actions == ["resume", "resume", "identify"]
+
+    policy.reset()
+    assert policy.next(close_code=1006, resumable=True).action == "resume"
+
+
+def test_identify_budget_gives_up() -> None:
+    policy = ReconnectPolicy(base_delay=0, max_identify_attempts=2)
+
+    actions = [policy.next(close_code=None, resumable=False).action for _ in range(3)]
+
+    assert actions == ["identify", "identify", "stop"]
+
+
+@pytest.mark.parametrize(
+    ("close_code", "action"),
+    [
+        (4004, "stop"),
+        (4014, "stop"),
+        (4007, "identify"),
+        (4009, "identify"),
+        (4000, "resume"),
+        (None, "resume"),
+    ],
+)
+def test_close_code_decides_action(close_code: int | None, action: str) -> None:
+    policy = ReconnectPolicy()
+
+    assert policy.next(close_code=close_code, resumable=True).action == action
+
+
+def test_invalid_session_reports_resumable() -> None:
+    assert type_validate_python(InvalidSession, {"op": 9, "d": True}).data
+    assert not type_validate_python(InvalidSession, {"op": 9, "d": False}).data
+
+
+async def _run_shard(
+    monkeypatch: pytest.MonkeyPatch, close_codes: list[int | None]
+) -> tuple[list[tuple[bool, str | None]], Bot | None]:
+    """Run ``_forward_ws`` with connections ending with the given close codes."""
+    adapter = DummyAdapter()
+    adapter.reconnect_policy_factory = lambda: ReconnectPolicy(base_delay=0)
+    ws_url = URL("wss://gateway.discord.gg")
+    connections: list[tuple[bool, str | None]] = []
+    bots: list[Bot] = []
+
+    async def get_gateway_bot(bot_info: BotInfo) -> GatewayBot:
+        del bot_info
+        return type_validate_python(
+            GatewayBot,
+            {
+                "url": str(ws_url),
+                "shards": 1,
+                "session_start_limit": {
+                    "total": 1000,
+                    "remaining": 1000,
+                    "reset_after": 0,
+                    "max_concurrency": 1,
+                },
+            },
+        )
+
+    async def get_bot_user(bot_info: BotInfo) -> User:
+        del bot_info
+        return type_validate_python(
+            User, {"id": 1, "username": "bot", "discriminator": "0", "avatar": None}
+        )
+
+    async def connect(
+        bot: Bot, request: Request, decompressor: object, shard: tuple[int, int]
+    ) -> int | None:
+        del decompressor, shard
+        bots.append(bot)
+        connections.append((bot.ready, request.url.host))
+        if not close_codes:
+            raise asyncio.CancelledError
+        if not bot.ready:
+            # the connection identified successfully
+            bot.session_id = "session"
+            bot.sequence = 1
+            request.url = URL("wss://resume.discord.gg").with_query(request.url.query)
+        return close_codes.pop(0)
+
+    monkeypatch.setattr(adapter, "_get_gateway_bot", get_gateway_bot)
+    monkeypatch.setattr(adapter, "_get_bot_user", get_bot_user)
+    monkeypatch.setattr(adapter, "_connect", connect)
+
+    with contextlib.suppress(asyncio.CancelledError):
+        await asyncio.wait_for(
+            adapter._forward_ws(BotInfo(token="x" * 10), ws_url, (0, 1)),  # noqa: SLF001
+            1,
+        )
+    return connections, bots[-1] if bots else None
+
+
+@pytest.mark.asyncio
+async def test_forward_ws_resumes_after_normal_close(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    connections, _ = await _run_shard(monkeypatch, [1006])
+
+    assert connections == [
+        (False, "gateway.discord.gg"),
+        (True, "resume.discord.gg"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_forward_ws_reidentifies_on_session_timeout(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    connections, bot = await _run_shard(monkeypatch, [4009])
+
+    assert connections == [
+        (False, "gateway.discord.gg"),
+        (False, "gateway.discord.gg"),
+    ]
+    assert bot is not None
+    assert not bot.has_sequence
+
+
+@pytest.mark.asyncio
+async def test_forward_ws_stops_on_fatal_close_code(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    connections, bot = await _run_shard(monkeypatch, [4014, None])
+
+    assert len(connections) == 1
+    assert bot is not None
+    assert bot.ready
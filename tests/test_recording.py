@@ -0,0 +1,140 @@
+import asyncio
+import gzip
+import json
+from pathlib import Path
+from typing import Literal
+
+from nonebot.adapters.discord import etf
+from nonebot.adapters.discord.bot import Bot
+from nonebot.adapters.discord.config import BotInfo, Config
+from nonebot.adapters.discord.event import Event, GuildRoleDeleteEvent
+from nonebot.adapters.discord.gateway import GatewayWebSocket
+from nonebot.adapters.discord.payload import Dispatch, Hello
+from nonebot.adapters.discord.recording import (
+    GatewayRecorder,
+    read_recording,
+    replay,
+)
+from tests.fake.doubles import DummyAdapter, DummyBot
+from tests.fake.gateway import FakeGateway, FakeGatewayAdapter, message_event, running
+from tests.fake.websocket import ScriptedWebSocket
+
+import pytest
+
+HELLO = '{"op":10,"d":{"heartbeat_interval":41250}}'
+
+
+async def _ignore_event(self: Bot, event: Event) -> None:
+    del self, event
+
+
+def _role_delete(sequence: int) -> str:
+    return json.dumps(
+        {
+            "op": 0,
+            "s": sequence,
+            "t": "GUILD_ROLE_DELETE",
+            "d": {"guild_id": "1", "role_id": str(sequence)},
+        }
+    )
+
+
+def _write_recording(path: Path, frames: list[tuple[float, str]]) -> None:
+    with gzip.open(path, "wt", encoding="utf-8") as file:
+        for at, data in frames:
+            line = {"time": at, "shard": [0, 1], "data": data}
+            file.write(json.dumps(line) + "\n")
+
+
+@pytest.mark.asyncio
+async def test_receive_payload_records_frames_with_shard(tmp_path: Path) -> None:
+    path = tmp_path / "gateway.jsonl.gz"
+    adapter = DummyAdapter()
+    adapter.recorder = GatewayRecorder(path)
+    ws = GatewayWebSocket(ScriptedWebSocket([HELLO, _role_delete(1)]), shard=(2, 4))
+
+    assert isinstance(await adapter.receive_payload(ws), Hello)
+    assert isinstance(await adapter.receive_payload(ws), Dispatch)
+    adapter.recorder.record(None, etf.encode({"op": 11}), "etf")
+    await adapter.recorder.close()
+
+    frames = list(read_recording(path))
+    assert [frame.shard for frame in frames] == [(2, 4), (2, 4), None]
+    assert frames[0].data == HELLO
+    assert frames[1].decode()["t"] == "GUILD_ROLE_DELETE"
+    assert frames[2].decode() == {"op": 11}
+    assert [frame.encoding for frame in frames] == ["json", "json", "etf"]
+    assert frames[0].time <= frames[1].time <= frames[2].time
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("encoding", ["json", "etf"])
+async def test_compressed_traffic_replays_in_its_encoding(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, encoding: Literal["json", "etf"]
+) -> None:
+    path = tmp_path / "gateway.jsonl.gz"
+    gateway = FakeGateway()
+    adapter = FakeGatewayAdapter(
+        gateway,
+        Config(
+            discord_bots=[BotInfo(token="x" * 10)],
+            discord_compress=True,
+            discord_encoding=encoding,
+            discord_record_file=path,
+        ),
+    )
+    monkeypatch.setattr(Bot, "handle_event", _ignore_event)
+
+    async with running(adapter):
+        await gateway.wait_ready()
+        (bot,) = adapter.shard_bots.values()
+        await gateway.connections[0].dispatch(*message_event(0, 0))
+        while bot.sequence < 2:  # noqa: ASYNC110
+            await asyncio.sleep(0.01)
+
+    frames = list(read_recording(path))
+    # zlib-stream hands over JSON as bytes, which must still be recorded as JSON
+    assert {frame.encoding for frame in frames} == {encoding}
+    assert [frame.decode()["op"] for frame in frames] == [10, 0, 0]
+    report = await replay(bot, path, trace_memory=False)
+    assert report.events == 2
+
+
+@pytest.mark.asyncio
+async def test_replay_handles_every_dispatch(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path = tmp_path / "gateway.jsonl.gz"
+    _write_recording(
+        path, [(0.0, HELLO), *((0.0, _role_delete(index)) for index in range(1, 21))]
+    )
+    bot = DummyBot()
+    handled: list[Event] = []
+
+    async def handle_event(event: Event) -> None:
+        handled.append(event)
+
+    monkeypatch.setattr(bot, "handle_event", handle_event)
+
+    report = await replay(bot, path)
+
+    assert report.events == 20
+    assert [type(event) for event in handled] == [GuildRoleDeleteEvent] * 20
+    assert 0 <= report.p50_latency <= report.p99_latency
+    assert report.events_per_second > 0
+    assert report.peak_memory is not None
+    assert report.peak_memory > 0
+
+
+@pytest.mark.asyncio
+async def test_replay_keeps_original_timing(tmp_path: Path) -> None:
+    path = tmp_path / "gateway.jsonl.gz"
+    _write_recording(path, [(100.0, _role_delete(1)), (100.2, _role_delete(2))])
+    bot = DummyBot()
+
+    fast = await replay(bot, path, trace_memory=False)
+    original = await replay(bot, path, speed=2.0, trace_memory=False)
+
+    assert fast.duration < 0.1
+    assert original.duration >= 0.09
+    assert original.peak_memory is None
@@ -0,0 +1,83 @@
+import time
+from typing_extensions import override
+
+from nonebot.adapters.discord.api.handle import _request
+from nonebot.adapters.discord.exception import ActionFailed, RateLimitException
+from nonebot.adapters.discord.retry import RetryPolicy
+from tests.fake.doubles import DummyAdapter
+
+from nonebot.drivers import Request, Response
+import pytest
+
+
+class ScriptedAdapter(DummyAdapter):
+    def __init__(self, responses: list[Response]) -> None:
+        super().__init__()
+        self.responses = responses
+        self.retry_policy = RetryPolicy(base_delay=0.01)
+
+    @override
+    async def request(self, setup: Request) -> Response:
+        self.request_calls += 1
+        return self.responses.pop(0)
+
+
+def _call(adapter: DummyAdapter, method: str = "GET") -> Request:
+    return Request(method, adapter.base_url / "channels/1")
+
+
+@pytest.mark.asyncio
+async def test_server_errors_are_retried_for_idempotent_methods() -> None:
+    adapter = ScriptedAdapter(
+        [Response(502, content=b"<html>"), Response(503), Response(200, content=b"{}")]
+    )
+
+    assert await _request(adapter, _call(adapter)) == {}
+    assert adapter.request_calls == 3
+    stats = adapter.retry_policy.stats
+    assert (stats.retries, stats.server_errors, stats.rate_limited) == (2, 2, 0)
+
+
+@pytest.mark.asyncio
+async def test_server_errors_are_not_retried_for_post() -> None:
+    adapter = ScriptedAdapter([Response(503, content=b"{}")])
+
+    with pytest.raises(ActionFailed):
+        await _request(adapter, _call(adapter, "POST"))
+    assert adapter.request_calls == 1
+    assert adapter.retry_policy.stats.retries == 0
+
+
+@pytest.mark.asyncio
+async def test_429_is_retried_after_retry_after_for_any_method() -> None:
+    adapter = ScriptedAdapter(
+        [
+            Response(429, headers={"Retry-After": "0.1"}, content=b"{}"),
+            Response(200, content=b'{"id": "1"}'),
+        ]
+    )
+
+    start = time.monotonic()
+    assert await _request(adapter, _call(adapter, "POST")) == {"id": "1"}
+    assert time.monotonic() - start >= 0.1
+    stats = adapter.retry_policy.stats
+    assert stats.rate_limited == 1
+    assert stats.waited == pytest.approx(0.1)
+
+
+@pytest.mark.asyncio
+async def test_retries_stop_at_max_retries_and_deadline() -> None:
+    adapter = ScriptedAdapter([Response(500)] * 3)
+    adapter.retry_policy = RetryPolicy(max_retries=2, base_delay=0.01)
+
+    with pytest.raises(ActionFailed):
+        await _request(adapter, _call(adapter))
+    assert adapter.request_calls == 3
+
+    adapter = ScriptedAdapter([Response(429, content=b'{"retry_after": 5}')])
+    adapter.retry_policy = RetryPolicy(deadline=1.0)
+
+    start = time.monotonic()
+    with pytest.raises(RateLimitException):
+        await _request(adapter, _call(adapter))
+    assert time.monotonic() - start < 0.5
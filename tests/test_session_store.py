@@ -0,0 +1,153 @@
+import asyncio
+from collections.abc import AsyncGenerator
+import contextlib
+import json
+from pathlib import Path
+
+from nonebot.adapters.discord.adapter import RESUMABLE_CLOSE_CODE
+from nonebot.adapters.discord.api.model import User
+from nonebot.adapters.discord.config import BotInfo
+from nonebot.adapters.discord.session import (
+    FileSessionStore,
+    SessionState,
+    session_key,
+)
+from tests.fake.doubles import DummyAdapter, DummyBot
+from tests.fake.websocket import ScriptedWebSocket
+
+from nonebot.compat import type_validate_python
+from nonebot.drivers import Request, WebSocket
+import pytest
+from yarl import URL
+
+
+def _adapter(path: Path) -> DummyAdapter:
+    adapter = DummyAdapter()
+    adapter.bots = {}
+    adapter.session_store = FileSessionStore(path)
+    return adapter
+
+
+@pytest.mark.asyncio
+async def test_file_store_round_trip(tmp_path: Path) -> None:
+    path = tmp_path / "sessions" / "discord.json"
+    state = SessionState("abc", 42, "wss://resume.discord.gg")
+
+    await FileSessionStore(path).save("1:0:2", state)
+    await FileSessionStore(path).save("1:1:2", state)
+
+    store = FileSessionStore(path)
+    assert await store.load("1:0:2") == state
+    assert await store.load("1:3:4") is None
+    await store.save("1:0:2", None)
+    assert await FileSessionStore(path).load("1:0:2") is None
+    assert await FileSessionStore(path).load("1:1:2") == state
+
+
+@pytest.mark.asyncio
+async def test_file_store_ignores_broken_file(tmp_path: Path) -> None:
+    path = tmp_path / "discord.json"
+    path.write_text("not json")
+
+    assert await FileSessionStore(path).load("1:0:1") is None
+
+
+@pytest.mark.asyncio
+async def test_save_sessions_keeps_only_resumable_shards(tmp_path: Path) -> None:
+    path = tmp_path / "discord.json"
+    adapter = _adapter(path)
+    ready = DummyBot(adapter)
+    ready.session_id = "abc"
+    ready.sequence = 7
+    ready.resume_gateway_url = "wss://resume.discord.gg"
+    adapter.shard_bots = {"1:0:2": ready, "1:1:2": DummyBot(adapter)}
+    await FileSessionStore(path).save("1:1:2", SessionState("old", 1, "wss://old"))
+
+    await adapter.save_sessions()
+
+    store = FileSessionStore(path)
+    assert await store.load("1:0:2") == SessionState(
+        "abc", 7, "wss://resume.discord.gg"
+    )
+    assert await store.load("1:1:2") is None
+
+
+@pytest.mark.asyncio
+async def test_save_sessions_writes_all_shards_at_once(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    adapter = _adapter(tmp_path / "discord.json")
+    store = adapter.session_store
+    assert isinstance(store, FileSessionStore)
+    writes: list[str] = []
+    monkeypatch.setattr(store, "_write", writes.append)
+    for shard_id in range(16):
+        bot = DummyBot(adapter)
+        bot.session_id = f"session {shard_id}"
+        bot.sequence = shard_id
+        bot.resume_gateway_url = "wss://resume.discord.gg"
+        adapter.shard_bots[session_key(bot.self_id, (shard_id, 16))] = bot
+
+    await adapter.save_sessions()
+    assert len(writes) == 1
+    assert len(json.loads(writes[0])) == 16
+
+    # nothing changed since the last save
+    await adapter.save_sessions()
+    assert len(writes) == 1
+
+
+@pytest.mark.asyncio
+async def test_create_bot_restores_session(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    adapter = _adapter(tmp_path / "discord.json")
+    assert adapter.session_store is not None
+    await adapter.session_store.save(
+        session_key("1", (0, 2)),
+        SessionState("abc", 42, "wss://resume.discord.gg"),
+    )
+
+    async def get_bot_user(bot_info: BotInfo) -> User:
+        del bot_info
+        return type_validate_python(
+            User, {"id": 1, "username": "bot", "discriminator": "0", "avatar": None}
+        )
+
+    monkeypatch.setattr(adapter, "_get_bot_user", get_bot_user)
+    request = Request(
+        "GET", "wss://gateway.discord.gg", params={"v": 10, "encoding": "json"}
+    )
+
+    bot = await adapter._create_bot(BotInfo(token="x" * 10), (0, 2), request)  # noqa: SLF001
+
+    assert bot.ready
+    assert bot.session_id == "abc"
+    assert bot.sequence == 42
+    assert request.url == URL("wss://resume.discord.gg/?v=10&encoding=json")
+    assert adapter.shard_bots == {"1:0:2": bot}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_connection_keeps_session_resumable(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    adapter = _adapter(tmp_path / "discord.json")
+    request = Request("GET", "wss://gateway.discord.gg")
+    raw = ScriptedWebSocket(request=request)
+
+    @contextlib.asynccontextmanager
+    async def websocket(setup: Request) -> AsyncGenerator[WebSocket, None]:
+        del setup
+        yield raw
+
+    monkeypatch.setattr(adapter, "websocket", websocket)
+    task = asyncio.create_task(
+        adapter._connect(DummyBot(adapter), request, None, (0, 1))  # noqa: SLF001
+    )
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert raw.close_code == RESUMABLE_CLOSE_CODE
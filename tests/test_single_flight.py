@@ -0,0 +1,88 @@
+import asyncio
+from typing_extensions import override
+
+from nonebot.adapters.discord.api.handle import _request
+from nonebot.adapters.discord.config import Config
+from nonebot.adapters.discord.singleflight import SingleFlight
+from tests.fake.doubles import DummyAdapter
+
+from nonebot.drivers import Request, Response
+import pytest
+
+
+class SlowAdapter(DummyAdapter):
+    def __init__(self, *, coalesce: bool = True) -> None:
+        super().__init__(content=b'{"id": "1"}')
+        self.discord_config = Config(discord_api_coalesce_get=coalesce)
+
+    @override
+    async def request(self, setup: Request) -> Response:
+        self.request_calls += 1
+        await asyncio.sleep(0.05)
+        return Response(self.status_code, content=self.content)
+
+
+def _get(adapter: DummyAdapter, path: str, bot: str = "a") -> Request:
+    return Request(
+        "GET", adapter.base_url / path, headers={"Authorization": f"Bot {bot}"}
+    )
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_gets_share_one_request() -> None:
+    adapter = SlowAdapter()
+    # learn that the route is not limited, so requests are not serialized
+    await _request(adapter, _get(adapter, "channels/1"))
+    adapter.request_calls = 0
+
+    results = await asyncio.gather(
+        *(_request(adapter, _get(adapter, "channels/1")) for _ in range(30)),
+        _request(adapter, _get(adapter, "channels/1", bot="b")),
+    )
+
+    assert results == [{"id": "1"}] * 31
+    # one for each token
+    assert adapter.request_calls == 2
+    assert adapter.single_flight.shared == 29
+    assert adapter.single_flight.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_coalescing_is_opt_in_and_only_for_get() -> None:
+    adapter = SlowAdapter(coalesce=False)
+    await _request(adapter, _get(adapter, "users/@me"))
+    await asyncio.gather(
+        *(_request(adapter, _get(adapter, "users/@me")) for _ in range(3))
+    )
+    assert adapter.request_calls == 4
+
+    adapter = SlowAdapter()
+    await asyncio.gather(
+        *(
+            _request(adapter, Request("POST", adapter.base_url / "users/@me/channels"))
+            for _ in range(3)
+        )
+    )
+    assert adapter.request_calls == 3
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_the_others() -> None:
+    flight: SingleFlight[int] = SingleFlight()
+    calls = 0
+
+    async def call() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return calls
+
+    first = asyncio.ensure_future(flight.do("key", call))
+    second = asyncio.ensure_future(flight.do("key", call))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await second == 1
+    assert first.cancelled()
+    # finished calls are not cached
+    assert await flight.do("key", call) == 2
@@ -0,0 +1,124 @@
+import asyncio
+
+from nonebot.adapters.discord.api.model import GatewayBot, User
+from nonebot.adapters.discord.bot import Bot
+from nonebot.adapters.discord.config import BotInfo
+from nonebot.adapters.discord.startup import StartupContext
+from tests.fake.doubles import DummyAdapter
+
+from nonebot.compat import type_validate_python
+from nonebot.drivers import Request
+import pytest
+
+GATEWAY = {
+    "url": "wss://gateway.discord.gg",
+    "shards": 32,
+    "session_start_limit": {
+        "total": 1000,
+        "remaining": 1000,
+        "reset_after": 0,
+        "max_concurrency": 16,
+    },
+}
+USER = {"id": 1, "username": "bot", "discriminator": "0", "avatar": None}
+
+
+class _Calls:
+    def __init__(self, *, fail: int = 0) -> None:
+        self.gateway = 0
+        self.user = 0
+        self.fail = fail
+
+    async def get_gateway(self) -> GatewayBot:
+        self.gateway += 1
+        await asyncio.sleep(0.01)
+        return type_validate_python(GatewayBot, GATEWAY)
+
+    async def get_user(self) -> User:
+        self.user += 1
+        await asyncio.sleep(0.01)
+        if self.fail:
+            self.fail -= 1
+            msg = "users/@me failed"
+            raise RuntimeError(msg)
+        return type_validate_python(User, USER)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_request() -> None:
+    calls = _Calls()
+    context = StartupContext(calls.get_gateway, calls.get_user)
+
+    users = await asyncio.gather(*(context.get_user() for _ in range(8)))
+
+    assert calls.user == 1
+    assert all(user is users[0] for user in users)
+    await context.get_user()
+    assert calls.user == 1
+
+    await context.get_gateway()
+    context.invalidate_gateway()
+    await context.get_gateway()
+    await context.get_user()
+    assert calls.gateway == 2
+    assert calls.user == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_request_is_retried() -> None:
+    calls = _Calls(fail=1)
+    context = StartupContext(calls.get_gateway, calls.get_user)
+
+    with pytest.raises(RuntimeError):
+        await context.get_user()
+    assert (await context.get_user()).id == 1
+    assert calls.user == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_the_request() -> None:
+    calls = _Calls()
+    context = StartupContext(calls.get_gateway, calls.get_user)
+
+    first = asyncio.create_task(context.get_gateway())
+    second = asyncio.create_task(context.get_gateway())
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert (await second).shards == 32
+    assert calls.gateway == 1
+
+
+@pytest.mark.asyncio
+async def test_shards_of_a_bot_share_startup_requests(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    adapter = DummyAdapter()
+    calls = _Calls()
+    connected: list[tuple[int, int]] = []
+
+    async def get_gateway_bot(bot_info: BotInfo) -> GatewayBot:
+        del bot_info
+        return await calls.get_gateway()
+
+    async def get_bot_user(bot_info: BotInfo) -> User:
+        del bot_info
+        return await calls.get_user()
+
+    async def connect(
+        bot: Bot, request: Request, decompressor: object, shard: tuple[int, int]
+    ) -> int | None:
+        del bot, request, decompressor
+        connected.append(shard)
+        raise asyncio.CancelledError
+
+    monkeypatch.setattr(adapter, "_get_gateway_bot", get_gateway_bot)
+    monkeypatch.setattr(adapter, "_get_bot_user", get_bot_user)
+    monkeypatch.setattr(adapter, "_connect", connect)
+
+    await adapter.run_bot(BotInfo(token="x" * 10))
+    await asyncio.wait_for(asyncio.gather(*adapter.tasks, return_exceptions=True), 1)
+
+    assert sorted(connected) == [(i, 32) for i in range(32)]
+    assert calls.gateway == 1
+    assert calls.user == 1
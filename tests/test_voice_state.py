@@ -0,0 +1,163 @@
+import asyncio
+
+from nonebot.adapters.discord.bot import Bot
+from nonebot.adapters.discord.config import BotInfo, Intents
+from nonebot.adapters.discord.event import Event, VoiceStateUpdateEvent
+from nonebot.adapters.discord.exception import NetworkError
+from nonebot.adapters.discord.payload import Dispatch, Opcode
+from tests.fake.doubles import DummyAdapter, sharded_bots
+
+import pytest
+
+# a guild of shard 1 when the bot runs 2 shards
+GUILD_ID = 1 << 22
+CHANNEL_ID = 42
+VOICE_TOKEN = "voice-token"  # noqa: S105
+
+
+def _voice_state(user_id: int, channel_id: int | None) -> Dispatch:
+    return Dispatch(
+        op=Opcode.DISPATCH,
+        s=1,
+        t="VOICE_STATE_UPDATE",
+        d={
+            "guild_id": str(GUILD_ID),
+            "channel_id": None if channel_id is None else str(channel_id),
+            "user_id": str(user_id),
+            "session_id": f"session-{user_id}",
+            "deaf": False,
+            "mute": False,
+            "self_deaf": True,
+            "self_mute": False,
+            "self_video": False,
+            "suppress": False,
+            "request_to_speak_timestamp": None,
+        },
+    )
+
+
+def _voice_server() -> Dispatch:
+    return Dispatch(
+        op=Opcode.DISPATCH,
+        s=2,
+        t="VOICE_SERVER_UPDATE",
+        d={
+            "token": VOICE_TOKEN,
+            "guild_id": str(GUILD_ID),
+            "endpoint": "voice.discord.test:443",
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_update_voice_state_waits_for_state_and_server(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    adapter = DummyAdapter()
+    (bot, ws), (guild_bot, guild_ws) = sharded_bots(adapter)
+    handled: list[Event] = []
+
+    async def handle_event(event: Event) -> None:
+        handled.append(event)
+
+    monkeypatch.setattr(guild_bot, "handle_event", handle_event)
+
+    request = asyncio.create_task(
+        bot.update_voice_state(GUILD_ID, CHANNEL_ID, self_deaf=True)
+    )
+    await guild_ws.wait_sent()
+    assert ws.sent == []
+    assert guild_ws.sent_payloads == [
+        {
+            "op": Opcode.VOICE_STATE_UPDATE,
+            "d": {
+                "guild_id": GUILD_ID,
+                "channel_id": CHANNEL_ID,
+                "self_mute": False,
+                "self_deaf": True,
+            },
+        }
+    ]
+
+    # the server may answer before the state, and other members do not count
+    await adapter._dispatch(guild_bot, _voice_server())  # noqa: SLF001
+    await adapter._dispatch(guild_bot, _voice_state(2, CHANNEL_ID))  # noqa: SLF001
+    assert not request.done()
+    await adapter._dispatch(guild_bot, _voice_state(1, CHANNEL_ID))  # noqa: SLF001
+    connection = await asyncio.wait_for(request, 1)
+
+    assert connection.session_id == "session-1"
+    assert connection.endpoint == "voice.discord.test:443"
+    assert connection.token == VOICE_TOKEN
+    assert connection.guild_id == GUILD_ID
+    assert connection.channel_id == CHANNEL_ID
+    # voice events still reach the event handlers
+    await asyncio.gather(*adapter.tasks)
+    assert len(handled) == 3
+
+
+@pytest.mark.asyncio
+async def test_leaving_resolves_without_voice_server() -> None:
+    adapter = DummyAdapter()
+    (bot, _), (guild_bot, guild_ws) = sharded_bots(adapter)
+
+    request = asyncio.create_task(bot.update_voice_state(GUILD_ID, None))
+    await guild_ws.wait_sent()
+    assert guild_ws.sent_payloads[0]["d"]["channel_id"] is None
+    await adapter._dispatch(guild_bot, _voice_state(1, None))  # noqa: SLF001
+    connection = await asyncio.wait_for(request, 1)
+
+    assert isinstance(connection.state, VoiceStateUpdateEvent)
+    assert connection.server is None
+    assert connection.guild_id == GUILD_ID
+    assert connection.channel_id is None
+
+
+@pytest.mark.asyncio
+async def test_update_voice_state_times_out() -> None:
+    adapter = DummyAdapter()
+    (bot, _), _ = sharded_bots(adapter)
+
+    with pytest.raises(NetworkError, match="Timed out"):
+        await bot.update_voice_state(GUILD_ID, CHANNEL_ID, timeout=0.01)
+    assert adapter.voice_handshakes._pending == {}  # noqa: SLF001
+
+
+@pytest.mark.asyncio
+async def test_newer_request_supersedes_pending_one() -> None:
+    adapter = DummyAdapter()
+    (bot, _), (guild_bot, _) = sharded_bots(adapter)
+
+    first = asyncio.create_task(bot.update_voice_state(GUILD_ID, CHANNEL_ID))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(bot.update_voice_state(GUILD_ID, None))
+    await asyncio.sleep(0)
+    with pytest.raises(NetworkError, match="superseded"):
+        await first
+
+    await adapter._dispatch(guild_bot, _voice_state(1, None))  # noqa: SLF001
+    assert (await asyncio.wait_for(second, 1)).channel_id is None
+
+
+@pytest.mark.asyncio
+async def test_update_voice_state_requires_voice_states_intent() -> None:
+    adapter = DummyAdapter()
+    sharded_bots(adapter)
+    bot = Bot(
+        adapter, "1", BotInfo(token="x" * 10, intent=Intents(guild_voice_states=False))
+    )
+
+    with pytest.raises(ValueError, match="guild_voice_states"):
+        await bot.update_voice_state(GUILD_ID, CHANNEL_ID)
+
+
+@pytest.mark.asyncio
+async def test_auto_intents_allow_voice_state_updates() -> None:
+    adapter = DummyAdapter()
+    sharded_bots(adapter)
+    bot = Bot(adapter, "1", BotInfo(token="x" * 10, intent=Intents(auto=True)))
+
+    # no matcher handles voice events, but the adapter waits for them
+    assert adapter.get_intents(bot.bot_info).guild_voice_states
+    with pytest.raises(NetworkError, match="Timed out"):
+        await bot.update_voice_state(GUILD_ID, CHANNEL_ID, timeout=0.01)